@@ -0,0 +1,51 @@
+using System.Buffers.Binary;
+using System.Globalization;
+using System.Text;
+using System.Text.Json;
+using TradeVision.DataBridge.Models;
+
+namespace TradeVision.DataBridge.Core
+{
+    // Compact binary trade frame published on "trade.bin".
+    // The layout mirrors trade_vision_bot/core/wire.py (64 bytes, little endian):
+    // version u8 | flags u8 | 6 pad | E i64 | T i64 | t i64 | price f64 | qty f64 | symbol 16 ASCII (NUL padded)
+    public static class TradeFrame
+    {
+        public const string Topic = "trade.bin";
+        public const int Size = 64;
+        public const byte Version = 1;
+        private const int SymbolSize = 16;
+
+        // Returns false for non-trade events and payloads that do not fit the layout (nothing is published).
+        public static bool TryEncode(string rawJson, byte[] frame)
+        {
+            TradeEvent trade;
+            try
+            {
+                trade = JsonSerializer.Deserialize<TradeEvent>(rawJson);
+            }
+            catch (JsonException)
+            {
+                return false;
+            }
+
+            if (trade.EventType != "trade" || trade.Symbol is null || trade.Symbol.Length > SymbolSize)
+                return false;
+            if (!double.TryParse(trade.Price, NumberStyles.Float, CultureInfo.InvariantCulture, out var price) ||
+                !double.TryParse(trade.Quantity, NumberStyles.Float, CultureInfo.InvariantCulture, out var qty))
+                return false;
+
+            var span = frame.AsSpan(0, Size);
+            span.Clear();
+            span[0] = Version;
+            span[1] = (byte)(trade.IsBuyerMaker ? 1 : 0);
+            BinaryPrimitives.WriteInt64LittleEndian(span.Slice(8), trade.EventTime);
+            BinaryPrimitives.WriteInt64LittleEndian(span.Slice(16), trade.TradeTime);
+            BinaryPrimitives.WriteInt64LittleEndian(span.Slice(24), trade.TradeId);
+            BinaryPrimitives.WriteDoubleLittleEndian(span.Slice(32), price);
+            BinaryPrimitives.WriteDoubleLittleEndian(span.Slice(40), qty);
+            Encoding.ASCII.GetBytes(trade.Symbol, span.Slice(48, SymbolSize));
+            return true;
+        }
+    }
+}
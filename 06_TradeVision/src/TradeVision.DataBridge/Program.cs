@@ -9,6 +9,10 @@ namespace TradeVision.DataBridge
         private static PublisherSocket? _pubSocket;
         private static bool _running = true;
 
+        // TRADEVISION_WIRE_FORMAT=bin publishes compact binary frames on "trade.bin" instead of raw JSON on "trade"
+        private static readonly bool _binaryFrames = Environment.GetEnvironmentVariable("TRADEVISION_WIRE_FORMAT") == "bin";
+        private static readonly byte[] _frame = new byte[TradeFrame.Size];
+
         static async Task Main(string[] args)
         {
             Console.Title = "TradeVision DataBridge (C# Core)";
@@ -19,7 +23,7 @@ namespace TradeVision.DataBridge
             using (_pubSocket = new PublisherSocket())
             {
                 _pubSocket.Bind("tcp://*:5555");
-                Log("ZMQ", "Publisher Ready. Waiting for data...");
+                Log("ZMQ", $"Publisher Ready ({(_binaryFrames ? "binary, topic 'trade.bin'" : "JSON, topic 'trade'")}). Waiting for data...");
 
                 // 2. Setup Binance Stream
                 var binance = new BinanceStream(OnMarketDataReceived, msg => Log("BINANCE", msg));
@@ -65,6 +69,15 @@ namespace TradeVision.DataBridge
             // HOWEVER, if we want "Luna Logic", maybe we parse to ensure validity?
             // Let's do Pass-Through for maximum speed (Zero Serialization Overhead in C#).
             
+            // Binary mode: parse once here so Python skips UTF-8 decode + JSON parse (see Core/TradeFrame.cs).
+            // Receives are sequential, so the frame buffer is reused.
+            if (_binaryFrames)
+            {
+                if (TradeFrame.TryEncode(rawJson, _frame))
+                    _pubSocket?.SendMoreFrame(TradeFrame.Topic).SendFrame(_frame);
+                return Task.CompletedTask;
+            }
+
             // We publish with a topic.
             // Topic: "trade"
             _pubSocket?.SendMoreFrame("trade").SendFrame(rawJson);
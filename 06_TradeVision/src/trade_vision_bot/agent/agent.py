@@ -1,153 +1,267 @@
-import time
-import os
-import requests
-from strategies.technical_strategy import TechnicalStrategy
-from infra.supabase_client import SupabaseLogger
-from infra.telegram_client import TelegramClient
-
-class TradeAnalystAgent:
-    def __init__(self):
-        print("[\033[92mAGENT\033[0m] TradeVision Analyst v2.1 (News Intelligence Active)")
-        
-        # Tools
-        self.strategy = TechnicalStrategy() 
-        self.memory = SupabaseLogger()
-        self.voice = TelegramClient()
-        
-        # News Intelligence Check
-        self.panic_token = os.getenv("CRYPTOPANIC_TOKEN")
-        if not self.panic_token:
-            print("[\033[91mERR\033[0m] CRYPTOPANIC_TOKEN not found in .env. Sentiment Engine failed.")
-        else:
-            print("[\033[94mSENTIMENT\033[0m] CryptoPanic API Connected (Real-time News)")
-
-        # State
-        self.last_decision_time = 0
-        self.decision_interval = 300.0 # 5 Minutes cooldown
-
-    def fetch_market_sentiment(self):
-        """
-        Capa 2 (IA/Sentimiento): Fetches and analyzes news from CryptoPanic.
-        Returns a score (int) and the most relevant headline.
-        """
-        if not self.panic_token:
-            return 0.0, "Sentiment Engine Offline (Missing Token)"
-        
-        try:
-            url = f"https://cryptopanic.com/api/v1/posts/?auth_token={self.panic_token}&kind=news"
-            response = requests.get(url, timeout=10)
-            if response.status_code != 200:
-                return 0.0, "API Connection Error"
-            
-            data = response.json()
-            posts = data.get('results', [])[:10] # Last 10 posts
-            
-            pos_words = ['etf', 'growth', 'support', 'accumulation', 'bullish', 'adoption', 'sec approval', 'pumping', 'positive']
-            neg_words = ['lawsuit', 'hack', 'fed', 'resistance', 'dump', 'bearish', 'scam', 'crash', 'regulation', 'fud', 'negative']
-            
-            score = 0.0
-            best_headline = "No relevant news found"
-            found_relevant = False
-            
-            for post in posts:
-                title = post.get('title', '').lower()
-                p_hits = sum(1 for w in pos_words if w in title)
-                n_hits = sum(1 for w in neg_words if w in title)
-                
-                # Heuristic: +1 point if title is overall positive, -1 if negative
-                if p_hits > n_hits: score += 1
-                elif n_hits > p_hits: score -= 1
-                
-                # Capture the first significant headline found
-                if (p_hits + n_hits) > 0 and not found_relevant:
-                    best_headline = post.get('title')
-                    found_relevant = True
-                    
-            return score, best_headline
-
-        except Exception as e:
-            return 0.0, f"Fetch Error: {str(e)}"
-
-    def process_tick(self, market_data: dict):
-        """
-        Main Agentic Loop for a single Tick.
-        Architecture: Layers (Technical -> Sentiment Filter -> Message Gen)
-        """
-        try:
-            # 1. Parse Data
-            symbol = market_data.get('s', 'UNKNOWN')
-            price = float(market_data.get('p', '0'))
-            
-            # 2. Update Technical State (Layer 1)
-            self.strategy.update(price)
-            tech_analysis = self.strategy.evaluate()
-            
-            # 3. Filter for initialization
-            if tech_analysis["signal"] == "WAIT":
-                return
-
-            # 4. Cooldown
-            now = time.time()
-            if now - self.last_decision_time < self.decision_interval:
-                return
-            
-            self.last_decision_time = now
-
-            # 5. Layer 2: Real News Sentiment Analysis
-            sentiment_score, headline = self.fetch_market_sentiment()
-
-            # Consensus & Risk Evaluation
-            final_signal = tech_analysis["signal"]
-            confidence = 0.75
-            risk_level = "MODERADO"
-            
-            # LOGIC: Filter BUYS via Sentiment
-            if final_signal == "BUY":
-                if sentiment_score < -0.5: # Negative bias in news
-                    final_signal = "HOLD"
-                    risk_level = "ALTO (Bloqueo por Noticias)"
-                    confidence = 0.0
-                elif sentiment_score > 0.5: # Positive bias
-                    risk_level = "BAJO"
-                    confidence = 0.95
-            
-            elif final_signal == "SELL":
-                # Sell confidence increases if sentiment is also negative
-                if sentiment_score < -0.5:
-                    risk_level = "BAJO"
-                    confidence = 0.90
-                else:
-                    risk_level = "MODERADO"
-                    confidence = 0.70
-
-            # 6. Act (Execute & Notify)
-            if final_signal != "HOLD":
-                 self._execute_decision(symbol, price, final_signal, confidence, tech_analysis, sentiment_score, headline, risk_level)
-
-        except Exception as e:
-            print(f"[\033[91mERR\033[0m] Agent Brain Fault: {e}")
-
-    def _execute_decision(self, symbol, price, signal, confidence, tech_data, sent_score, headline, risk):
-        # Console Output
-        color = "\033[92m" if signal == "BUY" else "\033[91m"
-        print(f"[\033[92mDECISION\033[0m] {symbol} @ {price}: {color}{signal}\033[0m [Sent:{sent_score}] [Risk:{risk}]")
-
-        # Persistence (Supabase)
-        full_reasoning = f"Tech: {tech_data['trend']} (RSI {tech_data['rsi']:.1f}) | News Score: {sent_score} | Headline: {headline}"
-        self.memory.log_decision(symbol, price, signal, confidence, full_reasoning)
-
-        # Telegram Alert (Structured Spanish)
-        sent_label = "Positivo" if sent_score > 0 else "Negativo" if sent_score < 0 else "Neutral"
-        msg = (
-            f"🚀 *TradeVision Alert*\n\n"
-            f"📊 *Datos Técnicos:*\n"
-            f"• RSI: {tech_data['rsi']:.1f}\n"
-            f"• Tendencia: {tech_data['trend']}\n\n"
-            f"🧠 *Filtro de IA:*\n"
-            f"• Sentimiento: {sent_label} ({sent_score})\n"
-            f"• Riesgo: {risk}\n"
-            f"• Noticia clave: {headline}\n\n"
-            f"✅ *Decisión Final:*\n"
-            f"• Acción: {signal} ({confidence*100:.0f}%)"
-        )
-        self.voice.send_alert(msg)
+import time
+import os
+from functools import partial
+from core.bars import BarAggregator
+from core.tick import Tick
+from agent.symbol_book import SymbolBook
+from agent.snapshot import Snapshotter, load_snapshot
+from infra.supabase_client import SupabaseLogger
+from infra.telegram_client import TelegramClient
+from sentiment.news_service import SentimentService
+from sentiment.scorer import DEFAULT_LEXICON, DecayingSentiment, KeywordMatcher, load_lexicon
+from strategies.ensemble import STRATEGIES, EnsembleProfile, ensemble_factory
+from strategies.multi_timeframe import MultiTimeframeStrategy
+from strategies.technical_strategy import TechnicalStrategy
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "strategy_state.bin")
+
+class TradeAnalystAgent:
+    def __init__(self, memory=None, voice=None, sentiment=None, clock=time.time, bar_spec=None, latency=None,
+                 timeframes=None, ensemble=None):
+        """
+        memory / voice / sentiment default to Supabase, Telegram and CryptoPanic;
+        the backtester injects stubs plus an event-time `clock`.
+        bar_spec (or TRADEVISION_BARS), e.g. "1m", "vol:25", "ticks:500": strategies
+        update once per closed OHLCV bar instead of on every trade.
+        latency: optional LatencyMonitor (receive -> evaluated -> notified).
+        timeframes (or TRADEVISION_TIMEFRAMES), e.g. "1m,5m,1h": Layer 1 runs
+        TechnicalStrategy on every timeframe from one base-bar stream and only
+        signals when they agree (TRADEVISION_TIMEFRAME_AGREEMENT: trend|signal).
+        ensemble (or TRADEVISION_ENSEMBLE), e.g. "technical:1,sma:0.5": Layer 1
+        is a weighted vote of several strategies over one shared indicator state
+        (TRADEVISION_ENSEMBLE_THRESHOLD); "mtf" adds the multi-timeframe strategy.
+        """
+        print("[\033[92mAGENT\033[0m] TradeVision Analyst v2.1 (News Intelligence Active)")
+        
+        # Tools
+        # Per-symbol strategy state + cooldowns (Layer 1)
+        timeframes = timeframes or os.getenv("TRADEVISION_TIMEFRAMES")
+        ensemble = ensemble or os.getenv("TRADEVISION_ENSEMBLE")
+        strategy_factory = TechnicalStrategy
+        multi_timeframe = partial(MultiTimeframeStrategy, timeframes or "1m,5m,1h",
+                                  agreement=os.getenv("TRADEVISION_TIMEFRAME_AGREEMENT", "trend"), clock=clock)
+        self.ensemble_profile = None
+        if ensemble:
+            self.ensemble_profile = EnsembleProfile(int(os.getenv("TRADEVISION_ENSEMBLE_SAMPLE", "64")))
+            strategy_factory = ensemble_factory(ensemble, float(os.getenv("TRADEVISION_ENSEMBLE_THRESHOLD", "0.5")),
+                                                profile=self.ensemble_profile,
+                                                registry=dict(STRATEGIES, mtf=multi_timeframe))
+            print(f"[\033[92mAGENT\033[0m] Layer 1 ensemble: {ensemble}")
+        elif timeframes:
+            strategy_factory = multi_timeframe
+            print(f"[\033[92mAGENT\033[0m] Layer 1 requires agreement across {timeframes}")
+        strategy_factory()  # Fail fast on a bad spec
+        self.book = SymbolBook(strategy_factory=strategy_factory, decision_interval=300.0, clock=clock) # 5 Minutes cooldown per symbol
+        bar_spec = bar_spec or os.getenv("TRADEVISION_BARS")
+        self.bars = BarAggregator(bar_spec) if bar_spec else None
+        if self.bars:
+            print(f"[\033[92mAGENT\033[0m] Layer 1 runs on {bar_spec} bars")
+        # Warm restart: Layer 1 state is snapshotted periodically and on shutdown
+        self.snapshot_path = os.getenv("TRADEVISION_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+        self.snapshotter = Snapshotter(self.book, self.snapshot_path,
+                                       interval=float(os.getenv("TRADEVISION_SNAPSHOT_INTERVAL", "60")),
+                                       bars=self.bars)
+        self.memory = memory if memory is not None else SupabaseLogger()
+        self.voice = voice if voice is not None else TelegramClient()
+        self.sentiment = sentiment if sentiment is not None else self.fetch_market_sentiment
+        self.news = None
+        self.latency = latency
+        
+        # News Intelligence Check
+        self.panic_token = os.getenv("CRYPTOPANIC_TOKEN")
+        if sentiment is not None:
+            print("[\033[94mSENTIMENT\033[0m] Custom sentiment source injected")
+        elif not self.panic_token:
+            print("[\033[91mERR\033[0m] CRYPTOPANIC_TOKEN not found in .env. Sentiment Engine failed.")
+        else:
+            # Refreshed in the background; the tick path only reads the cached snapshot
+            self.news = SentimentService(
+                self.panic_token,
+                refresh_interval=float(os.getenv("TRADEVISION_SENTIMENT_REFRESH", "60")),
+                ttl=float(os.getenv("TRADEVISION_SENTIMENT_TTL", "300")),
+                stale_policy=os.getenv("TRADEVISION_SENTIMENT_STALE_POLICY", "neutral"),
+                scorer=DecayingSentiment(
+                    KeywordMatcher(load_lexicon(os.getenv("TRADEVISION_SENTIMENT_LEXICON", DEFAULT_LEXICON))),
+                    half_life=float(os.getenv("TRADEVISION_SENTIMENT_HALF_LIFE", "3600")),
+                ),
+            ).start()
+            print("[\033[94mSENTIMENT\033[0m] CryptoPanic API Connected (Real-time News)")
+
+    def restore_state(self, backfill=None):
+        """
+        Loads the last Layer 1 snapshot so indicators are warm immediately.
+        backfill(symbol, since_ts) -> Ticks replays a stale snapshot from a tick archive
+        (through the bar aggregator in bar mode).
+        """
+        max_age = float(os.getenv("TRADEVISION_SNAPSHOT_MAX_AGE", "900"))
+        return load_snapshot(self.book, self.snapshot_path, max_age=max_age, backfill=backfill, bars=self.bars)
+
+    def shutdown(self):
+        """In-process mode: snapshot Layer 1, then close Layers 2/3."""
+        self.save_state()
+        self.close()
+
+    def save_state(self):
+        """Layer 1 snapshot + ensemble report (sharded workers do this themselves)."""
+        saved = self.snapshotter.save()
+        print(f"[\033[93mSYS\033[0m] Layer 1 snapshot saved ({saved} symbols)")
+        if self.ensemble_profile is not None and self.ensemble_profile.samples:
+            print(self.ensemble_profile.report())
+
+    def close(self):
+        """Stops sentiment refreshes and flushes notifications/decision logs (always run on exit)."""
+        if self.news is not None:
+            self.news.stop()
+        if hasattr(self.voice, "close"):
+            self.voice.close()
+        if hasattr(self.memory, "close"):
+            self.memory.close()
+
+    def fetch_market_sentiment(self):
+        """
+        Capa 2 (IA/Sentimiento): latest CryptoPanic score and most relevant headline.
+        Reads the background SentimentService snapshot; never blocks on the network.
+        """
+        if self.news is None:
+            return 0.0, "Sentiment Engine Offline (Missing Token)"
+        return self.news.current()
+
+    def process_tick(self, market_data):
+        """
+        Main Agentic Loop for a single Tick.
+        Architecture: Layers (Technical -> Sentiment Filter -> Message Gen)
+        market_data: a decoded Tick (fast path) or a raw Binance trade dict.
+        """
+        try:
+            # 1. Parse Data
+            if not isinstance(market_data, Tick):
+                market_data = Tick.from_dict(market_data)
+            symbol = market_data.symbol
+            price = market_data.price
+
+            # Bar mode: only a closed bar reaches the strategy
+            if self.bars is not None:
+                self._close_quiet_bars()
+                bar = self.bars.update(symbol, price, market_data.qty,
+                                       market_data.trade_time or market_data.event_time)
+                if bar is None:
+                    return
+                price = bar.close
+            
+            # 2. Update Technical State (Layer 1)
+            tech_analysis = self.book.on_tick(symbol, price)
+            evaluated_at = self.latency.evaluated(market_data) if self.latency is not None else None
+            if tech_analysis is not None:
+                self.decide(symbol, price, tech_analysis, evaluated_at)
+            self.snapshotter.maybe_save()
+
+        except Exception as e:
+            print(f"[\033[91mERR\033[0m] Agent Brain Fault: {e}")
+
+    def process_batch(self, ticks: list):
+        """
+        Micro-batch variant of process_tick: each symbol's strategy ingests its
+        prices in one pass and signals are evaluated once per symbol per batch.
+        """
+        if not ticks:
+            return
+        try:
+            ticks = [t if isinstance(t, Tick) else Tick.from_dict(t) for t in ticks]
+            if self.bars is not None:
+                self._close_quiet_bars()
+                # Bar closes carry .symbol and .close instead of .price
+                points = [(b.symbol, b.close) for b in self.bars.update_many(ticks)]
+            else:
+                points = [(t.symbol, t.price) for t in ticks]
+
+            by_symbol = {}
+            for symbol, price in points:
+                prices = by_symbol.get(symbol)
+                if prices is None:
+                    prices = by_symbol[symbol] = []
+                prices.append(price)
+
+            signals = []
+            for symbol, prices in by_symbol.items():
+                tech_analysis = self.book.on_prices(symbol, prices)
+                if tech_analysis is not None:
+                    signals.append((symbol, prices[-1], tech_analysis))
+            evaluated_at = self.latency.evaluated_batch(ticks) if self.latency is not None else None
+
+            for symbol, price, tech_analysis in signals:
+                self.decide(symbol, price, tech_analysis, evaluated_at)
+            self.snapshotter.maybe_save()
+
+        except Exception as e:
+            print(f"[\033[91mERR\033[0m] Agent Brain Fault: {e}")
+
+    def _close_quiet_bars(self):
+        """Time bars of symbols that stopped trading still close once their interval is over."""
+        for bar in self.bars.expire(self.book.clock()):
+            tech_analysis = self.book.on_tick(bar.symbol, bar.close)
+            if tech_analysis is not None:
+                self.decide(bar.symbol, bar.close, tech_analysis)
+
+    def decide(self, symbol: str, price: float, tech_analysis: dict, evaluated_at: float = None):
+        """
+        Layers 2-3 (sentiment filter, risk, notify) for a technical signal that
+        already passed warm-up and cooldown. Also the entry point for signals
+        coming back from sharded workers.
+        """
+        # 5. Layer 2: Real News Sentiment Analysis
+        sentiment_score, headline = self.sentiment()
+
+        # Consensus & Risk Evaluation
+        final_signal = tech_analysis["signal"]
+        confidence = 0.75
+        risk_level = "MODERADO"
+        
+        # LOGIC: Filter BUYS via Sentiment
+        if final_signal == "BUY":
+            if sentiment_score < -0.5: # Negative bias in news
+                final_signal = "HOLD"
+                risk_level = "ALTO (Bloqueo por Noticias)"
+                confidence = 0.0
+            elif sentiment_score > 0.5: # Positive bias
+                risk_level = "BAJO"
+                confidence = 0.95
+        
+        elif final_signal == "SELL":
+            # Sell confidence increases if sentiment is also negative
+            if sentiment_score < -0.5:
+                risk_level = "BAJO"
+                confidence = 0.90
+            else:
+                risk_level = "MODERADO"
+                confidence = 0.70
+
+        # 6. Act (Execute & Notify)
+        if final_signal != "HOLD":
+             self._execute_decision(symbol, price, final_signal, confidence, tech_analysis, sentiment_score, headline, risk_level)
+             if evaluated_at is not None and self.latency is not None:
+                 self.latency.notified(evaluated_at)
+
+    def _execute_decision(self, symbol, price, signal, confidence, tech_data, sent_score, headline, risk):
+        # Console Output
+        color = "\033[92m" if signal == "BUY" else "\033[91m"
+        print(f"[\033[92mDECISION\033[0m] {symbol} @ {price}: {color}{signal}\033[0m [Sent:{sent_score}] [Risk:{risk}]")
+
+        # Persistence (Supabase)
+        full_reasoning = f"Tech: {tech_data['trend']} (RSI {tech_data['rsi']:.1f}) | News Score: {sent_score} | Headline: {headline}"
+        self.memory.log_decision(symbol, price, signal, confidence, full_reasoning)
+
+        # Telegram Alert (Structured Spanish)
+        sent_label = "Positivo" if sent_score > 0 else "Negativo" if sent_score < 0 else "Neutral"
+        msg = (
+            f"🚀 *TradeVision Alert*\n\n"
+            f"📊 *Datos Técnicos:*\n"
+            f"• RSI: {tech_data['rsi']:.1f}\n"
+            f"• Tendencia: {tech_data['trend']}\n\n"
+            f"🧠 *Filtro de IA:*\n"
+            f"• Sentimiento: {sent_label} ({sent_score})\n"
+            f"• Riesgo: {risk}\n"
+            f"• Noticia clave: {headline}\n\n"
+            f"✅ *Decisión Final:*\n"
+            f"• Acción: {signal} ({confidence*100:.0f}%)"
+        )
+        self.voice.send_alert(msg)
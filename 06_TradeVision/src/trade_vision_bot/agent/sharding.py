@@ -0,0 +1,225 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+import zlib
+from typing import Callable, List
+
+from agent.snapshot import Snapshotter, load_snapshot
+from agent.symbol_book import SymbolBook
+from core.bars import BarAggregator
+from core.latency import LogHistogram
+from core.tick import Tick
+from strategies.technical_strategy import TechnicalStrategy
+
+_STOP = None
+# Result queue message kinds
+_SIGNAL = 0
+_STATS = 1
+# Seconds between worker stats reports (processed count + receive->evaluated histogram)
+STATS_INTERVAL = 1.0
+
+
+def shard_for(symbol: str, shards: int) -> int:
+    """Stable symbol -> shard mapping (crc32; builtin hash() is salted per process)."""
+    return zlib.crc32(symbol.encode()) % shards
+
+
+def _worker_main(shard: int, shards: int, in_queue, out_queue, strategy_factory, decision_interval: float,
+                 snapshot: dict = None, bar_spec: str = None):
+    """
+    Worker process: owns the SymbolBook for its symbols. Each message is a list of
+    (symbol, price, qty, ts, recv_time) in arrival order; signals that pass warm-up and
+    cooldown are sent back as (_SIGNAL, symbol, price, tech_analysis, evaluated_at).
+    Every STATS_INTERVAL seconds (and on stop) the worker reports
+    (_STATS, shard, processed, receive->evaluated histogram since the last report),
+    which the pool merges into the main process's LatencyMonitor. With `snapshot` set, the worker
+    restores its symbols on start and writes its own `<path>.<shard>` file periodically
+    and on stop. With `bar_spec` set, the worker aggregates its symbols' bars and the
+    strategies only see bar closes.
+    """
+    book = SymbolBook(strategy_factory=strategy_factory, decision_interval=decision_interval)
+    bars = BarAggregator(bar_spec) if bar_spec else None
+    snapshotter = None
+    if snapshot:
+        mine = lambda symbol: shard_for(symbol, shards) == shard
+        load_snapshot(book, snapshot["path"], max_age=snapshot.get("max_age", 900.0),
+                      backfill=snapshot.get("backfill"), accept=mine, bars=bars)
+        snapshotter = Snapshotter(book, f"{snapshot['path']}.{shard}",
+                                  interval=snapshot.get("interval", 60.0), accept=mine, bars=bars)
+    processed = reported = 0
+    histogram = LogHistogram()
+    next_report = time.monotonic() + STATS_INTERVAL
+    while True:
+        try:
+            # Wake up now and then so quiet symbols' time bars close and idle workers still report
+            batch = in_queue.get(timeout=STATS_INTERVAL)
+        except queue.Empty:
+            batch = []
+        if batch is _STOP:
+            if snapshotter:
+                snapshotter.save()
+            out_queue.put((_STATS, shard, processed, histogram))
+            break
+        if snapshotter:
+            snapshotter.maybe_save()
+        if time.monotonic() >= next_report:
+            if processed != reported:
+                out_queue.put((_STATS, shard, processed, histogram))
+                histogram = LogHistogram()
+                reported = processed
+            next_report = time.monotonic() + STATS_INTERVAL
+        ticks = batch
+        processed += len(ticks)
+        try:
+            if bars is not None:
+                closed = bars.expire(time.time())
+                closed.extend(bar for bar in (bars.update(symbol, price, qty, ts)
+                                              for symbol, price, qty, ts, _ in ticks) if bar is not None)
+                batch = [(bar.symbol, bar.close) for bar in closed]
+            else:
+                batch = [(symbol, price) for symbol, price, _, _, _ in ticks]
+            signals = []
+            if len(batch) == 1:
+                symbol, price = batch[0]
+                tech = book.on_tick(symbol, price)
+                if tech is not None:
+                    signals.append((symbol, price, tech))
+            else:
+                # Group by symbol while keeping each symbol's order
+                by_symbol = {}
+                for symbol, price in batch:
+                    prices = by_symbol.get(symbol)
+                    if prices is None:
+                        prices = by_symbol[symbol] = []
+                    prices.append(price)
+                for symbol, prices in by_symbol.items():
+                    tech = book.on_prices(symbol, prices)
+                    if tech is not None:
+                        signals.append((symbol, prices[-1], tech))
+
+            evaluated_at = time.time()
+            for _, _, _, _, recv_time in ticks:
+                if recv_time:
+                    histogram.record(int((evaluated_at - recv_time) * 1e6))
+            for symbol, price, tech in signals:
+                out_queue.put((_SIGNAL, symbol, price, dict(tech), evaluated_at))
+        except Exception as e:
+            print(f"[\033[91mERR\033[0m] Shard {shard} fault: {e}")
+
+
+class ShardedAgentPool:
+    """
+    Scales Layer 1 across cores: symbols are hash-partitioned over N worker
+    processes, each holding per-symbol strategy state. A symbol always maps to
+    the same worker and each worker has one FIFO queue fed by a single producer,
+    so per-symbol ordering is preserved. Signals come back on one result queue
+    and are handed to `on_signal` (normally TradeAnalystAgent.decide) from a
+    single aggregator thread, so sentiment and notifications stay single-threaded.
+    With `latency` set, the workers' receive->evaluated histograms are merged
+    into it and signals carry their evaluation time to on_signal.
+    Workers are spawned, not forked (as on Windows, everywhere): the pool is
+    created after the latency, sentiment and notifier threads have started, and
+    a forked child could inherit a lock one of them held. `strategy_factory`
+    and `snapshot["backfill"]` must therefore be picklable.
+    """
+
+    def __init__(self, on_signal: Callable[[str, float, dict, float], None], workers: int = 0,
+                 strategy_factory: Callable[[], object] = TechnicalStrategy,
+                 decision_interval: float = 300.0, queue_size: int = 10000, snapshot: dict = None,
+                 bar_spec: str = None, latency=None):
+        self.workers = workers or mp.cpu_count()
+        self.on_signal = on_signal
+        self.latency = latency
+        # Metrics (worker counts arrive with their STATS_INTERVAL reports)
+        self.submitted = 0
+        self.processed = [0] * self.workers
+        self.signals = 0
+        ctx = mp.get_context("spawn")
+        self.out_queue = ctx.Queue()
+        self.in_queues = [ctx.Queue(maxsize=queue_size) for _ in range(self.workers)]
+        self.processes = [
+            ctx.Process(target=_worker_main, name=f"tv-shard-{i}",
+                       args=(i, self.workers, self.in_queues[i], self.out_queue, strategy_factory,
+                             decision_interval, snapshot, bar_spec),
+                       daemon=True)
+            for i in range(self.workers)
+        ]
+        self._aggregator = threading.Thread(target=self._aggregate, name="tv-shard-aggregator", daemon=True)
+        self._closed = False
+
+    def start(self):
+        for p in self.processes:
+            p.start()
+        self._aggregator.start()
+        print(f"[\033[92mAGENT\033[0m] Sharded Layer 1 active: {self.workers} worker processes")
+        return self
+
+    def submit(self, tick: Tick):
+        self.in_queues[shard_for(tick.symbol, self.workers)].put(
+            [(tick.symbol, tick.price, tick.qty, tick.trade_time or tick.event_time, tick.recv_time)])
+        self.submitted += 1
+
+    def submit_batch(self, ticks: List[Tick]):
+        """One IPC message per shard per batch instead of one per tick."""
+        per_shard = {}
+        n = self.workers
+        for t in ticks:
+            shard = shard_for(t.symbol, n)
+            items = per_shard.get(shard)
+            if items is None:
+                items = per_shard[shard] = []
+            items.append((t.symbol, t.price, t.qty, t.trade_time or t.event_time, t.recv_time))
+        for shard, items in per_shard.items():
+            self.in_queues[shard].put(items)
+        self.submitted += len(ticks)
+
+    def metrics(self) -> dict:
+        try:
+            depth = sum(q.qsize() for q in self.in_queues)
+        except NotImplementedError:
+            # macOS has no sem_getvalue(); the backlog is still visible as submitted - processed
+            depth = None
+        processed = sum(self.processed)
+        return {
+            "workers": self.workers,
+            "queue_depth": depth,
+            "submitted": self.submitted,
+            "processed": processed,
+            "backlog": self.submitted - processed,
+            "signals": self.signals,
+        }
+
+    def close(self, timeout: float = 5.0):
+        if self._closed:
+            return
+        self._closed = True
+        for q in self.in_queues:
+            q.put(_STOP)
+        for p in self.processes:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self.out_queue.put(_STOP)
+        self._aggregator.join(timeout)
+
+    def _aggregate(self):
+        while True:
+            try:
+                item = self.out_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                return
+            if item[0] == _STATS:
+                _, shard, processed, histogram = item
+                self.processed[shard] = processed
+                if self.latency is not None:
+                    self.latency.histograms["receive_to_evaluated"].merge(histogram)
+                continue
+            _, symbol, price, tech, evaluated_at = item
+            self.signals += 1
+            try:
+                self.on_signal(symbol, price, tech, evaluated_at)
+            except Exception as e:
+                print(f"[\033[91mERR\033[0m] Agent Brain Fault: {e}")
@@ -0,0 +1,229 @@
+"""
+Warm restart for Layer 1: per-symbol strategy state (EMA/RSI accumulators,
+price ring buffers, warm-up counters) plus decision cooldowns, saved as one
+compact binary file.
+
+Layout (little endian):
+    header  : magic b"TVSS", format version (H), symbol count (I), saved_at (d),
+              bar spec (B len + ascii, empty without bars)
+    record  : symbol (H len + utf-8), strategy class (B len + ascii),
+              strategy STATE_VERSION (H), last_decision_time (d),
+              state (I len + strategy.pack_state() bytes),
+              open bar flag (B) + open bar (5d 3q) in bar mode
+
+Records whose strategy class or state version does not match the running
+code are skipped (that symbol simply warms up again), so layout changes never
+load garbage into an indicator. Open bars are only restored into an
+aggregator with the same bar spec. Version 1 files (no bars) still load.
+"""
+import glob
+import os
+import struct
+import time
+from typing import Callable, Iterable, Optional
+
+MAGIC = b"TVSS"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<4sHId")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_RECORD = struct.Struct("<Hd")  # state version, last decision time
+_BAR = struct.Struct("<dddddqqq")  # open, high, low, close, volume, trades, start_time, end_time
+
+# backfill(symbol, since_ts) -> Ticks traded after `since_ts` (seconds), in order
+Backfill = Callable[[str, float], Iterable]
+
+
+def save_snapshot(book, path: str, accept: Callable[[str], bool] = None, bars=None) -> int:
+    """
+    Writes the book's state atomically (temp file + rename), plus each symbol's
+    open bar when `bars` (a BarAggregator) is given. Returns the number of symbols saved.
+    """
+    parts = []
+    count = 0
+    for symbol, strategy in book.strategies.items():
+        if accept is not None and not accept(symbol):
+            continue
+        pack = getattr(strategy, "pack_state", None)
+        if pack is None:
+            continue
+        name = type(strategy).__name__.encode("ascii")
+        sym = symbol.encode("utf-8")
+        state = pack()
+        parts.append(_U16.pack(len(sym)) + sym + _U8.pack(len(name)) + name
+                     + _RECORD.pack(strategy.STATE_VERSION, book.last_decision_time.get(symbol, 0.0))
+                     + _U32.pack(len(state)) + state)
+        bar = bars.open_bars.get(symbol) if bars is not None else None
+        if bar is None:
+            parts.append(_U8.pack(0))
+        else:
+            parts.append(_U8.pack(1) + _BAR.pack(bar.open, bar.high, bar.low, bar.close, bar.volume,
+                                                 bar.trades, bar.start_time, bar.end_time))
+        count += 1
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        spec = bars.spec.encode("ascii") if bars is not None else b""
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, count, time.time()) + _U8.pack(len(spec)) + spec)
+        f.write(b"".join(parts))
+    os.replace(tmp, path)
+    return count
+
+
+def read_snapshot(path: str):
+    """
+    Parses a snapshot file into (saved_at, bar spec ("" = ticks, None = unknown in v1),
+    [(symbol, class name, state version, last_decision, state, open bar fields or None)]).
+    """
+    with open(path, "rb") as f:
+        buf = f.read()
+    magic, version, count, saved_at = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a strategy snapshot")
+    if version not in (1, FORMAT_VERSION):
+        raise ValueError(f"{path}: unsupported snapshot format v{version}")
+
+    offset = _HEADER.size
+    spec = None
+    if version >= 2:
+        (n,) = _U8.unpack_from(buf, offset)
+        offset += _U8.size
+        spec = buf[offset:offset + n].decode("ascii")
+        offset += n
+    records = []
+    for _ in range(count):
+        (n,) = _U16.unpack_from(buf, offset)
+        offset += _U16.size
+        symbol = buf[offset:offset + n].decode("utf-8")
+        offset += n
+        (n,) = _U8.unpack_from(buf, offset)
+        offset += _U8.size
+        name = buf[offset:offset + n].decode("ascii")
+        offset += n
+        state_version, last_decision = _RECORD.unpack_from(buf, offset)
+        offset += _RECORD.size
+        (n,) = _U32.unpack_from(buf, offset)
+        offset += _U32.size
+        state = buf[offset:offset + n]
+        if len(state) != n:
+            raise ValueError(f"{path}: truncated record for {symbol}")
+        offset += n
+        bar = None
+        if version >= 2:
+            (flag,) = _U8.unpack_from(buf, offset)
+            offset += _U8.size
+            if flag:
+                bar = _BAR.unpack_from(buf, offset)
+                offset += _BAR.size
+        records.append((symbol, name, state_version, last_decision, state, bar))
+    return saved_at, spec, records
+
+
+def snapshot_files(path: str):
+    """The main snapshot plus per-shard snapshots (`<path>.<shard>`) written by sharded workers."""
+    files = [p for p in glob.glob(f"{glob.escape(path)}.*") if p.rsplit(".", 1)[-1].isdigit()]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def load_snapshot(book, path: str, max_age: float = 900.0, backfill: Optional[Backfill] = None,
+                  accept: Callable[[str], bool] = None, bars=None) -> int:
+    """
+    Restores strategy state and cooldowns into `book` from `path` (and any
+    per-shard files next to it; the newest file wins per symbol). A snapshot
+    older than `max_age` seconds is only used if `backfill` can replay the
+    trades missed since it was written; otherwise those symbols warm up fresh.
+    In bar mode (`bars`, the live BarAggregator) open bars are restored into
+    it and the backfill is replayed through it, so strategies only see the
+    closes of the bars it completes.
+    Returns the number of symbols restored.
+    """
+    loaded = []
+    for file in snapshot_files(path):
+        try:
+            loaded.append(read_snapshot(file))
+        except (OSError, ValueError, struct.error) as e:
+            print(f"[\033[93mSYS\033[0m] Ignoring snapshot {file}: {e}")
+    loaded.sort(key=lambda item: item[0])
+
+    restored = {}
+    skipped = 0
+    unreadable = None
+    now = time.time()
+    for saved_at, spec, records in loaded:
+        stale = now - saved_at > max_age
+        if stale and backfill is None:
+            print(f"[\033[93mSYS\033[0m] Snapshot from {now - saved_at:.0f}s ago is stale and no tick archive is set; warming up fresh")
+            continue
+        running = bars.spec if bars is not None else ""
+        if spec is not None and spec != running:
+            # Closes of other bars (or raw ticks) would not mean the same thing to the indicators
+            print(f"[\033[93mSYS\033[0m] Snapshot taken on '{spec or 'ticks'}', running on '{running or 'ticks'}'; warming up fresh")
+            continue
+        for symbol, name, state_version, last_decision, state, bar in records:
+            if accept is not None and not accept(symbol):
+                continue
+            strategy = book.strategy_factory()
+            if type(strategy).__name__ != name or getattr(strategy, "STATE_VERSION", None) != state_version:
+                skipped += 1
+                continue
+            try:
+                strategy.load_state(state)
+            except (ValueError, struct.error) as e:
+                # Truncated record or one packed by another configuration: this symbol warms up fresh
+                unreadable = unreadable or f"{symbol}: {e}"
+                skipped += 1
+                continue
+            if bars is not None:
+                bars.open_bars.pop(symbol, None)
+                if bar is not None:
+                    bars.restore(symbol, bar)
+            if stale:
+                ticks = backfill(symbol, saved_at)
+                if bars is not None:
+                    closed = (bars.update(symbol, t.price, t.qty, t.trade_time or t.event_time) for t in ticks)
+                    strategy.update_many([b.close for b in closed if b is not None])
+                elif hasattr(strategy, "replay"):
+                    # Clock-bucketed strategies (multi-timeframe) rebuild their bars from the trade times
+                    strategy.replay(ticks)
+                else:
+                    strategy.update_many([t.price for t in ticks])
+            book.strategies[symbol] = strategy
+            book.last_decision_time[symbol] = last_decision
+            restored[symbol] = saved_at
+
+    if restored:
+        age = now - min(restored.values())
+        print(f"[\033[92mAGENT\033[0m] Warm restart: {len(restored)} symbols restored (snapshot age {age:.0f}s)")
+    if skipped:
+        print(f"[\033[93mSYS\033[0m] {skipped} snapshot records skipped (strategy layout or configuration changed"
+              + (f"; first unreadable: {unreadable})" if unreadable else ")"))
+    return len(restored)
+
+
+class Snapshotter:
+    """Periodic + on-demand snapshots of one SymbolBook (cheap check, call it from the tick loop)."""
+
+    def __init__(self, book, path: str, interval: float = 60.0, accept: Callable[[str], bool] = None, bars=None):
+        self.book = book
+        self.path = path
+        self.interval = interval
+        self.accept = accept
+        self.bars = bars
+        self._next = time.monotonic() + interval
+
+    def maybe_save(self):
+        if self.interval > 0 and time.monotonic() >= self._next:
+            self.save()
+
+    def save(self) -> int:
+        self._next = time.monotonic() + self.interval
+        try:
+            return save_snapshot(self.book, self.path, self.accept, self.bars)
+        except OSError as e:
+            print(f"[\033[91mERR\033[0m] Snapshot write failed: {e}")
+            return 0
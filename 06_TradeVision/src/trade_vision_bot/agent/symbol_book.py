@@ -0,0 +1,50 @@
+import time
+from typing import Callable, Dict, Iterable, Optional
+from strategies.technical_strategy import TechnicalStrategy
+
+class SymbolBook:
+    """
+    Layer 1 state, kept per symbol: one strategy instance and one decision
+    cooldown per traded pair, so prices from different symbols never mix.
+    Returns a technical evaluation only when it should go on to the decision
+    layers (warmed up and outside the symbol's cooldown). `clock` returns the
+    current time in seconds; backtests pass an event-time clock.
+    """
+
+    def __init__(self, strategy_factory: Callable[[], object] = TechnicalStrategy,
+                 decision_interval: float = 300.0, clock: Callable[[], float] = time.time):
+        self.strategy_factory = strategy_factory
+        self.decision_interval = decision_interval
+        self.clock = clock
+        self.strategies: Dict[str, object] = {}
+        self.last_decision_time: Dict[str, float] = {}
+
+    def strategy(self, symbol: str):
+        strategy = self.strategies.get(symbol)
+        if strategy is None:
+            strategy = self.strategies[symbol] = self.strategy_factory()
+        return strategy
+
+    def on_tick(self, symbol: str, price: float) -> Optional[dict]:
+        strategy = self.strategy(symbol)
+        strategy.update(price)
+        return self._gate(symbol, strategy.evaluate())
+
+    def on_prices(self, symbol: str, prices: Iterable[float]) -> Optional[dict]:
+        """Micro-batch: all prices of one symbol in order, one evaluation at the end."""
+        strategy = self.strategy(symbol)
+        strategy.update_many(prices)
+        return self._gate(symbol, strategy.evaluate())
+
+    def _gate(self, symbol: str, tech_analysis: dict) -> Optional[dict]:
+        # Filter for initialization
+        if tech_analysis["signal"] == "WAIT":
+            return None
+
+        # Cooldown
+        now = self.clock()
+        if now - self.last_decision_time.get(symbol, 0) < self.decision_interval:
+            return None
+
+        self.last_decision_time[symbol] = now
+        return tech_analysis
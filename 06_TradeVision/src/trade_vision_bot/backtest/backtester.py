@@ -0,0 +1,286 @@
+"""
+Event-time backtester: replays recorded ticks through the real
+TradeAnalystAgent (SymbolBook + TechnicalStrategy + decision layers) as fast
+as the CPU allows.
+
+The agent's clock follows the ticks' trade time, so the 300 s per-symbol
+cooldown behaves exactly as it would live. Sentiment, Supabase and Telegram
+are replaced with stubs; every executed decision goes to a simulated
+portfolio that reports PnL.
+
+Usage:
+    python backtest/backtester.py ticks.jsonl [more.jsonl ...] [--batch-size 1]
+    python backtest/backtester.py --synthetic 500000 --symbols 5
+    python backtest/backtester.py --store data/ticks [--only BTCUSDT,ETHUSDT]
+    python backtest/backtester.py --synthetic 2000000 --timeframes 1m,5m,15m
+    python backtest/backtester.py --synthetic 500000 --ensemble technical:1,sma:0.5
+
+Input files hold one raw Binance trade message per line (what the
+DataBridge publishes on the `trade` topic); --store replays a capture
+directory written by infra/tick_store.py.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, Iterator, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.agent import TradeAnalystAgent
+from core.tick import Tick, decode_trade
+from infra.tick_store import TickStore
+
+
+class EventClock:
+    """Injectable clock that returns the event time of the tick being replayed."""
+
+    __slots__ = ("now",)
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FixedSentiment:
+    """Stub for Layer 2: always returns the same (score, headline)."""
+
+    def __init__(self, score: float = 0.0, headline: str = "Backtest (sentiment stubbed)"):
+        self.result = (score, headline)
+
+    def __call__(self):
+        return self.result
+
+
+class NullVoice:
+    """Stub for TelegramClient: counts alerts instead of sending them."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_alert(self, formatted_message: str):
+        self.sent += 1
+
+
+class Portfolio:
+    """
+    Stub for SupabaseLogger that simulates fills: one fixed-notional position
+    per symbol, filled at the decision price, with a fee in basis points.
+    BUY goes long (covering any short); SELL closes a long, and opens a short
+    only when `allow_short` is set.
+    """
+
+    def __init__(self, clock: Callable[[], float], notional: float = 1000.0, fee_bps: float = 10.0,
+                 allow_short: bool = False):
+        self.clock = clock
+        self.notional = notional
+        self.fee = fee_bps / 10000.0
+        self.allow_short = allow_short
+        self.positions: Dict[str, tuple] = {}  # symbol -> (qty, entry price)
+        self.last_price: Dict[str, float] = {}
+        self.decisions: List[tuple] = []
+        self.realized = 0.0
+        self.fees = 0.0
+        self.trades = 0
+        self.wins = 0
+        self.equity_peak = 0.0
+        self.max_drawdown = 0.0
+
+    # SupabaseLogger interface
+    def log_decision(self, symbol: str, price: float, signal: str, confidence: float, reasoning: str):
+        self.decisions.append((self.clock(), symbol, price, signal, confidence))
+        qty, _ = self.positions.get(symbol, (0.0, 0.0))
+        if signal == "BUY":
+            if qty < 0:
+                self._close(symbol, price)
+            if qty <= 0:
+                self._open(symbol, price, self.notional / price)
+        elif signal == "SELL":
+            if qty > 0:
+                self._close(symbol, price)
+            if qty >= 0 and self.allow_short:
+                self._open(symbol, price, -self.notional / price)
+        self._mark_equity()
+
+    def _open(self, symbol: str, price: float, qty: float):
+        self.fees += abs(qty) * price * self.fee
+        self.positions[symbol] = (qty, price)
+
+    def _close(self, symbol: str, price: float):
+        qty, entry = self.positions.pop(symbol)
+        pnl = qty * (price - entry)
+        self.fees += abs(qty) * price * self.fee
+        self.realized += pnl
+        self.trades += 1
+        if pnl > 0:
+            self.wins += 1
+
+    def unrealized(self) -> float:
+        return sum(qty * (self.last_price.get(s, entry) - entry) for s, (qty, entry) in self.positions.items())
+
+    def _mark_equity(self):
+        equity = self.realized - self.fees + self.unrealized()
+        self.equity_peak = max(self.equity_peak, equity)
+        self.max_drawdown = max(self.max_drawdown, self.equity_peak - equity)
+
+    def summary(self) -> dict:
+        signals = {}
+        for _, _, _, signal, _ in self.decisions:
+            signals[signal] = signals.get(signal, 0) + 1
+        unrealized = self.unrealized()
+        return {
+            "decisions": len(self.decisions),
+            "signals": signals,
+            "closed_trades": self.trades,
+            "win_rate": self.wins / self.trades if self.trades else 0.0,
+            "open_positions": len(self.positions),
+            "realized_pnl": self.realized,
+            "unrealized_pnl": unrealized,
+            "fees": self.fees,
+            "net_pnl": self.realized + unrealized - self.fees,
+            "max_drawdown": self.max_drawdown,
+        }
+
+
+class Backtester:
+    """Wires a TradeAnalystAgent to the event clock, stubs and Portfolio, then replays ticks."""
+
+    def __init__(self, sentiment: Callable[[], tuple] = None, notional: float = 1000.0,
+                 fee_bps: float = 10.0, allow_short: bool = False, decision_interval: float = 300.0,
+                 bar_spec: str = None, timeframes: str = None, ensemble: str = None):
+        self.clock = EventClock()
+        self.portfolio = Portfolio(self.clock, notional=notional, fee_bps=fee_bps, allow_short=allow_short)
+        self.voice = NullVoice()
+        self.agent = TradeAnalystAgent(memory=self.portfolio, voice=self.voice,
+                                       sentiment=sentiment or FixedSentiment(), clock=self.clock,
+                                       bar_spec=bar_spec, timeframes=timeframes, ensemble=ensemble)
+        self.agent.book.decision_interval = decision_interval
+        self.agent.snapshotter.interval = 0  # never overwrite the live snapshot
+        self.ticks = 0
+        self.elapsed = 0.0
+
+    def run(self, ticks: Iterable[Tick], batch_size: int = 1) -> dict:
+        clock = self.clock
+        last_price = self.portfolio.last_price
+        agent = self.agent
+        count = 0
+        start = time.perf_counter()
+        if batch_size <= 1:
+            for tick in ticks:
+                clock.now = (tick.trade_time or tick.event_time) / 1000.0
+                last_price[tick.symbol] = tick.price
+                agent.process_tick(tick)
+                count += 1
+        else:
+            batch = []
+            for tick in ticks:
+                batch.append(tick)
+                if len(batch) >= batch_size:
+                    count += self._flush(batch)
+                    batch = []
+            count += self._flush(batch)
+        self.elapsed += time.perf_counter() - start
+        self.ticks += count
+        return self.report()
+
+    def _flush(self, batch: List[Tick]) -> int:
+        if not batch:
+            return 0
+        last = batch[-1]
+        self.clock.now = (last.trade_time or last.event_time) / 1000.0
+        for tick in batch:
+            self.portfolio.last_price[tick.symbol] = tick.price
+        self.agent.process_batch(batch)
+        return len(batch)
+
+    def report(self) -> dict:
+        self.portfolio._mark_equity()
+        result = self.portfolio.summary()
+        result["ticks"] = self.ticks
+        result["seconds"] = self.elapsed
+        result["ticks_per_sec"] = self.ticks / self.elapsed if self.elapsed else 0.0
+        return result
+
+
+def read_ticks(paths: Iterable[str]) -> Iterator[Tick]:
+    """Raw trade messages, one per line; non-trade and malformed lines are skipped."""
+    for path in paths:
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    tick = decode_trade(line)
+                except ValueError:
+                    continue
+                if tick is not None:
+                    yield tick
+
+
+def synthetic_ticks(n: int, symbols: int = 3, seed: int = 7, step_ms: int = 100) -> Iterator[Tick]:
+    """Random-walk trades for quick runs without a recording."""
+    import random
+    rnd = random.Random(seed)
+    names = [f"SYM{i}USDT" for i in range(symbols)]
+    prices = [100.0 * (i + 1) for i in range(symbols)]
+    ts = 1700000000000
+    for i in range(n):
+        s = rnd.randrange(symbols)
+        prices[s] *= 1.0 + rnd.gauss(0, 0.001)
+        ts += step_ms
+        yield Tick(names[s], prices[s], 1.0, i, ts, ts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="recorded trade messages (JSONL)")
+    parser.add_argument("--synthetic", type=int, default=0, help="replay N random-walk ticks instead of files")
+    parser.add_argument("--store", help="replay a tick store capture directory instead of files")
+    parser.add_argument("--only", help="comma-separated symbols to replay from --store")
+    parser.add_argument("--symbols", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--sentiment", type=float, default=0.0, help="constant Layer 2 score")
+    parser.add_argument("--notional", type=float, default=1000.0)
+    parser.add_argument("--fee-bps", type=float, default=10.0)
+    parser.add_argument("--allow-short", action="store_true")
+    parser.add_argument("--cooldown", type=float, default=300.0, help="per-symbol decision interval (s)")
+    parser.add_argument("--bars", help="bar spec for Layer 1 (1s, 1m, 5m, vol:25, ticks:500)")
+    parser.add_argument("--timeframes", help="multi-timeframe Layer 1, e.g. 1m,5m,1h")
+    parser.add_argument("--ensemble", help="weighted strategy ensemble, e.g. technical:1,sma:0.5")
+    parser.add_argument("--verbose", action="store_true", help="print every decision like the live agent")
+    args = parser.parse_args()
+    if not args.files and not args.synthetic and not args.store:
+        parser.error("give tick files, --store DIR or --synthetic N")
+
+    bt = Backtester(sentiment=FixedSentiment(args.sentiment), notional=args.notional, fee_bps=args.fee_bps,
+                    allow_short=args.allow_short, decision_interval=args.cooldown, bar_spec=args.bars,
+                    timeframes=args.timeframes, ensemble=args.ensemble)
+    if not args.verbose:
+        # Decision lines and alert formatting would dominate the runtime on long replays
+        bt.agent._execute_decision = _quiet_execute(bt.agent)
+    if args.store:
+        ticks = TickStore(args.store).ticks(args.only.split(",") if args.only else None)
+    elif args.synthetic:
+        ticks = synthetic_ticks(args.synthetic, args.symbols)
+    else:
+        ticks = read_ticks(args.files)
+    result = bt.run(ticks, batch_size=args.batch_size)
+
+    print("\n=== Backtest ===")
+    print(f"ticks          : {result['ticks']:,} in {result['seconds']:.2f}s ({result['ticks_per_sec']:,.0f} ticks/s)")
+    print(f"decisions      : {result['decisions']} {result['signals']}")
+    print(f"closed trades  : {result['closed_trades']} (win rate {result['win_rate'] * 100:.1f}%), open: {result['open_positions']}")
+    print(f"PnL            : realized {result['realized_pnl']:+.2f} | unrealized {result['unrealized_pnl']:+.2f} | fees {result['fees']:.2f}")
+    print(f"net PnL        : {result['net_pnl']:+.2f} (max drawdown {result['max_drawdown']:.2f})")
+    if bt.agent.ensemble_profile is not None:
+        print(bt.agent.ensemble_profile.report())
+
+
+def _quiet_execute(agent):
+    def execute(symbol, price, signal, confidence, tech_data, sent_score, headline, risk):
+        agent.memory.log_decision(symbol, price, signal, confidence, "")
+    return execute
+
+
+if __name__ == "__main__":
+    main()
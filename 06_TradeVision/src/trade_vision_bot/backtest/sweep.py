@@ -0,0 +1,480 @@
+"""
+Parameter sweep for the technical strategies over historical ticks.
+
+Every parameter set is scored with the same cooldown and simulated
+portfolio as backtest/backtester.py. With the default parameters, the
+sweep reproduces the backtester's numbers (per-tick mode, sentiment 0),
+but it never replays ticks one by one:
+  * indicators are computed once per (symbol, period) with the vectorized
+    kernels (strategies/vectorized.py) and cached inside each worker;
+  * the 300 s cooldown only depends on time, so the decision ticks are found
+    first and the strategy rules are evaluated only at those positions;
+  * price/time columns live in one shared memory block that the worker
+    processes map, instead of each receiving a pickled copy.
+
+Parameters (defaults = the values hard-coded in the strategies):
+    technical: ema_fast ema_slow rsi_period buy_low buy_high sell_low sell_high
+               overbought oversold decision_interval
+    sma:       short_window long_window decision_interval
+A value spec is a list (10,20,30) or an inclusive range (start:stop:step).
+--random N samples N sets instead of the full grid; ranges are then sampled
+uniformly (start:stop). The default set is always included as a baseline.
+
+Usage:
+    python backtest/sweep.py --store data/ticks -p ema_fast=10:30:5 -p rsi_period=7,14,21 --rank net_pnl,-max_drawdown
+    python backtest/sweep.py ticks.jsonl --strategy sma -p short_window=5:20:5 -p long_window=30:100:10
+    python backtest/sweep.py --synthetic 500000 --random 200 -p oversold=20:35 -p overbought=65:80 --workers 4
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest.backtester import EventClock, Portfolio, read_ticks, synthetic_ticks
+from infra.tick_store import TickStore
+from strategies.vectorized import BUY, SELL, ema, sma, sma_rules, technical_rules, wilder_rsi
+
+DEFAULTS = {
+    "technical": {"ema_fast": 20, "ema_slow": 200, "rsi_period": 14, "buy_low": 40.0, "buy_high": 70.0,
+                  "sell_low": 30.0, "sell_high": 60.0, "overbought": 70.0, "oversold": 30.0,
+                  "decision_interval": 300.0},
+    "sma": {"short_window": 10, "long_window": 50, "decision_interval": 300.0},
+}
+METRICS = ("net_pnl", "max_drawdown", "pnl_per_drawdown", "win_rate", "closed_trades", "decisions", "fees")
+
+# Indicator arrays kept per worker; tasks are ordered so neighbours share periods
+_CACHE_ENTRIES = 48
+
+
+# --- Shared price history ---------------------------------------------------------
+
+class SharedHistory:
+    """
+    Tick columns of all symbols in one shared memory block:
+    ts (float64 seconds, as the backtester's clock), price (float64) and seq
+    (int64, position in the merged replay order). Symbol i owns rows
+    offsets[i]:offsets[i + 1].
+    """
+
+    COLUMNS = (("ts", np.float64), ("price", np.float64), ("seq", np.int64))
+
+    def __init__(self, shm: shared_memory.SharedMemory, names: List[str], offsets: List[int], owner: bool):
+        self.shm = shm
+        self.names = names
+        self.offsets = offsets
+        self.owner = owner
+        rows = offsets[-1]
+        self.columns = {}
+        for i, (name, dtype) in enumerate(self.COLUMNS):
+            self.columns[name] = np.ndarray((rows,), dtype=dtype, buffer=shm.buf, offset=i * rows * 8)
+
+    @classmethod
+    def create(cls, per_symbol: Dict[str, Dict[str, np.ndarray]]) -> "SharedHistory":
+        names = sorted(per_symbol)
+        offsets = [0]
+        for name in names:
+            offsets.append(offsets[-1] + per_symbol[name]["ts"].size)
+        shm = shared_memory.SharedMemory(create=True, size=max(offsets[-1] * 8 * len(cls.COLUMNS), 1))
+        history = cls(shm, names, offsets, owner=True)
+        for i, name in enumerate(names):
+            for column in history.columns:
+                history.columns[column][offsets[i]:offsets[i + 1]] = per_symbol[name][column]
+        return history
+
+    @classmethod
+    def attach(cls, meta: dict) -> "SharedHistory":
+        return cls(shared_memory.SharedMemory(name=meta["name"]), meta["names"], meta["offsets"], owner=False)
+
+    def meta(self) -> dict:
+        return {"name": self.shm.name, "names": self.names, "offsets": self.offsets}
+
+    def symbol(self, i: int):
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return self.columns["ts"][lo:hi], self.columns["price"][lo:hi], self.columns["seq"][lo:hi]
+
+    def close(self):
+        self.columns = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def load_history(files: Iterable[str] = (), store: Optional[str] = None, only: Optional[List[str]] = None,
+                 synthetic: int = 0, symbols: int = 3) -> Dict[str, Dict[str, np.ndarray]]:
+    """symbol -> {"ts", "price", "seq"} arrays, in the order the backtester would replay them."""
+    if store:
+        store = TickStore(store)
+        parts = {}
+        for symbol in only or store.symbols():
+            views = list(store.read(symbol))
+            if views:
+                parts[symbol] = (np.concatenate([v["ts"] for v in views]), np.concatenate([v["price"] for v in views]))
+        if not parts:
+            return {}
+        # Same merge as TickStore.ticks(): stable sort on time over the symbols in order
+        all_ts = np.concatenate([ts for ts, _ in parts.values()])
+        seq = np.empty(all_ts.size, dtype=np.int64)
+        seq[np.argsort(all_ts, kind="stable")] = np.arange(all_ts.size)
+        out, start = {}, 0
+        for symbol, (ts, price) in parts.items():
+            out[symbol] = {"ts": ts / 1000.0, "price": price.astype(np.float64), "seq": seq[start:start + ts.size]}
+            start += ts.size
+        return out
+
+    ticks = synthetic_ticks(synthetic, symbols) if synthetic else read_ticks(files)
+    cols: Dict[str, tuple] = {}
+    for seq, tick in enumerate(ticks):
+        c = cols.get(tick.symbol)
+        if c is None:
+            c = cols[tick.symbol] = ([], [], [])
+        c[0].append((tick.trade_time or tick.event_time) / 1000.0)
+        c[1].append(tick.price)
+        c[2].append(seq)
+    return {s: {"ts": np.array(c[0]), "price": np.array(c[1]), "seq": np.array(c[2], dtype=np.int64)}
+            for s, c in cols.items()}
+
+
+# --- Evaluation (worker side) -----------------------------------------------------
+
+_history: Optional[SharedHistory] = None
+_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+
+def _init_worker(meta: dict):
+    global _history
+    _history = SharedHistory.attach(meta)
+    _cache.clear()
+
+
+def _indicator(kind: str, symbol: int, period: int) -> np.ndarray:
+    key = (kind, symbol, period)
+    values = _cache.get(key)
+    if values is not None:
+        _cache.move_to_end(key)
+        return values
+    prices = _history.symbol(symbol)[1]
+    values = {"ema": ema, "sma": sma, "rsi": wilder_rsi}[kind](prices, period)
+    _cache[key] = values
+    if len(_cache) > _CACHE_ENTRIES:
+        _cache.popitem(last=False)
+    return values
+
+
+def decision_points(ts: np.ndarray, start: int, interval: float) -> np.ndarray:
+    """
+    Rows where SymbolBook's cooldown lets a (non-WAIT) evaluation through,
+    given that every row from `start` on is past warm-up. Uses the same float
+    comparison as SymbolBook (now - last < interval), last starting at 0.
+    """
+    n = ts.size
+    if start >= n:
+        return np.empty(0, dtype=np.int64)
+    if interval <= 0:
+        return np.arange(start, n)
+    rows = []
+    i, last = start, 0.0
+    while True:
+        # First row >= i with ts - last >= interval
+        j = max(int(np.searchsorted(ts, last + interval, "left")), i)
+        while j > i and ts[j - 1] - last >= interval:
+            j -= 1
+        while j < n and ts[j] - last < interval:
+            j += 1
+        if j >= n:
+            break
+        rows.append(j)
+        last = ts[j]
+        i = j + 1
+    return np.array(rows, dtype=np.int64)
+
+
+def _symbol_signals(strategy: str, params: dict, symbol: int):
+    ts, prices, _ = _history.symbol(symbol)
+    if strategy == "technical":
+        start = int(params["ema_slow"]) - 1
+        rows = decision_points(ts, start, params["decision_interval"])
+        signal, _ = technical_rules(
+            _indicator("ema", symbol, int(params["ema_fast"]))[rows],
+            _indicator("ema", symbol, int(params["ema_slow"]))[rows],
+            _indicator("rsi", symbol, int(params["rsi_period"]))[rows],
+            (params["buy_low"], params["buy_high"]), (params["sell_low"], params["sell_high"]),
+            params["overbought"], params["oversold"])
+    else:
+        start = int(params["long_window"]) - 1
+        rows = decision_points(ts, start, params["decision_interval"])
+        signal = sma_rules(_indicator("sma", symbol, int(params["short_window"]))[rows],
+                           _indicator("sma", symbol, int(params["long_window"]))[rows])
+    return rows, signal
+
+
+def evaluate(task) -> dict:
+    """Scores one parameter set over every symbol with the backtester's Portfolio."""
+    index, strategy, params, portfolio_args = task
+    history = _history
+    n_symbols = len(history.names)
+
+    # Executed decisions (BUY/SELL; HOLD never reaches the portfolio) across symbols
+    events = []
+    for s in range(n_symbols):
+        rows, signal = _symbol_signals(strategy, params, s)
+        act = (signal == BUY) | (signal == SELL)
+        rows, signal = rows[act], signal[act]
+        if rows.size:
+            seq = history.symbol(s)[2]
+            events.append((seq[rows], np.full(rows.size, s), rows, signal))
+
+    clock = EventClock()
+    portfolio = Portfolio(clock, **portfolio_args)
+    if events:
+        seqs = np.concatenate([e[0] for e in events])
+        order = np.argsort(seqs, kind="stable")
+        seqs = seqs[order]
+        syms = np.concatenate([e[1] for e in events])[order]
+        rows = np.concatenate([e[2] for e in events])[order]
+        signals = np.concatenate([e[3] for e in events])[order]
+        # Mark-to-market prices of every symbol at each event (last tick at or before it)
+        marks = []
+        for s in range(n_symbols):
+            ts, prices, seq = history.symbol(s)
+            at = np.searchsorted(seq, seqs, "right") - 1
+            marks.append(np.where(at >= 0, prices[np.maximum(at, 0)], np.nan).tolist())
+        names = history.names
+        last_price = portfolio.last_price
+        for k, (s, row, code) in enumerate(zip(syms.tolist(), rows.tolist(), signals.tolist())):
+            for m in range(n_symbols):
+                price = marks[m][k]
+                if price == price:
+                    last_price[names[m]] = price
+            ts, prices, _ = history.symbol(s)
+            clock.now = float(ts[row])
+            portfolio.log_decision(names[s], float(prices[row]), "BUY" if code == BUY else "SELL", 0.0, "")
+
+    for s, name in enumerate(history.names):
+        prices = history.symbol(s)[1]
+        if prices.size:
+            portfolio.last_price[name] = float(prices[-1])
+    portfolio._mark_equity()
+    result = portfolio.summary()
+    result["pnl_per_drawdown"] = (result["net_pnl"] / result["max_drawdown"] if result["max_drawdown"]
+                                  else (math.inf if result["net_pnl"] > 0 else 0.0))
+    result["index"] = index
+    result["params"] = params
+    return result
+
+
+# --- Search space -----------------------------------------------------------------
+
+def _number(text: str):
+    value = float(text)
+    return int(value) if value.is_integer() and "." not in text else value
+
+
+def parse_spec(spec: str):
+    """'10,20,30' -> list; 'a:b[:step]' -> ('range', a, b, step)."""
+    if ":" in spec:
+        parts = [_number(p) for p in spec.split(":")]
+        if len(parts) not in (2, 3):
+            raise ValueError(f"bad range {spec!r}")
+        step = parts[2] if len(parts) == 3 else None
+        return ("range", parts[0], parts[1], step)
+    return [_number(p) for p in spec.split(",")]
+
+
+def _grid_values(spec) -> list:
+    if isinstance(spec, list):
+        return spec
+    _, lo, hi, step = spec
+    step = step or 1
+    values, v = [], lo
+    while v <= hi + 1e-9:
+        values.append(round(v, 10))
+        v += step
+    return values
+
+
+def _sample(spec, rnd: random.Random):
+    if isinstance(spec, list):
+        return rnd.choice(spec)
+    _, lo, hi, step = spec
+    if step:
+        return rnd.choice(_grid_values(spec))
+    if isinstance(lo, int) and isinstance(hi, int):
+        return rnd.randint(lo, hi)
+    return round(rnd.uniform(lo, hi), 4)
+
+
+def valid(strategy: str, params: dict) -> bool:
+    """Rejects sets the streaming strategy could not run (e.g. fast EMA slower than slow EMA)."""
+    if strategy == "technical":
+        return (1 <= params["ema_fast"] < params["ema_slow"] and params["rsi_period"] >= 1
+                and params["buy_low"] < params["buy_high"] and params["sell_low"] < params["sell_high"])
+    return 1 <= params["short_window"] < params["long_window"]
+
+
+def parameter_sets(strategy: str, specs: Dict[str, object], samples: int = 0, seed: int = 1) -> List[dict]:
+    """Grid (or `samples` random draws) over `specs`; the default set comes first."""
+    defaults = DEFAULTS[strategy]
+    unknown = set(specs) - set(defaults)
+    if unknown:
+        raise ValueError(f"unknown parameters for {strategy}: {', '.join(sorted(unknown))}")
+
+    sets = [dict(defaults)]
+    seen = {tuple(sorted(defaults.items()))}
+    if samples:
+        rnd = random.Random(seed)
+        candidates = ({**defaults, **{k: _sample(v, rnd) for k, v in specs.items()}} for _ in range(samples * 20))
+    else:
+        keys = list(specs)
+        candidates = ({**defaults, **dict(zip(keys, combo))}
+                      for combo in itertools.product(*(_grid_values(specs[k]) for k in keys)))
+    for params in candidates:
+        key = tuple(sorted(params.items()))
+        if key in seen or not valid(strategy, params):
+            continue
+        seen.add(key)
+        sets.append(params)
+        if samples and len(sets) > samples:
+            break
+    return sets
+
+
+def rank(results: List[dict], by: List[str], min_trades: int = 0) -> List[dict]:
+    """Sorts best first; 'metric' is higher-is-better, '-metric' lower-is-better. Ties fall through."""
+    for metric in by:
+        if metric.lstrip("-") not in METRICS:
+            raise ValueError(f"unknown metric {metric!r} (choose from {', '.join(METRICS)})")
+    kept = [r for r in results if r["closed_trades"] >= min_trades]
+    return sorted(kept, key=lambda r: tuple(r[m[1:]] if m.startswith("-") else -r[m] for m in by))
+
+
+# --- Driver -------------------------------------------------------------------------
+
+def run_sweep(history: SharedHistory, strategy: str, sets: List[dict], workers: int,
+              portfolio_args: dict) -> List[dict]:
+    # Neighbouring tasks share indicator periods, so each worker's cache keeps hitting
+    if strategy == "technical":
+        period_key = lambda i: (sets[i]["ema_slow"], sets[i]["ema_fast"], sets[i]["rsi_period"])
+    else:
+        period_key = lambda i: (sets[i]["long_window"], sets[i]["short_window"])
+    order = sorted(range(len(sets)), key=period_key)
+    tasks = [(i, strategy, sets[i], portfolio_args) for i in order]
+
+    if workers <= 1:
+        _init_worker(history.meta())
+        try:
+            return [evaluate(t) for t in tasks]
+        finally:
+            _history.close()
+
+    chunksize = max(1, len(tasks) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(history.meta(),)) as pool:
+        return list(pool.map(evaluate, tasks, chunksize=chunksize))
+
+
+def save(results: List[dict], path: str):
+    if path.endswith(".csv"):
+        keys = list(results[0]["params"]) if results else []
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["rank"] + keys + list(METRICS))
+            for n, r in enumerate(results, 1):
+                writer.writerow([n] + [r["params"][k] for k in keys] + [r[m] for m in METRICS])
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="recorded trade messages (JSONL)")
+    parser.add_argument("--synthetic", type=int, default=0, help="sweep over N random-walk ticks instead of files")
+    parser.add_argument("--store", help="tick store capture directory")
+    parser.add_argument("--only", help="comma-separated symbols from --store")
+    parser.add_argument("--symbols", type=int, default=3)
+    parser.add_argument("--strategy", choices=sorted(DEFAULTS), default="technical")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="NAME=SPEC",
+                        help="value list (a,b,c) or range (start:stop[:step]); repeatable")
+    parser.add_argument("--random", type=int, default=0, help="sample N sets instead of the full grid")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rank", default="net_pnl", help=f"comma-separated metrics, '-' = lower is better ({', '.join(METRICS)})")
+    parser.add_argument("--min-trades", type=int, default=0, help="drop sets with fewer closed trades")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--notional", type=float, default=1000.0)
+    parser.add_argument("--fee-bps", type=float, default=10.0)
+    parser.add_argument("--allow-short", action="store_true")
+    parser.add_argument("--out", help="write the ranked results (.json or .csv)")
+    args = parser.parse_args()
+    if not args.files and not args.synthetic and not args.store:
+        parser.error("give tick files, --store DIR or --synthetic N")
+
+    specs = {}
+    for item in args.param:
+        name, _, spec = item.partition("=")
+        try:
+            specs[name.strip()] = parse_spec(spec)
+        except ValueError:
+            parser.error(f"bad value spec {item!r}")
+    by = [m.strip() for m in args.rank.split(",") if m.strip()]
+    try:
+        rank([], by)
+        sets = parameter_sets(args.strategy, specs, args.random, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    data = load_history(args.files, args.store, args.only.split(",") if args.only else None,
+                        args.synthetic, args.symbols)
+    if not data:
+        parser.error("no ticks found")
+    history = SharedHistory.create(data)
+    rows = history.offsets[-1]
+    del data
+    print(f"[\033[96mSWEEP\033[0m] {rows:,} ticks, {len(history.names)} symbols loaded in {time.perf_counter() - start:.2f}s; "
+          f"{len(sets)} parameter sets on {args.workers} worker(s)")
+
+    portfolio_args = {"notional": args.notional, "fee_bps": args.fee_bps, "allow_short": args.allow_short}
+    start = time.perf_counter()
+    try:
+        results = run_sweep(history, args.strategy, sets, args.workers, portfolio_args)
+    finally:
+        history.close()
+    elapsed = time.perf_counter() - start
+
+    ranked = rank(results, by, args.min_trades)
+    baseline = next((n for n, r in enumerate(ranked, 1) if r["index"] == 0), None)
+    print(f"[\033[96mSWEEP\033[0m] {len(results)} sets in {elapsed:.2f}s ({len(results) / elapsed:.1f} sets/s, "
+          f"{len(results) * rows / elapsed / 1e6:.1f}M ticks/s)")
+
+    varied = [k for k in DEFAULTS[args.strategy] if k in specs]
+    print(f"\n=== Top {min(args.top, len(ranked))} by {', '.join(by)} ===")
+    for n, r in enumerate(ranked[:args.top], 1):
+        shown = ", ".join(f"{k}={r['params'][k]}" for k in varied) or "defaults"
+        tag = " (defaults)" if r["index"] == 0 else ""
+        print(f"{n:>4}. net {r['net_pnl']:+10.2f} | dd {r['max_drawdown']:9.2f} | trades {r['closed_trades']:>5} "
+              f"| win {r['win_rate'] * 100:5.1f}% | {shown}{tag}")
+    if baseline:
+        print(f"\nCurrent defaults rank {baseline} of {len(ranked)}")
+    else:
+        print(f"\nCurrent defaults filtered out (fewer than {args.min_trades} closed trades)")
+
+    if args.out:
+        save(ranked, args.out)
+        print(f"Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Parity check + benchmark: StrategyEnsemble (members bound to one shared
+IndicatorState) vs. the same members each owning their indicators, combined
+with the same weighted vote.
+
+Every tick's ensemble signal must match the independent members' vote. A warm
+restart halfway through (pack_state -> load_state into a fresh ensemble ->
+continue with the same ticks) must give the same signals and end in the same
+packed state as the uninterrupted run. The benchmark then reports per-tick
+cost of both (best of --repeat alternating runs) and how many indicators the
+members actually share: the shared state only saves work when they ask for
+the same (kind, period). With nothing shared (e.g. technical,sma) the
+ensemble is the slower of the two, by its dispatch and vote overhead.
+
+Usage:
+    python benchmarks/bench_ensemble.py [--ticks 500000] [--spec technical:1,sma:0.5] [--threshold 0.5] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategies.ensemble import ensemble_factory, parse_members
+
+VOTES = {"BUY": 1, "SELL": -1, "HOLD": 0}
+
+
+def vote(signals, weights, threshold: float) -> str:
+    score = weight = 0.0
+    for signal, w in zip(signals, weights):
+        if signal == "WAIT":
+            continue
+        score += w * VOTES.get(signal, 0)
+        weight += w
+    if weight <= 0:
+        return "WAIT"
+    score /= weight
+    return "BUY" if score >= threshold else "SELL" if score <= -threshold else "HOLD"
+
+
+def independent(prices, spec: str, threshold: float):
+    """Each member with its own indicators (what running them side by side costs without the shared state)."""
+    members = parse_members(spec)
+    strategies = [factory() for _, factory, _ in members]
+    weights = [w for _, _, w in members]
+    out = []
+    start = time.perf_counter()
+    for price in prices:
+        signals = []
+        for strategy in strategies:
+            strategy.update(price)
+            signals.append(strategy.evaluate()["signal"])
+        out.append(vote(signals, weights, threshold))
+    return time.perf_counter() - start, out
+
+
+def shared(prices, ensemble):
+    update = ensemble.update
+    evaluate = ensemble.evaluate
+    out = []
+    start = time.perf_counter()
+    for price in prices:
+        update(price)
+        out.append(evaluate()["signal"])
+    return time.perf_counter() - start, out
+
+
+def registrations(ensemble) -> int:
+    state = ensemble.state
+    return len(state.emas) + len(state.rsis) + len(state.means)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=500000)
+    parser.add_argument("--spec", default="technical:1,sma:0.5")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    prices = (42000.0 + np.cumsum(rng.normal(0, 5, args.ticks))).tolist()
+    factory = ensemble_factory(args.spec, threshold=args.threshold)
+
+    t_ind, reference = independent(prices, args.spec, args.threshold)
+    full = factory()
+    t_shared, signals = shared(prices, full)
+    mismatches = sum(1 for a, b in zip(reference, signals) if a != b)
+    assert not mismatches, f"{mismatches} ticks where the ensemble disagrees with its members' vote"
+    print(f"Parity OK: '{args.spec}' over {args.ticks:,} ticks "
+          f"({sum(s in ('BUY', 'SELL') for s in signals):,} BUY/SELL)")
+
+    # Warm restart halfway: a fresh ensemble loaded from the snapshot must continue exactly
+    half = args.ticks // 2
+    first = factory()
+    shared(prices[:half], first)
+    restored = factory()
+    restored.load_state(first.pack_state())
+    _, resumed = shared(prices[half:], restored)
+    mismatches = sum(1 for a, b in zip(signals[half:], resumed) if a != b)
+    assert not mismatches, f"{mismatches} ticks differ after pack -> load -> continue"
+    assert restored.pack_state() == full.pack_state(), "restored ensemble ended in another state"
+    print(f"Restart parity OK (pack at {half:,} ticks, continue {args.ticks - half:,})")
+
+    for _ in range(args.repeat - 1):
+        t_ind = min(t_ind, independent(prices, args.spec, args.threshold)[0])
+        t_shared = min(t_shared, shared(prices, factory())[0])
+    print(f"\nindependent members : {t_ind / args.ticks * 1e9:>8.0f} ns/tick")
+    print(f"shared-state ensemble: {t_shared / args.ticks * 1e9:>8.0f} ns/tick ({t_ind / t_shared:.2f}x)")
+    held = registrations(full)
+    requested = sum(registrations(ensemble_factory(name)()) for name, _, _ in parse_members(args.spec))
+    print(f"indicators held: {held}, shared between members: {requested - held}")
+    if t_shared > t_ind:
+        print("note: the ensemble is slower than its members side by side here; "
+              "it saves work only when members share indicators")
+
+
+if __name__ == "__main__":
+    main()
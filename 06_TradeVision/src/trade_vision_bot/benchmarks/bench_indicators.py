@@ -0,0 +1,82 @@
+"""
+Benchmark: per-update cost of the incremental indicators across window lengths.
+
+An O(1) indicator shows a flat ns/update column as the window grows; the
+reference "naive SMA" (re-summing the window each tick) is included to make
+the difference visible.
+
+Usage:
+    python benchmarks/bench_indicators.py [--ticks 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategies.indicators import EMA, MACD, SMA, RollingVariance, WilderRSI
+from strategies.moving_average import MovingAverageStrategy
+from strategies.technical_strategy import TechnicalStrategy
+
+WINDOWS = [10, 100, 1000, 10000]
+
+
+class NaiveSMA:
+    def __init__(self, period):
+        self.buf = deque(maxlen=period)
+
+    def update(self, x):
+        self.buf.append(x)
+        return sum(self.buf) / len(self.buf)
+
+
+def per_update_ns(indicator, prices) -> float:
+    update = indicator.update
+    start = time.perf_counter()
+    for p in prices:
+        update(p)
+    return (time.perf_counter() - start) / len(prices) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=200000)
+    args = parser.parse_args()
+
+    price = 42000.0
+    prices = []
+    for _ in range(args.ticks):
+        price += random.gauss(0, 5)
+        prices.append(price)
+
+    factories = {
+        "SMA": SMA,
+        "EMA": EMA,
+        "WilderRSI": WilderRSI,
+        "RollingVariance": RollingVariance,
+        "MACD(w/2, w, 9)": lambda w: MACD(max(2, w // 2), w, 9),
+        "naive SMA (reference)": NaiveSMA,
+    }
+
+    print(f"ns/update over {args.ticks} ticks")
+    print(f"{'indicator':<24}" + "".join(f"{'w=' + str(w):>12}" for w in WINDOWS))
+    for name, factory in factories.items():
+        row = [per_update_ns(factory(w), prices) for w in WINDOWS]
+        print(f"{name:<24}" + "".join(f"{v:>12.0f}" for v in row))
+
+    print("-- strategies (update + evaluate per tick) --")
+    for label, strategy in (("TechnicalStrategy", TechnicalStrategy()), ("MovingAverageStrategy", MovingAverageStrategy())):
+        update, evaluate = strategy.update, strategy.evaluate
+        start = time.perf_counter()
+        for p in prices:
+            update(p)
+            evaluate()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<24}{elapsed / len(prices) * 1e9:>12.0f} ns/tick  ({len(prices) / elapsed:,.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
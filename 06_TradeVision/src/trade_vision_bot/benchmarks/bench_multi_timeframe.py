@@ -0,0 +1,122 @@
+"""
+Parity check + benchmark: MultiTimeframeStrategy vs. one independent
+BarAggregator + TechnicalStrategy pipeline per timeframe.
+
+Both see the same random-walk trades (no empty base bars, so no flat-bar
+filling). The indicator values of every timeframe must match exactly. A warm
+restart halfway through (pack -> load -> replay the rest as a snapshot
+backfill) must end in the same state as the uninterrupted run, and a restart
+gap without backfill must reset the short timeframes instead of filling them
+with flat bars. The benchmark then reports per-trade cost and per-symbol
+state size as the number of timeframes grows.
+
+Usage:
+    python benchmarks/bench_multi_timeframe.py [--ticks 1000000] [--step-ms 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bars import BarAggregator
+from core.tick import Tick
+from strategies.multi_timeframe import MultiTimeframeStrategy
+from strategies.technical_strategy import TechnicalStrategy
+
+TIMEFRAMES = ["1s", "5s", "15s", "1m", "5m", "15m"]
+
+
+class Clock:
+    __slots__ = ("now",)
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def independent(prices, stamps, specs):
+    """One aggregator + strategy per timeframe (what running TechnicalStrategy per horizon costs today)."""
+    pipes = [(BarAggregator(spec), TechnicalStrategy()) for spec in specs]
+    start = time.perf_counter()
+    for price, ts in zip(prices, stamps):
+        for bars, strategy in pipes:
+            bar = bars.update("SYM", price, 1.0, ts)
+            if bar is not None:
+                strategy.update(bar.close)
+                strategy.evaluate()
+    return time.perf_counter() - start, [s for _, s in pipes]
+
+
+def shared(prices, stamps, specs):
+    clock = Clock()
+    strategy = MultiTimeframeStrategy(specs, clock=clock)
+    update = strategy.update
+    evaluate = strategy.evaluate
+    start = time.perf_counter()
+    for price, ts in zip(prices, stamps):
+        clock.now = ts / 1000.0
+        update(price)
+        evaluate()
+    return time.perf_counter() - start, strategy
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=1000000)
+    parser.add_argument("--step-ms", type=int, default=50, help="time between trades")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    prices = (42000.0 + np.cumsum(rng.normal(0, 5, args.ticks))).tolist()
+    stamps = (1700000000000 + np.arange(args.ticks, dtype=np.int64) * args.step_ms).tolist()
+
+    # Parity on the full set of timeframes
+    _, pipes = independent(prices, stamps, TIMEFRAMES)
+    _, mtf = shared(prices, stamps, TIMEFRAMES)
+    for spec, ref, frame in zip(TIMEFRAMES, pipes, mtf.frames):
+        assert (ref.ema_20, ref.ema_200, ref.rsi_14) == (frame.ema_20, frame.ema_200, frame.rsi_14), spec
+    print(f"Parity OK on {', '.join(TIMEFRAMES)} over {args.ticks:,} trades")
+
+    # Warm restart halfway: the backfill is bucketed by trade time, not by the (restart) clock
+    half = args.ticks // 2
+    _, first = shared(prices[:half], stamps[:half], TIMEFRAMES)
+    restored = MultiTimeframeStrategy(TIMEFRAMES, clock=Clock())
+    restored.load_state(first.pack_state())
+    restored.replay(Tick("SYM", p, 1.0, i, ts, ts) for i, (p, ts) in enumerate(zip(prices[half:], stamps[half:])))
+    for spec, ref, frame in zip(TIMEFRAMES, mtf.frames, restored.frames):
+        assert (ref.ema_20, ref.ema_200, ref.rsi_14) == (frame.ema_20, frame.ema_200, frame.rsi_14), spec
+    assert restored.history.values() == mtf.history.values() and restored.bucket == mtf.bucket
+    print(f"Restart parity OK (pack at {half:,} trades, replay {args.ticks - half:,})")
+
+    # Restart 2h later without backfill: timeframes whose gap exceeds max_flat_bars warm up again
+    gap_clock = Clock()
+    gapped = MultiTimeframeStrategy(TIMEFRAMES, clock=gap_clock)
+    gapped.load_state(first.pack_state())
+    loaded = list(gapped.frames)
+    gap_clock.now = stamps[half - 1] / 1000.0 + 7200
+    gapped.update(prices[half])
+    reset = [spec for spec, before, after in zip(TIMEFRAMES, loaded, gapped.frames) if after is not before]
+    assert reset == [spec for spec in TIMEFRAMES if 7200000 // BarAggregator.parse(spec)[1] > gapped.max_flat_bars], reset
+    assert gapped.evaluate()["signal"] == "WAIT"
+    print(f"2h gap without backfill: reset {', '.join(reset)}; kept {', '.join(s for s in TIMEFRAMES if s not in reset)}")
+
+    print(f"\n{'timeframes':>10} | {'independent':>18} | {'shared stream':>18} | {'state bytes (indep / shared)':>28}")
+    for n in range(1, len(TIMEFRAMES) + 1):
+        specs = TIMEFRAMES[:n]
+        t_ind, pipes = independent(prices, stamps, specs)
+        t_mtf, mtf = shared(prices, stamps, specs)
+        # Packed state: indicators per timeframe (+ the open bar each aggregator holds) vs. one stream
+        ind_bytes = sum(len(s.pack_state()) + 9 * 8 for s in pipes)
+        mtf_bytes = len(mtf.pack_state())
+        print(f"{n:>10} | {t_ind / args.ticks * 1e9:>12.0f} ns/t | {t_mtf / args.ticks * 1e9:>12.0f} ns/t | "
+              f"{ind_bytes:>12} / {mtf_bytes:<12}")
+
+
+if __name__ == "__main__":
+    main()
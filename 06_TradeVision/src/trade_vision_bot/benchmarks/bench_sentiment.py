@@ -0,0 +1,93 @@
+"""
+Benchmark: headline scoring, legacy substring scan vs. compiled lexicon matcher.
+
+Scores a large synthetic headline corpus with the old per-word `in` checks and
+with KeywordMatcher, counts substring false hits the word boundaries remove,
+and measures the per-post cache on repeated CryptoPanic polls.
+
+Usage:
+    python benchmarks/bench_sentiment.py [--headlines 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment.scorer import DecayingSentiment, KeywordMatcher, load_lexicon
+
+LEGACY_POS = ['etf', 'growth', 'support', 'accumulation', 'bullish', 'adoption', 'sec approval', 'pumping', 'positive']
+LEGACY_NEG = ['lawsuit', 'hack', 'fed', 'resistance', 'dump', 'bearish', 'scam', 'crash', 'regulation', 'fud', 'negative']
+
+FILLER = ("bitcoin ethereum solana market traders analysts price week report exchange token network "
+          "federal reserve hackathon dumpling confederation update whales volume futures options").split()
+TERMS = ["ETF", "SEC approval", "adoption", "hack", "Fed", "crash", "lawsuit", "bullish", "bearish", "rally"]
+
+
+def legacy_score(title: str) -> int:
+    title = title.lower()
+    p_hits = sum(1 for w in LEGACY_POS if w in title)
+    n_hits = sum(1 for w in LEGACY_NEG if w in title)
+    return (p_hits > n_hits) - (n_hits > p_hits)
+
+
+def make_headlines(n: int, seed: int = 5) -> list:
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        words = rnd.sample(FILLER, rnd.randint(6, 12))
+        for _ in range(rnd.randint(0, 2)):
+            words.insert(rnd.randrange(len(words) + 1), rnd.choice(TERMS))
+        out.append(" ".join(words).capitalize())
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headlines", type=int, default=200000)
+    args = parser.parse_args()
+    headlines = make_headlines(args.headlines)
+    matcher = KeywordMatcher(load_lexicon())
+
+    start = time.perf_counter()
+    legacy = [legacy_score(h) for h in headlines]
+    t_legacy = time.perf_counter() - start
+
+    # Same substring scan over the full weighted lexicon (its cost grows with every term)
+    terms = list(matcher.weights)
+    start = time.perf_counter()
+    for h in headlines:
+        low = h.lower()
+        sum(1 for w in terms if w in low)
+    t_legacy_full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [matcher.score(h) for h in headlines]
+    t_compiled = time.perf_counter() - start
+
+    # Headlines the legacy scan scored only because of substrings (federal, hackathon, dumpling, ...)
+    false_hits = sum(1 for h, s in zip(headlines, legacy)
+                     if s and not any(t.lower() in h.lower() for t in TERMS))
+    print(f"legacy substring scan : {len(headlines) / t_legacy:>12,.0f} headlines/s")
+    print(f"{f'substring, {len(terms)} terms':<22}: {len(headlines) / t_legacy_full:>12,.0f} headlines/s")
+    print(f"compiled matcher      : {len(headlines) / t_compiled:>12,.0f} headlines/s ({t_legacy_full / t_compiled:.1f}x vs same lexicon)")
+    print(f"legacy false hits     : {false_hits:,} headlines scored on substrings only")
+    assert all(c == 0 for h, c in zip(headlines, compiled) if not any(t.lower() in h.lower() for t in TERMS))
+
+    # Repeated polls of overlapping pages: only new post ids are scored
+    posts = [{"id": i, "title": h} for i, h in enumerate(headlines[:5000])]
+    sentiment = DecayingSentiment(matcher)
+    start = time.perf_counter()
+    polls = 0
+    for first in range(0, len(posts) - 20, 2):
+        sentiment.update(posts[first:first + 20][::-1])
+        polls += 1
+    t_polls = time.perf_counter() - start
+    print(f"cached polls (20/page): {polls / t_polls:>12,.0f} polls/s, scored {sentiment.scored:,} posts, "
+          f"{sentiment.cache_hits:,} cache hits")
+
+
+if __name__ == "__main__":
+    main()
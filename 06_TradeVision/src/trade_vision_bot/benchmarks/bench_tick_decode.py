@@ -0,0 +1,95 @@
+"""
+Microbenchmark: ticks/sec for trade frame decoding and for the full tick pipeline.
+
+Compares the legacy path (bytes.decode + json.loads + dict lookups) with the
+typed `decode_trade` path for every decoder backend installed here. The
+stdlib fallback alone is not faster than legacy (it also builds and checks
+the Tick); the gain comes from msgspec / orjson.
+
+Usage:
+    python benchmarks/bench_tick_decode.py [--ticks 200000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import tick as tick_mod
+from strategies.technical_strategy import TechnicalStrategy
+
+
+def make_frames(n: int) -> list:
+    price = 42000.0
+    frames = []
+    for i in range(n):
+        price += random.gauss(0, 5)
+        frames.append(json.dumps({
+            "e": "trade", "E": 1700000000000 + i, "s": "BTCUSDT", "t": 3000000000 + i,
+            "p": f"{price:.2f}", "q": f"{random.random():.5f}", "T": 1700000000000 + i,
+            "m": bool(i & 1), "M": True
+        }).encode())
+    # Decode straight from memoryviews, as the connector does
+    return [memoryview(f) for f in frames]
+
+
+def legacy_decode(frame):
+    data = json.loads(bytes(frame).decode('utf-8'))
+    if data.get('e') != 'trade':
+        return None
+    return data
+
+
+def run(label: str, frames: list, fn) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    elapsed = time.perf_counter() - start
+    rate = len(frames) / elapsed
+    print(f"{label:<42} {rate:>12,.0f} ticks/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=200000)
+    args = parser.parse_args()
+    frames = make_frames(args.ticks)
+
+    decoders = {"json": tick_mod._decode_stdlib}
+    if tick_mod.orjson is not None:
+        decoders["orjson"] = tick_mod._decode_orjson
+    if tick_mod.msgspec is not None:
+        decoders["msgspec"] = tick_mod._decode_msgspec
+
+    print(f"Active backend: {tick_mod.DECODER_BACKEND} | ticks: {args.ticks}")
+    print("-- decode only --")
+    legacy = run("legacy (decode + json.loads -> dict)", frames, legacy_decode)
+    rates = {name: run(f"decode_trade[{name}] -> Tick", frames, fn) for name, fn in decoders.items()}
+    if rates["json"] < legacy:
+        print(f"note: the stdlib fallback decodes at {rates['json'] / legacy:.2f}x legacy "
+              f"(building the Tick costs more than it saves); install msgspec or orjson")
+
+    print("-- full pipeline (decode + parse + strategy update/evaluate) --")
+
+    def legacy_pipeline(frame, strategy=TechnicalStrategy()):
+        data = legacy_decode(frame)
+        price = float(data.get('p', '0'))
+        _ = data.get('s', 'UNKNOWN')
+        strategy.update(price)
+        strategy.evaluate()
+
+    run("legacy pipeline", frames, legacy_pipeline)
+    for name, fn in decoders.items():
+        def typed_pipeline(frame, decode=fn, strategy=TechnicalStrategy()):
+            t = decode(frame)
+            strategy.update(t.price)
+            strategy.evaluate()
+        run(f"typed pipeline[{name}]", frames, typed_pipeline)
+
+
+if __name__ == "__main__":
+    main()
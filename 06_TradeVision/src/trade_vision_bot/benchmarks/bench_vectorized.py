@@ -0,0 +1,98 @@
+"""
+Parity check + benchmark: vectorized indicators vs. the streaming implementation.
+
+Runs the same random-walk prices through TechnicalStrategy / MovingAverageStrategy
+tick by tick and through strategies/vectorized.py, asserts the outputs agree
+(indicators within tolerance, signals exactly) and reports the speed-up.
+
+Usage:
+    python benchmarks/bench_vectorized.py [--ticks 200000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategies import vectorized as vec
+from strategies.moving_average import MovingAverageStrategy
+from strategies.technical_strategy import TechnicalStrategy
+
+RTOL = 1e-9
+# Indicator values this close to a threshold may legitimately flip with float rounding
+THRESHOLD_EPS = 1e-6
+
+
+def streaming(prices):
+    strategy = TechnicalStrategy()
+    ma = MovingAverageStrategy()
+    n = len(prices)
+    ema20 = np.full(n, np.nan)
+    ema200 = np.full(n, np.nan)
+    rsi = np.empty(n)
+    signal = np.empty(n, dtype=np.int8)
+    ma_signal = np.empty(n, dtype=np.int8)
+    codes = {v: k for k, v in vec.SIGNAL_NAMES.items()}
+
+    start = time.perf_counter()
+    for i, p in enumerate(prices):
+        strategy.update(p)
+        ma.update(p)
+        result = strategy.evaluate()
+        signal[i] = codes[result["signal"]]
+        ma_signal[i] = codes[ma.evaluate()["signal"]]
+        rsi[i] = strategy.get_rsi()
+        if strategy.ema_20 is not None:
+            ema20[i] = strategy.ema_20
+        if strategy.ema_200 is not None:
+            ema200[i] = strategy.ema_200
+    elapsed = time.perf_counter() - start
+    return elapsed, ema20, ema200, rsi, signal, ma_signal
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    prices = 42000.0 + np.cumsum(rng.normal(0, 5, args.ticks))
+    price_list = prices.tolist()
+
+    t_stream, ema20, ema200, rsi, signal, ma_signal = streaming(price_list)
+
+    start = time.perf_counter()
+    out = vec.technical_signals(prices)
+    ma_vec = vec.sma_crossover(prices)
+    t_vec = time.perf_counter() - start
+
+    np.testing.assert_allclose(out["ema_fast"], ema20, rtol=RTOL, equal_nan=True)
+    np.testing.assert_allclose(out["ema_slow"], ema200, rtol=RTOL, equal_nan=True)
+    np.testing.assert_allclose(out["rsi"], rsi, rtol=RTOL)
+
+    # Signals must match exactly, except where an input sits on a threshold within float noise
+    near = np.zeros(len(prices), dtype=bool)
+    for t in (30.0, 40.0, 60.0, 70.0):
+        near |= np.abs(rsi - t) < THRESHOLD_EPS
+    near |= np.abs(ema20 - ema200) < THRESHOLD_EPS * np.abs(ema200)
+    mismatch = (out["signal"] != signal) & ~near
+    assert not mismatch.any(), f"signal mismatch at {np.flatnonzero(mismatch)[:10]}"
+    assert (ma_vec == ma_signal).mean() > 0.9999, "SMA crossover mismatch"
+
+    # Warm start: seeding a streaming strategy must land on the same state
+    seeded = vec.seed_technical_strategy(TechnicalStrategy(), prices)
+    assert abs(seeded.ema_200 - ema200[-1]) <= RTOL * abs(ema200[-1])
+    assert abs(seeded.get_rsi() - rsi[-1]) <= 1e-6
+
+    backend = "scipy.lfilter" if vec.lfilter is not None else "numpy blocked closed form"
+    print(f"Parity OK over {len(prices)} ticks (rtol={RTOL}, filter backend: {backend})")
+    print(f"streaming (TechnicalStrategy + MovingAverageStrategy): {t_stream:8.3f} s  ({len(prices) / t_stream:,.0f} ticks/s)")
+    print(f"vectorized (technical_signals + sma_crossover):        {t_vec:8.3f} s  ({len(prices) / t_vec:,.0f} ticks/s)")
+    print(f"speed-up: {t_stream / t_vec:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
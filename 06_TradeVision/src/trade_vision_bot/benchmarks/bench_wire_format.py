@@ -0,0 +1,100 @@
+"""
+Microbenchmark: decode throughput of the JSON ("trade") and binary
+("trade.bin") wire formats.
+
+The same trades are encoded both ways and decoded from memoryviews, as the
+connector does. Decoded ticks are checked field by field against each other
+before timing. The bulk row maps all binary records at once with
+decode_trades_array (NumPy structured view, no Tick objects).
+
+Usage:
+    python benchmarks/bench_wire_format.py [--ticks 200000] [--symbols 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import tick as tick_mod
+from core.wire import decode_trade_bin, decode_trades_array, encode_trade
+
+
+def make_trades(n: int, symbols: int) -> list:
+    rnd = random.Random(7)
+    names = [f"SYM{i}USDT" for i in range(symbols)]
+    prices = [100.0 * (i + 1) for i in range(symbols)]
+    trades = []
+    for i in range(n):
+        s = rnd.randrange(symbols)
+        prices[s] *= 1.0 + rnd.gauss(0, 0.0005)
+        trades.append({"e": "trade", "E": 1700000000000 + i, "s": names[s], "t": 3000000000 + i,
+                       "p": f"{prices[s]:.4f}", "q": f"{rnd.random():.5f}", "T": 1700000000000 + i,
+                       "m": bool(i & 1), "M": True})
+    return trades
+
+
+def run(label: str, frames: list, fn) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    elapsed = time.perf_counter() - start
+    rate = len(frames) / elapsed
+    print(f"{label:<42} {rate:>12,.0f} ticks/s")
+    return rate
+
+
+def same(a, b) -> bool:
+    return (a.symbol, a.price, a.qty, a.trade_id, a.event_time, a.trade_time) == \
+           (b.symbol, b.price, b.qty, b.trade_id, b.event_time, b.trade_time)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=200000)
+    parser.add_argument("--symbols", type=int, default=20)
+    args = parser.parse_args()
+
+    trades = make_trades(args.ticks, args.symbols)
+    json_raw = [json.dumps(t).encode() for t in trades]
+    bin_raw = [encode_trade(t["s"], float(t["p"]), float(t["q"]), t["t"], t["E"], t["T"], t["m"]) for t in trades]
+    json_frames = [memoryview(f) for f in json_raw]
+    bin_frames = [memoryview(f) for f in bin_raw]
+
+    decoders = {"json": tick_mod._decode_stdlib}
+    if tick_mod.orjson is not None:
+        decoders["orjson"] = tick_mod._decode_orjson
+    if tick_mod.msgspec is not None:
+        decoders["msgspec"] = tick_mod._decode_msgspec
+
+    # Parity: both formats must yield identical ticks
+    for jf, bf in zip(json_frames, bin_frames):
+        if not same(tick_mod.decode_trade(jf), decode_trade_bin(bf)):
+            print(f"[\033[91mERR\033[0m] Decoded ticks differ: {tick_mod.decode_trade(jf)} vs {decode_trade_bin(bf)}")
+            sys.exit(1)
+
+    json_size = sum(map(len, json_raw)) / len(json_raw)
+    bin_size = len(bin_raw[0])
+    print(f"Active JSON backend: {tick_mod.DECODER_BACKEND} | ticks: {args.ticks} | symbols: {args.symbols} | parity OK")
+    print(f"Frame size: json {json_size:.0f} B, bin {bin_size} B ({bin_size / json_size:.0%})")
+    print("-- per-frame decode -> Tick --")
+    rates = {name: run(f"trade     decode_trade[{name}]", json_frames, fn) for name, fn in decoders.items()}
+    bin_rate = run("trade.bin decode_trade_bin", bin_frames, decode_trade_bin)
+    best = max(rates, key=rates.get)
+    print(f"binary vs {best}: {bin_rate / rates[best]:.2f}x")
+
+    print("-- bulk decode (concatenated records -> NumPy view) --")
+    buffer = memoryview(b"".join(bin_raw))
+    start = time.perf_counter()
+    records = decode_trades_array(buffer)
+    prices = records["price"].copy()  # Touch a column so the view is actually read
+    elapsed = time.perf_counter() - start
+    print(f"{'decode_trades_array + price column':<42} {len(records) / elapsed:>12,.0f} ticks/s")
+    assert len(prices) == args.ticks
+
+
+if __name__ == "__main__":
+    main()
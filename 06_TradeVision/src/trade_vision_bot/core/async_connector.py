@@ -0,0 +1,209 @@
+import asyncio
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+import zmq
+import zmq.asyncio
+
+from core.connector import ConnectorStats, TickPipeline, decode_json
+
+_STOP = object()
+# Reconnect backoff (seconds) after a ZMQ error on the receive socket
+_RECONNECT_MIN = 1.0
+_RECONNECT_MAX = 30.0
+
+class AsyncZMQSubscriber:
+    """
+    asyncio (zmq.asyncio) subscriber that decouples receiving from processing.
+    The receive coroutine only drains the socket into a bounded queue; a separate
+    consumer thread decodes and runs the (possibly blocking) callback. When the
+    queue is full, new messages are dropped and counted instead of backing up into
+    the ZMQ high-water mark. With a `shedder` (core.shedding.LoadShedder) the
+    consumer sheds stale ticks itself once queue wait or depth crosses its
+    threshold, so the queue rarely gets that far.
+    """
+
+    def __init__(self, topic: str = "trade", host: str = "tcp://127.0.0.1:5555",
+                 queue_size: int = 10000, stats_interval: float = 30.0,
+                 decoder: Callable[[Any], Any] = decode_json, batch_size: int = 1,
+                 capture: Optional[Any] = None, latency: Optional[Any] = None,
+                 shedder: Optional[Any] = None):
+        self.host = host
+        self.topic = topic
+        # Consumer micro-batching: up to `batch_size` queued ticks per callback
+        self.batch_size = max(1, batch_size)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats_interval = stats_interval
+        self.stats = ConnectorStats()
+        # decoder, capture, latency stamps and shedding (see TickPipeline), run on the consumer thread
+        self.pipeline = TickPipeline(decoder, self.stats, capture=capture, latency=latency, shedder=shedder)
+        self.running = False
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = []
+        self._context = None
+        self._socket = None
+        self._consumer: Optional[threading.Thread] = None
+
+    def start(self, callback: Optional[Callable[[Any], None]] = None,
+              batch_callback: Optional[Callable[[List[Any]], None]] = None):
+        """
+        Blocking entry point (same contract as ZMQSubscriber.start).
+        Returns once `stop()` has been called and the queue has been released.
+        """
+        if sys.platform == "win32":
+            # zmq.asyncio needs a selector-based loop on Windows
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(self.run(callback, batch_callback))
+
+    async def run(self, callback: Optional[Callable[[Any], None]] = None,
+                  batch_callback: Optional[Callable[[List[Any]], None]] = None):
+        self._loop = asyncio.get_running_loop()
+        self._context = zmq.asyncio.Context()
+
+        print(f"[\033[96mNET\033[0m] Connecting to Neural Link at {self.host} (async)...")
+        self._socket = self._open_socket()
+        self.running = True
+        print(f"[\033[96mNET\033[0m] Link Established. Listening for '{self.topic}' events.")
+
+        self._consumer = threading.Thread(target=self._consume, args=(callback, batch_callback), name="tick-consumer", daemon=True)
+        self._consumer.start()
+
+        self._tasks = [asyncio.ensure_future(self._receive())]
+        if self.stats_interval:
+            self._tasks.append(asyncio.ensure_future(self._report_stats()))
+
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.running = False
+            if self._socket is not None:
+                self._socket.close(linger=0)
+            self._context.term()
+            self._shutdown_consumer()
+            print(f"[\033[96mNET\033[0m] Disconnected. {self.stats.snapshot(self.queue.qsize())}")
+
+    def stop(self):
+        """Thread/signal-safe stop request: cancels the receive loop and releases the consumer."""
+        self.running = False
+        if self._loop is not None and not self._loop.is_closed():
+            for task in self._tasks:
+                self._loop.call_soon_threadsafe(task.cancel)
+
+    def get_stats(self) -> dict:
+        return self.pipeline.add_shedding_stats(self.stats.snapshot(self.queue.qsize()))
+
+    def _open_socket(self):
+        socket = self._context.socket(zmq.SUB)
+        socket.connect(self.host)
+        socket.setsockopt_string(zmq.SUBSCRIBE, self.topic)
+        return socket
+
+    async def _reconnect(self, delay: float):
+        """Closes the broken socket and opens a fresh one after `delay` seconds."""
+        if self._socket is not None:
+            self._socket.close(linger=0)
+            self._socket = None
+        await asyncio.sleep(delay)
+        self._socket = self._open_socket()
+
+    async def _receive(self):
+        # SUBSCRIBE is a prefix match ("trade" also gets "trade.bin"); equal length means an exact match
+        topic_len = len(self.topic.encode())
+        backoff = _RECONNECT_MIN
+        while self.running:
+            try:
+                if self._socket is None:
+                    await self._reconnect(0.0)
+                topic_frame, msg_frame = await self._socket.recv_multipart(copy=False)
+            except zmq.ZMQError as e:
+                print(f"[\033[91mERR\033[0m] ZMQ Error: {e}. Reconnecting in {backoff:g}s...")
+                try:
+                    await self._reconnect(backoff)
+                except zmq.ZMQError as e:
+                    print(f"[\033[91mERR\033[0m] Reconnect failed: {e}")
+                backoff = min(backoff * 2, _RECONNECT_MAX)
+                continue
+            backoff = _RECONNECT_MIN
+            if len(topic_frame) != topic_len:
+                continue
+
+            self.stats.received += 1
+            try:
+                self.queue.put_nowait((time.time(), msg_frame.buffer))
+            except queue.Full:
+                self.stats.dropped += 1
+
+    async def _report_stats(self):
+        while self.running:
+            await asyncio.sleep(self.stats_interval)
+            s = self.get_stats()
+            print(f"\033[90m[NET] q={s['queue_depth']} rx/s={s['receive_rate']} processed={s['processed']} dropped={s['dropped']} shed={s['shed']}\033[0m")
+
+    def _consume(self, callback, batch_callback):
+        pipeline = self.pipeline
+        while True:
+            # Block for the first item, then take whatever else is already queued
+            items = [self.queue.get()]
+            self._take(items, self.batch_size)
+            batch = []
+            stop = self._decode(items, batch)
+
+            if pipeline.shedder is not None and batch and not stop:
+                # Staleness of the oldest tick: its queue wait
+                now = time.time()
+                if pipeline.check(batch[0], (now - items[0][0]) * 1000.0, self.queue.qsize(), now):
+                    more = []
+                    self._take(more, pipeline.shedder.window - len(items))
+                    stop = self._decode(more, batch)
+
+            batch = pipeline.finish(batch)
+
+            try:
+                if batch_callback is not None and batch:
+                    # A shedding window can exceed batch_size: keep the callback contract
+                    for i in range(0, len(batch), self.batch_size):
+                        batch_callback(batch[i:i + self.batch_size])
+                else:
+                    for data in batch:
+                        callback(data)
+            except Exception as e:
+                print(f"[\033[91mERR\033[0m] Tick consumer fault: {e}")
+            self.stats.processed += len(batch)
+
+            if stop:
+                return
+
+    def _take(self, items: list, limit: int):
+        """Appends up to `limit` total queued items without blocking."""
+        while len(items) < limit:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+    def _decode(self, items, batch: list) -> bool:
+        """Decodes queued frames into `batch`; True if the stop marker was reached."""
+        decode = self.pipeline.decode
+        for item in items:
+            if item is _STOP:
+                return True
+            recv_time, frame = item
+            decode(frame, recv_time, batch)
+        return False
+
+    def _shutdown_consumer(self):
+        # Pending ticks are discarded on shutdown; only the stop marker matters.
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        self.queue.put(_STOP)
+        if self._consumer is not None:
+            self._consumer.join(timeout=15)
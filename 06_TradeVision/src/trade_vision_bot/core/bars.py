@@ -0,0 +1,137 @@
+"""
+Streaming OHLCV bars between the connector and the strategies.
+
+Strategies are fed one close per finished bar instead of every raw trade, so
+indicator periods mean "N bars" (EMA200 on 1m bars = 200 minutes) and
+strategy calls drop by orders of magnitude. Each trade costs O(1): a few
+comparisons and additions on the symbol's open bar.
+
+Bar specs:
+    "1s", "15s", "1m", "5m", "1h"   time bars (aligned to the epoch, trade time)
+    "vol:25"                        volume bars (close once 25 units traded)
+    "ticks:500"                     tick-count bars (close after 500 trades)
+
+A time bar normally closes when the symbol's next trade lands in a later
+bucket. expire() also closes bars of quiet symbols once their interval plus
+a grace period (for late trades) has passed; trades that arrive later still
+for a bar closed that way are dropped and counted in `late`.
+"""
+from typing import Dict, List, Optional
+
+_UNITS_MS = {"s": 1000, "m": 60000, "h": 3600000}
+
+
+class Bar:
+    __slots__ = ("symbol", "open", "high", "low", "close", "volume", "trades", "start_time", "end_time")
+
+    def __init__(self, symbol: str, price: float, qty: float, ts: int, start_time: int):
+        self.symbol = symbol
+        self.open = self.high = self.low = self.close = price
+        self.volume = qty
+        self.trades = 1
+        self.start_time = start_time
+        self.end_time = ts
+
+    def add(self, price: float, qty: float, ts: int):
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += qty
+        self.trades += 1
+        self.end_time = ts
+
+    def __repr__(self):
+        return (f"Bar({self.symbol} O={self.open} H={self.high} L={self.low} C={self.close} "
+                f"V={self.volume} n={self.trades} t={self.start_time})")
+
+
+class BarAggregator:
+    """One open bar per symbol; update() returns the bar that a trade closed, if any."""
+
+    def __init__(self, spec: str, grace_ms: int = 2000):
+        self.spec = spec
+        self.kind, self.size = self.parse(spec)
+        self.grace_ms = grace_ms
+        self.open_bars: Dict[str, Bar] = {}
+        self.closed = 0
+        self.late = 0
+        self._expired: Dict[str, int] = {}  # symbol -> start of the last bar closed by close_expired
+        self._next_expiry = 0.0
+
+    @staticmethod
+    def parse(spec: str):
+        spec = spec.strip().lower()
+        if spec.startswith("vol:"):
+            return "volume", float(spec[4:])
+        if spec.startswith("ticks:"):
+            return "ticks", int(spec[6:])
+        unit = _UNITS_MS.get(spec[-1:])
+        if unit is None or not spec[:-1].isdigit():
+            raise ValueError(f"Unknown bar spec '{spec}' (use e.g. 1s, 1m, 5m, vol:25, ticks:500)")
+        return "time", int(spec[:-1]) * unit
+
+    def update(self, symbol: str, price: float, qty: float, ts: int) -> Optional[Bar]:
+        bar = self.open_bars.get(symbol)
+        kind = self.kind
+
+        if kind == "time":
+            start = ts - ts % self.size
+            if bar is None:
+                if start <= self._expired.get(symbol, -1):
+                    self.late += 1
+                    return None
+                self.open_bars[symbol] = Bar(symbol, price, qty, ts, start)
+                return None
+            if start == bar.start_time or ts < bar.start_time:
+                # Late trades (clock skew) are folded into the open bar
+                bar.add(price, qty, ts)
+                return None
+            # Trade belongs to a later bucket: it closes the open bar and starts the next
+            self.open_bars[symbol] = Bar(symbol, price, qty, ts, start)
+            self.closed += 1
+            return bar
+
+        if bar is None:
+            bar = self.open_bars[symbol] = Bar(symbol, price, qty, ts, ts)
+        else:
+            bar.add(price, qty, ts)
+        if (bar.volume >= self.size) if kind == "volume" else (bar.trades >= self.size):
+            del self.open_bars[symbol]
+            self.closed += 1
+            return bar
+        return None
+
+    def update_many(self, ticks) -> List[Bar]:
+        """Micro-batch variant: bars closed by the batch, in closing order."""
+        closed = []
+        for t in ticks:
+            bar = self.update(t.symbol, t.price, t.qty, t.trade_time or t.event_time)
+            if bar is not None:
+                closed.append(bar)
+        return closed
+
+    def close_expired(self, now_ms: int) -> List[Bar]:
+        """Time bars: closes bars whose interval has ended even if no later trade arrived."""
+        if self.kind != "time":
+            return []
+        expired = [b for b in self.open_bars.values() if now_ms >= b.start_time + self.size]
+        for bar in expired:
+            del self.open_bars[bar.symbol]
+            self._expired[bar.symbol] = bar.start_time
+        self.closed += len(expired)
+        return expired
+
+    def expire(self, now: float) -> List[Bar]:
+        """Live-loop hook (now in epoch seconds): close_expired at most once a second, minus the grace period."""
+        if self.kind != "time" or now < self._next_expiry:
+            return []
+        self._next_expiry = now + 1.0
+        return self.close_expired(int(now * 1000) - self.grace_ms)
+
+    def restore(self, symbol: str, fields: tuple):
+        """Reopens a bar saved with `Bar` field order (open, high, low, close, volume, trades, start, end)."""
+        bar = Bar(symbol, fields[0], 0.0, fields[7], fields[6])
+        bar.high, bar.low, bar.close, bar.volume, bar.trades = fields[1:6]
+        self.open_bars[symbol] = bar
@@ -1,58 +1,233 @@
-import zmq
-import json
-import time
-from typing import Callable, Any
-
-class ZMQSubscriber:
-    def __init__(self, topic: str = "trade", host: str = "tcp://127.0.0.1:5555"):
-        self.host = host
-        self.topic = topic
-        self.context = zmq.Context()
-        self.socket = self.context.socket(zmq.SUB)
-        self.running = False
-
-    def start(self, callback: Callable[[dict], None]):
-        """
-        Starts the subscriber loop.
-        callback: Function to handle deserialized data.
-        """
-        print(f"[\033[96mNET\033[0m] Connecting to Neural Link at {self.host}...")
-        try:
-            self.socket.connect(self.host)
-            self.socket.setsockopt_string(zmq.SUBSCRIBE, self.topic)
-            self.running = True
-            
-            print(f"[\033[96mNET\033[0m] Link Established. Listening for '{self.topic}' events.")
-            
-            while self.running:
-                try:
-                    # Receive multipart: [topic, message]
-                    if self.socket.poll(100): # Non-blocking check every 100ms
-                        topic_bytes, msg_bytes = self.socket.recv_multipart()
-                        
-                        # Decode
-                        topic = topic_bytes.decode('utf-8')
-                        raw_json = msg_bytes.decode('utf-8')
-                        
-                        try:
-                            data = json.loads(raw_json)
-                            callback(data)
-                        except json.JSONDecodeError:
-                            print(f"[\033[91mERR\033[0m] Malformed JSON received on connector.")
-                            
-                except zmq.ZMQError as e:
-                    print(f"[\033[91mERR\033[0m] ZMQ Error: {e}. Reconnecting...")
-                    self._reconnect()
-                    
-        except KeyboardInterrupt:
-            print("\n[\033[96mNET\033[0m] Disconnecting...")
-        finally:
-            self.socket.close()
-            self.context.term()
-
-    def _reconnect(self):
-        self.socket.close()
-        time.sleep(1)
-        self.socket = self.context.socket(zmq.SUB)
-        self.socket.connect(self.host)
-        self.socket.setsockopt_string(zmq.SUBSCRIBE, self.topic)
+import zmq
+import json
+import time
+from typing import Callable, Any, List, Optional
+
+def decode_json(frame) -> Any:
+    """Default decoder: generic JSON payload from a frame buffer."""
+    return json.loads(bytes(frame))
+
+class ConnectorStats:
+    """
+    Connector counters; the async connector shares them between its receive
+    coroutine and consumer thread. Plain int increments are atomic enough under the GIL for monitoring purposes.
+    """
+    __slots__ = ("received", "processed", "dropped", "shed", "decode_errors", "skipped", "started_at",
+                 "_last_received", "_last_time")
+
+    def __init__(self):
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.shed = 0
+        self.decode_errors = 0
+        self.skipped = 0  # frames the decoder returned None for (non-trade events)
+        self.started_at = time.time()
+        self._last_received = 0
+        self._last_time = self.started_at
+
+    def snapshot(self, queue_depth: int) -> dict:
+        """Returns the counters plus the receive rate since the previous snapshot."""
+        now = time.time()
+        elapsed = max(now - self._last_time, 1e-9)
+        rate = (self.received - self._last_received) / elapsed
+        self._last_received = self.received
+        self._last_time = now
+        return {
+            "queue_depth": queue_depth,
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "shed": self.shed,
+            "decode_errors": self.decode_errors,
+            "skipped": self.skipped,
+            "receive_rate": round(rate, 1),
+            "uptime_sec": round(now - self.started_at, 1)
+        }
+
+
+class TickPipeline:
+    """
+    What both connectors do with a received frame: decode it, stamp its receive
+    time (LatencyMonitor), capture the decoded batch and run the LoadShedder
+    over it, counting decode errors, skipped and shed records in `stats`.
+    """
+
+    def __init__(self, decoder: Callable[[Any], Any], stats: ConnectorStats, capture: Optional[Any] = None,
+                 latency: Optional[Any] = None, shedder: Optional[Any] = None):
+        # decoder: frame buffer (memoryview) -> record. Returning None skips the message.
+        self.decoder = decoder
+        self.stats = stats
+        # Capture mode: decoded records are also handed to capture.append_many (e.g. TickStoreWriter)
+        self.capture = capture
+        # LatencyMonitor: frames are stamped when they come off the socket
+        self.latency = latency
+        # LoadShedder: applied to decoded records after capture. Shedding needs Tick-like
+        # records (`.symbol`); with records that have none it is switched off on first use.
+        self.shedder = shedder if shedder is not None and shedder.enabled else None
+
+    def decode(self, frame, recv_time: float, batch: list):
+        """Decodes one frame into `batch`; malformed frames and non-trade events are only counted."""
+        try:
+            data = self.decoder(frame)
+        except ValueError:
+            self.stats.decode_errors += 1
+            print(f"[\033[91mERR\033[0m] Malformed frame received on connector.")
+            return
+        if data is None:
+            self.stats.skipped += 1
+            return
+        if self.latency is not None:
+            self.latency.received(data, recv_time)
+        batch.append(data)
+
+    def check(self, oldest, wait_ms: float, depth: int, now: float) -> bool:
+        """Updates the shedder from the oldest record of a drain and its wait; True while engaged."""
+        shedder = self.shedder
+        if shedder is None:
+            return False
+        return shedder.check(max(wait_ms, shedder.event_lag_ms(oldest, now)), depth)
+
+    def finish(self, batch: list) -> list:
+        """Captures a drained batch, then sheds it while the shedder is engaged."""
+        if self.capture is not None and batch:
+            self.capture.append_many(batch)
+        shedder = self.shedder
+        if shedder is not None and shedder.engaged and len(batch) > 1:
+            received = len(batch)
+            try:
+                batch = shedder.apply(batch)
+            except AttributeError as e:
+                # Records without `.symbol` (e.g. the default dict decoder) cannot be shed:
+                # keep the consumer alive and process everything from now on
+                print(f"[\033[91mERR\033[0m] Load shedding disabled, records are not ticks: {e}")
+                self.shedder = None
+            self.stats.shed += received - len(batch)
+        return batch
+
+    def add_shedding_stats(self, snap: dict) -> dict:
+        if self.shedder is not None:
+            s = self.shedder.stats()
+            snap["shedding"] = s["engaged"]
+            snap["shed_by_symbol"] = s["shed_by_symbol"]
+        return snap
+
+
+class ZMQSubscriber:
+    """
+    Legacy synchronous subscriber (poll + drain on the calling thread). main.py
+    uses AsyncZMQSubscriber; this one shares its TickPipeline and counters but
+    has no queue, so load shedding only sees a backlog through exchange age
+    (`LoadShedder(exchange_lag=True)`).
+    """
+
+    def __init__(self, topic: str = "trade", host: str = "tcp://127.0.0.1:5555",
+                 decoder: Callable[[Any], Any] = decode_json,
+                 batch_size: int = 1, max_batch_latency_ms: float = 5.0,
+                 capture: Optional[Any] = None, latency: Optional[Any] = None,
+                 shedder: Optional[Any] = None):
+        self.host = host
+        self.topic = topic
+        # Drain mode: after each poll() wakeup, pull up to `batch_size` frames that are
+        # already queued (NOBLOCK), spending at most `max_batch_latency_ms` on the batch.
+        self.batch_size = max(1, batch_size)
+        self.max_batch_latency = max_batch_latency_ms / 1000.0
+        self.stats = ConnectorStats()
+        # The backlog sits in the ZMQ socket, so shedding is judged from the exchange age of
+        # the first decoded record of a drain. While engaged, a drain takes up to
+        # `shedder.window` frames and sheds the stale ones.
+        self.pipeline = TickPipeline(decoder, self.stats, capture=capture, latency=latency, shedder=shedder)
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.SUB)
+        # SUBSCRIBE is a prefix match ("trade" also gets "trade.bin"); equal length means an exact match
+        self._topic_len = len(topic.encode())
+        self.running = False
+
+    def start(self, callback: Optional[Callable[[Any], None]] = None,
+              batch_callback: Optional[Callable[[List[Any]], None]] = None):
+        """
+        Starts the subscriber loop.
+        callback: Function to handle deserialized data (one call per message).
+        batch_callback: Function to handle a drained batch (one call per wakeup).
+        """
+        print(f"[\033[96mNET\033[0m] Connecting to Neural Link at {self.host}...")
+        try:
+            self.socket.connect(self.host)
+            self.socket.setsockopt_string(zmq.SUBSCRIBE, self.topic)
+            self.running = True
+            
+            print(f"[\033[96mNET\033[0m] Link Established. Listening for '{self.topic}' events.")
+            
+            while self.running:
+                try:
+                    # Receive multipart: [topic, message]
+                    if self.socket.poll(100): # Non-blocking check every 100ms
+                        batch = self._drain()
+                        if not batch:
+                            continue
+                        if batch_callback is not None:
+                            batch_callback(batch)
+                        else:
+                            for data in batch:
+                                callback(data)
+                        self.stats.processed += len(batch)
+                            
+                except zmq.ZMQError as e:
+                    print(f"[\033[91mERR\033[0m] ZMQ Error: {e}. Reconnecting...")
+                    self._reconnect()
+                    
+        except KeyboardInterrupt:
+            print("\n[\033[96mNET\033[0m] Disconnecting...")
+        finally:
+            self.socket.close()
+            self.context.term()
+
+    def get_stats(self) -> dict:
+        # No receive queue: frames wait in the socket, where their number is unknown
+        return self.pipeline.add_shedding_stats(self.stats.snapshot(None))
+
+    def _drain(self) -> list:
+        """
+        Receives the frame that woke poll() plus any frames already queued,
+        up to the batch size and latency caps. Returns the decoded records.
+        """
+        pipeline = self.pipeline
+        batch = []
+        deadline = time.perf_counter() + self.max_batch_latency
+        flags = 0  # The first frame is known to be ready
+        limit = self.batch_size
+        shedding = False
+        checked = pipeline.shedder is None
+        count = 0
+        while count < limit:
+            count += 1
+            try:
+                topic_frame, msg_frame = self.socket.recv_multipart(flags=flags, copy=False)
+            except zmq.Again:
+                break
+            flags = zmq.NOBLOCK
+            recv_time = time.time()
+            if len(topic_frame) != self._topic_len:
+                continue
+            self.stats.received += 1
+
+            # Decode straight from the frame buffer
+            pipeline.decode(msg_frame.buffer, recv_time, batch)
+            if not checked and batch:
+                # First decoded record of the drain (earlier frames may be non-trade events)
+                checked = True
+                shedding = pipeline.check(batch[0], 0.0, 0, recv_time)
+                if shedding:
+                    limit = max(limit, pipeline.shedder.window)
+
+            # The latency cap does not apply while shedding: draining the backlog is the point
+            if not shedding and time.perf_counter() >= deadline:
+                break
+        return pipeline.finish(batch)
+
+    def _reconnect(self):
+        self.socket.close()
+        time.sleep(1)
+        self.socket = self.context.socket(zmq.SUB)
+        self.socket.connect(self.host)
+        self.socket.setsockopt_string(zmq.SUBSCRIBE, self.topic)
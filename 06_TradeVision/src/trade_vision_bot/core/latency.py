@@ -0,0 +1,251 @@
+"""
+Tick-to-decision latency instrumentation.
+
+Three stages, each recorded into a log-bucketed histogram (HDR style:
+exact below 64 us, then 32 sub-buckets per power of two, ~3% relative
+error, fixed ~1k counters regardless of traffic):
+
+    exchange_to_receive   Binance event time (E) -> frame off the socket
+    receive_to_evaluated  frame off the socket -> strategy evaluated
+    evaluated_to_notified strategy evaluated -> decision logged and alert queued
+
+Recording is a few integer operations. A reporter thread prints one stats
+line per interval and, if an export directory is set, writes latency.json
+and latency.prom (Prometheus text format, e.g. for node_exporter's
+textfile collector).
+"""
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Dict, Optional
+
+SUB_BITS = 5
+SUB = 1 << SUB_BITS
+MAX_EXPONENT = 40  # ~12 days in microseconds
+BUCKETS = (MAX_EXPONENT + 2) * SUB
+
+STAGES = ("exchange_to_receive", "receive_to_evaluated", "evaluated_to_notified")
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _index(v: int) -> int:
+    if v < 2 * SUB:
+        return v
+    e = v.bit_length() - (SUB_BITS + 1)
+    if e > MAX_EXPONENT:
+        return BUCKETS - 1
+    return e * SUB + (v >> e)
+
+
+def _bucket_value(i: int) -> float:
+    """Midpoint of bucket i (in the recorded unit)."""
+    if i < 2 * SUB:
+        return float(i)
+    e = i // SUB - 1
+    m = i - e * SUB
+    return ((m << e) + ((m + 1) << e)) / 2.0
+
+
+class LogHistogram:
+    """Constant-memory latency histogram; values in microseconds."""
+
+    __slots__ = ("counts", "count", "total", "max", "negative")
+
+    def __init__(self):
+        self.counts = array('q', bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.negative = 0
+
+    def record(self, micros: int):
+        if micros < 0:
+            # Clock skew between exchange and host: counted, recorded as 0
+            self.negative += 1
+            micros = 0
+        self.counts[_index(micros)] += 1
+        self.count += 1
+        self.total += micros
+        if micros > self.max:
+            self.max = micros
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= rank:
+                    return min(_bucket_value(i), float(self.max))
+        return float(self.max)
+
+    def summary(self) -> dict:
+        """Milliseconds."""
+        out = {"count": self.count}
+        for q in QUANTILES:
+            out[f"p{q * 100:g}_ms"] = round(self.percentile(q) / 1000.0, 3)
+        out["max_ms"] = round(self.max / 1000.0, 3)
+        out["mean_ms"] = round(self.total / self.count / 1000.0, 3) if self.count else 0.0
+        out["negative"] = self.negative
+        return out
+
+    def merge(self, other: "LogHistogram"):
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.negative += other.negative
+
+
+class LatencyMonitor:
+    """
+    Hooks: received() from the connector consumer, evaluated() after the
+    strategy pass, notified() once the decision layers have handed the alert
+    off. Timestamps are wall clock (time.time) so they compare with exchange
+    times. Histograms are cumulative since start; msgs/sec is per interval.
+    """
+
+    def __init__(self, interval: float = 30.0, export_dir: Optional[str] = None):
+        self.interval = interval
+        self.export_dir = export_dir
+        self.histograms: Dict[str, LogHistogram] = {stage: LogHistogram() for stage in STAGES}
+        self._rx = self.histograms["exchange_to_receive"]
+        self._eval = self.histograms["receive_to_evaluated"]
+        self._notify = self.histograms["evaluated_to_notified"]
+        self.messages = 0
+        self.started_at = time.time()
+        self._last_messages = 0
+        self._last_time = self.started_at
+        self.rate = 0.0
+        # name -> callable returning a dict, included in snapshots (e.g. connector queue/drop counters)
+        self.sources = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Hooks ---------------------------------------------------------------
+
+    def received(self, tick, recv_time: float):
+        """Stamps tick.recv_time and records exchange -> receive (event time is in ms)."""
+        self.messages += 1
+        tick.recv_time = recv_time
+        event_time = tick.event_time or tick.trade_time
+        if event_time:
+            self._rx.record(int(recv_time * 1e6) - event_time * 1000)
+
+    def evaluated(self, tick, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        if tick.recv_time:
+            self._eval.record(int((now - tick.recv_time) * 1e6))
+        return now
+
+    def evaluated_batch(self, ticks, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        record = self._eval.record
+        for t in ticks:
+            if t.recv_time:
+                record(int((now - t.recv_time) * 1e6))
+        return now
+
+    def notified(self, evaluated_at: float):
+        self._notify.record(int((time.time() - evaluated_at) * 1e6))
+
+    # --- Reporting -----------------------------------------------------------
+
+    def add_source(self, name: str, fn):
+        self.sources[name] = fn
+
+    def start(self):
+        if self.interval and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="latency-reporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self.export_dir:
+            self.export()
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        elapsed = max(now - self._last_time, 1e-9)
+        self.rate = (self.messages - self._last_messages) / elapsed
+        self._last_messages = self.messages
+        self._last_time = now
+        snap = {
+            "timestamp": now,
+            "messages": self.messages,
+            "msgs_per_sec": round(self.rate, 1),
+            "stages": {stage: h.summary() for stage, h in self.histograms.items()},
+        }
+        for name, fn in self.sources.items():
+            snap[name] = fn()
+        return snap
+
+    def stats_line(self, snap: dict) -> str:
+        parts = [f"msgs/s={snap['msgs_per_sec']}"]
+        for stage, label in zip(STAGES, ("ex->rx", "rx->eval", "eval->notify")):
+            s = snap["stages"][stage]
+            if s["count"]:
+                parts.append(f"{label} p50={s['p50_ms']}ms p99={s['p99_ms']}ms max={s['max_ms']}ms")
+        return "[LAT] " + " | ".join(parts)
+
+    def prometheus(self, snap: dict) -> str:
+        lines = [
+            "# HELP tradevision_latency_seconds Tick pipeline latency by stage.",
+            "# TYPE tradevision_latency_seconds summary",
+        ]
+        for stage, h in self.histograms.items():
+            for q in QUANTILES:
+                lines.append(f'tradevision_latency_seconds{{stage="{stage}",quantile="{q}"}} {h.percentile(q) / 1e6:.6f}')
+            lines.append(f'tradevision_latency_seconds_sum{{stage="{stage}"}} {h.total / 1e6:.6f}')
+            lines.append(f'tradevision_latency_seconds_count{{stage="{stage}"}} {h.count}')
+        lines += [
+            "# HELP tradevision_latency_max_seconds Worst latency seen by stage.",
+            "# TYPE tradevision_latency_max_seconds gauge",
+        ]
+        lines += [f'tradevision_latency_max_seconds{{stage="{stage}"}} {h.max / 1e6:.6f}' for stage, h in self.histograms.items()]
+        lines += [
+            "# HELP tradevision_messages_total Trade messages received.",
+            "# TYPE tradevision_messages_total counter",
+            f"tradevision_messages_total {snap['messages']}",
+            "# HELP tradevision_messages_per_second Receive rate over the last interval.",
+            "# TYPE tradevision_messages_per_second gauge",
+            f"tradevision_messages_per_second {snap['msgs_per_sec']}",
+        ]
+        # Sources (connector, sentiment, ...): flat numeric and boolean values as gauges
+        for name in self.sources:
+            values = snap.get(name)
+            if not isinstance(values, dict):
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                elif not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"tradevision_{name}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, snap: Optional[dict] = None):
+        snap = snap or self.snapshot()
+        os.makedirs(self.export_dir, exist_ok=True)
+        for name, content in (("latency.json", json.dumps(snap, indent=2)), ("latency.prom", self.prometheus(snap))):
+            path = os.path.join(self.export_dir, name)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(f"{path}.tmp", path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            snap = self.snapshot()
+            print(f"\033[90m{self.stats_line(snap)}\033[0m")
+            if self.export_dir:
+                try:
+                    self.export(snap)
+                except OSError as e:
+                    print(f"[\033[91mERR\033[0m] Latency export failed: {e}")
@@ -0,0 +1,132 @@
+"""
+Load shedding for the tick consumer: trade completeness for freshness when
+processing falls behind.
+
+The shedder engages when the backlog crosses a threshold (lag above
+`max_lag_ms` or queue depth above `max_depth`) and disengages once both are
+back under half the threshold. While engaged, the connector drains a larger
+window of queued ticks (up to `window`) and passes it through the policy:
+
+    conflate     keep only the latest tick per symbol in the window
+    sample       keep every `sample_every`-th tick of each symbol
+    drop-oldest  keep the newest `keep` ticks of the window, drop the rest
+
+Shed ticks are counted per symbol. Lag is the staleness of the oldest tick
+in a drain, i.e. its wait in the connector queue. With `exchange_lag` the
+tick's exchange event age counts as well (a backlog inside the ZMQ socket is
+invisible to the queue); it is taken relative to the smallest age seen so
+far, so clock skew to the exchange is not mistaken for backlog.
+"""
+from typing import Dict, List
+
+MODES = ("off", "conflate", "sample", "drop-oldest")
+
+
+class LoadShedder:
+    def __init__(self, mode: str = "conflate", max_lag_ms: float = 1000.0, max_depth: int = 5000,
+                 window: int = 5000, sample_every: int = 10, keep: int = 1000, exchange_lag: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"Unknown shedding mode '{mode}' (use {', '.join(MODES)})")
+        self.mode = mode
+        self.max_lag_ms = max_lag_ms
+        self.max_depth = max_depth
+        self.window = max(1, window)
+        self.sample_every = max(1, sample_every)
+        self.keep = max(1, keep)
+        self.exchange_lag = exchange_lag
+        self._age_floor = None
+        self.engaged = False
+        self.engagements = 0
+        self.shed = 0
+        self.by_symbol: Dict[str, int] = {}
+        self._seen: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def event_lag_ms(self, record, now: float) -> float:
+        """
+        Exchange event age of `record` (ms) above the smallest age seen so far, which
+        is clock skew plus transport latency. 0.0 without `exchange_lag` or an event time.
+        """
+        if not self.exchange_lag:
+            return 0.0
+        event_time = getattr(record, "event_time", None) or getattr(record, "trade_time", None)
+        if not event_time:
+            return 0.0
+        age = now * 1000.0 - event_time
+        if self._age_floor is None or age < self._age_floor:
+            self._age_floor = age
+        return age - self._age_floor
+
+    def check(self, lag_ms: float, depth: int = 0) -> bool:
+        """Updates the engaged state (with hysteresis) and returns it."""
+        if not self.enabled:
+            return False
+        if self.engaged:
+            if lag_ms < self.max_lag_ms / 2 and depth < self.max_depth / 2:
+                self.engaged = False
+                print(f"[\033[93mSYS\033[0m] Load shedding off (lag {lag_ms:.0f}ms, queue {depth}); "
+                      f"{self.shed} ticks shed so far")
+        elif lag_ms > self.max_lag_ms or depth > self.max_depth:
+            self.engaged = True
+            self.engagements += 1
+            print(f"[\033[93mWARN\033[0m] Consumer behind (lag {lag_ms:.0f}ms, queue {depth}): "
+                  f"load shedding on ({self.mode})")
+        return self.engaged
+
+    def apply(self, ticks: List) -> List:
+        """Runs the policy over a drained window (oldest first); returns the ticks to process, in order."""
+        mode = self.mode
+        if mode == "conflate":
+            latest = {}
+            for i, t in enumerate(ticks):
+                latest[t.symbol] = i
+            if len(latest) == len(ticks):
+                return ticks
+            kept_at = set(latest.values())
+            kept = []
+            for i, t in enumerate(ticks):
+                if i in kept_at:
+                    kept.append(t)
+                else:
+                    self._count(t.symbol)
+            return kept
+
+        if mode == "sample":
+            seen = self._seen
+            n = self.sample_every
+            kept = []
+            for t in ticks:
+                c = seen.get(t.symbol, 0)
+                seen[t.symbol] = c + 1
+                if c % n == 0:
+                    kept.append(t)
+                else:
+                    self._count(t.symbol)
+            return kept
+
+        if mode == "drop-oldest":
+            excess = len(ticks) - self.keep
+            if excess <= 0:
+                return ticks
+            for t in ticks[:excess]:
+                self._count(t.symbol)
+            return ticks[excess:]
+
+        return ticks
+
+    def _count(self, symbol: str):
+        self.shed += 1
+        self.by_symbol[symbol] = self.by_symbol.get(symbol, 0) + 1
+
+    def stats(self, top: int = 20) -> dict:
+        worst = sorted(self.by_symbol.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        return {
+            "mode": self.mode,
+            "engaged": self.engaged,
+            "engagements": self.engagements,
+            "shed": self.shed,
+            "shed_by_symbol": dict(worst),
+        }
@@ -0,0 +1,126 @@
+"""
+Typed tick records and fast decoding of Binance trade frames.
+
+Decoding goes straight from the ZMQ frame buffer (bytes or memoryview) to a
+slotted `Tick`, skipping the intermediate `bytes.decode('utf-8')` and the
+repeated dict lookups. The fastest available backend is picked at import:
+msgspec -> orjson -> stdlib json. The stdlib fallback is about as fast as
+the old dict path (a bit slower decode-only, see
+benchmarks/bench_tick_decode.py); the speedup needs msgspec or orjson.
+
+`decode_trade(frame)` returns a Tick, None for non-trade events, and raises
+ValueError on malformed frames.
+"""
+import json
+from typing import Optional
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Tick:
+    """A single trade. Times are exchange epoch milliseconds; recv_time is local epoch seconds (0 = not stamped)."""
+    __slots__ = ("symbol", "price", "qty", "trade_id", "event_time", "trade_time", "recv_time")
+
+    def __init__(self, symbol: str, price: float, qty: float = 0.0, trade_id: int = 0,
+                 event_time: int = 0, trade_time: int = 0):
+        self.symbol = symbol
+        self.price = price
+        self.qty = qty
+        self.trade_id = trade_id
+        self.event_time = event_time
+        self.trade_time = trade_time
+        self.recv_time = 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Tick":
+        """Builds a Tick from a raw Binance trade payload ({'s', 'p', 'q', 't', 'E', 'T'})."""
+        return cls(
+            data.get('s', 'UNKNOWN'),
+            float(data.get('p', '0')),
+            float(data.get('q', '0')),
+            int(data.get('t', 0)),
+            int(data.get('E', 0)),
+            int(data.get('T', 0))
+        )
+
+    def __repr__(self):
+        return f"Tick({self.symbol} @ {self.price} x {self.qty} #{self.trade_id})"
+
+
+if msgspec is not None:
+    class _TradeFrame(msgspec.Struct):
+        # Field names mirror the Binance payload; unknown keys (e.g. 'm', 'M') are ignored.
+        # All fields are required, as in _decode_dict: a trade missing one is malformed.
+        e: str
+        E: int
+        s: str
+        t: int
+        p: float
+        q: float
+        T: int
+
+    class _EventFrame(msgspec.Struct):
+        e: str = ""
+
+    # strict=False lets msgspec parse the quoted Binance prices directly into floats
+    _msgspec_decoder = msgspec.json.Decoder(_TradeFrame, strict=False)
+    _event_decoder = msgspec.json.Decoder(_EventFrame, strict=False)
+
+    def _decode_msgspec(frame) -> Optional[Tick]:
+        try:
+            f = _msgspec_decoder.decode(frame)
+        except msgspec.ValidationError as e:
+            # Other event types lack the trade fields: skip them, like _decode_dict does
+            try:
+                event = _event_decoder.decode(frame).e
+            except msgspec.MsgspecError:
+                event = "trade"
+            if event != "trade":
+                return None
+            raise ValueError(f"Malformed trade frame: {e}") from None
+        except msgspec.MsgspecError as e:
+            raise ValueError(f"Malformed trade frame: {e}") from None
+        if f.e != "trade":
+            return None
+        return Tick(f.s, f.p, f.q, f.t, f.E, f.T)
+
+
+def _decode_dict(data: dict) -> Optional[Tick]:
+    try:
+        if data.get('e') != 'trade':
+            return None
+        return Tick(data['s'], float(data['p']), float(data['q']), data['t'], data['E'], data['T'])
+    except (AttributeError, KeyError, TypeError) as e:
+        raise ValueError(f"Malformed trade frame: {e!r}") from None
+
+
+def _decode_orjson(frame) -> Optional[Tick]:
+    return _decode_dict(orjson.loads(frame))
+
+
+_json_decode = json.JSONDecoder().decode
+
+
+def _decode_stdlib(frame) -> Optional[Tick]:
+    # str() decodes straight from the buffer with the fast UTF-8 codec; json.loads(bytes)
+    # would copy, sniff the encoding and decode with 'surrogatepass' (slower than the legacy path)
+    return _decode_dict(_json_decode(str(frame, 'utf-8')))
+
+
+if msgspec is not None:
+    decode_trade = _decode_msgspec
+    DECODER_BACKEND = "msgspec"
+elif orjson is not None:
+    decode_trade = _decode_orjson
+    DECODER_BACKEND = "orjson"
+else:
+    decode_trade = _decode_stdlib
+    DECODER_BACKEND = "json"
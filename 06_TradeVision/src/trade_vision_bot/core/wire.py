@@ -0,0 +1,93 @@
+"""
+Wire formats between TradeVision.DataBridge and the bot, selected by ZMQ topic.
+
+    "trade"      raw Binance JSON, passed through untouched (default)
+    "trade.bin"  one fixed-layout 64-byte little-endian record per frame
+
+Binary record layout (version 1):
+
+    offset  size  field
+    0       1     version (1)
+    1       1     flags (bit 0: buyer is maker)
+    2       6     padding
+    8       8     event_time  int64, exchange epoch ms
+    16      8     trade_time  int64, exchange epoch ms
+    24      8     trade_id    int64
+    32      8     price       float64
+    40      8     qty         float64
+    48      16    symbol      ASCII, NUL padded
+
+`decode_trade_bin` unpacks straight from the frame's memoryview with a
+precompiled struct (no UTF-8 decode, no JSON parse, no copy of the frame);
+`decode_trades_array` maps a buffer of concatenated records to a NumPy
+structured array view. DataBridge/Core/TradeFrame.cs writes the same layout.
+"""
+import struct
+from typing import Optional
+
+from core.tick import Tick, decode_trade
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TOPIC_JSON = "trade"
+TOPIC_BIN = "trade.bin"
+WIRE_VERSION = 1
+FLAG_BUYER_MAKER = 0x01
+SYMBOL_SIZE = 16
+
+TRADE_FRAME = struct.Struct("<BB6xqqqdd16s")
+
+if np is not None:
+    TRADE_DTYPE = np.dtype([
+        ("version", "u1"), ("flags", "u1"), ("_pad", "V6"),
+        ("event_time", "<i8"), ("trade_time", "<i8"), ("trade_id", "<i8"),
+        ("price", "<f8"), ("qty", "<f8"), ("symbol", f"S{SYMBOL_SIZE}"),
+    ])
+    assert TRADE_DTYPE.itemsize == TRADE_FRAME.size
+else:
+    TRADE_DTYPE = None
+
+# Padded symbol bytes -> interned str; the symbol universe is small
+_symbols = {}
+
+
+def encode_trade(symbol: str, price: float, qty: float, trade_id: int, event_time: int,
+                 trade_time: int, buyer_maker: bool = False) -> bytes:
+    """Packs one trade into a binary record (the Python reference for DataBridge)."""
+    raw = symbol.encode("ascii")
+    if len(raw) > SYMBOL_SIZE:
+        raise ValueError(f"Symbol '{symbol}' exceeds {SYMBOL_SIZE} bytes")
+    return TRADE_FRAME.pack(WIRE_VERSION, FLAG_BUYER_MAKER if buyer_maker else 0,
+                            event_time, trade_time, trade_id, price, qty, raw)
+
+
+def decode_trade_bin(frame) -> Optional[Tick]:
+    """Binary counterpart of core.tick.decode_trade: Tick, or ValueError on malformed frames."""
+    if len(frame) != TRADE_FRAME.size:
+        raise ValueError(f"Malformed binary trade frame: {len(frame)} bytes")
+    version, _, event_time, trade_time, trade_id, price, qty, raw = TRADE_FRAME.unpack_from(frame)
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported binary trade frame version {version}")
+    symbol = _symbols.get(raw)
+    if symbol is None:
+        symbol = _symbols[raw] = raw.rstrip(b"\0").decode("ascii")
+    return Tick(symbol, price, qty, trade_id, event_time, trade_time)
+
+
+def decode_trades_array(buffer):
+    """Zero-copy structured NumPy view over concatenated binary records (bulk decode)."""
+    if np is None:
+        raise RuntimeError("numpy is required for decode_trades_array")
+    if len(buffer) % TRADE_FRAME.size:
+        raise ValueError(f"Buffer of {len(buffer)} bytes is not a whole number of records")
+    return np.frombuffer(buffer, dtype=TRADE_DTYPE)
+
+
+# TRADEVISION_WIRE_FORMAT -> (topic, decoder)
+WIRE_FORMATS = {
+    "json": (TOPIC_JSON, decode_trade),
+    "bin": (TOPIC_BIN, decode_trade_bin),
+}
@@ -0,0 +1,203 @@
+"""
+Outbound notification dispatcher (Telegram sendMessage).
+
+The trading loop only enqueues. One worker thread owns a keep-alive session
+and, per chat:
+  * sends at most one message every `min_interval` seconds (Telegram throttles
+    bursts per chat);
+  * coalesces whatever queued up while the chat was throttled into one digest
+    message (split at Telegram's 4096 character limit);
+  * retries failures with exponential backoff, honouring 429 `retry_after`.
+Chats are scheduled independently, so a throttled or failing chat never
+delays the others.
+"""
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+MAX_MESSAGE_CHARS = 4096
+DIGEST_SEPARATOR = "\n\n━━━━━━━━━━\n\n"
+
+_STOP = object()
+
+
+class _ChatState:
+    __slots__ = ("pending", "next_send", "attempts")
+
+    def __init__(self):
+        self.pending: List[str] = []
+        self.next_send = 0.0
+        self.attempts = 0
+
+
+class NotificationDispatcher:
+    def __init__(self, token: str, default_chat_id: Optional[str] = None, base_url: str = TELEGRAM_API_URL,
+                 min_interval: float = 1.0, max_retries: int = 5, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, queue_size: int = 1000, timeout: float = 10.0,
+                 parse_mode: Optional[str] = "Markdown"):
+        self.url = f"{base_url.rstrip('/')}/bot{token}/sendMessage"
+        self.default_chat_id = default_chat_id
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.parse_mode = parse_mode
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        self.session = requests.Session()
+        self.session.mount(base_url, HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+        # Metrics
+        self.enqueued = 0
+        self.dropped = 0
+        self.sent = 0
+        self.digests = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.failed = 0
+
+        self._chats: Dict[str, _ChatState] = {}
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def enqueue(self, text: str, chat_id: Optional[str] = None) -> bool:
+        """Non-blocking; returns False (and counts a drop) if the queue is full."""
+        try:
+            self.queue.put_nowait((chat_id or self.default_chat_id, text))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Flushes pending messages (still rate limited) for up to `timeout` seconds."""
+        self.queue.put((_STOP, time.monotonic() + timeout))
+        self._thread.join(timeout + 1.0)
+        self.session.close()
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "pending": sum(len(c.pending) for c in self._chats.values()),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "sent": self.sent,
+            "digests": self.digests,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "failed": self.failed,
+        }
+
+    # --- Worker ------------------------------------------------------------
+
+    def _run(self):
+        deadline = None
+        while True:
+            now = time.monotonic()
+            due = [c.next_send for c in self._chats.values() if c.pending]
+            if deadline is not None and (not due or now >= deadline):
+                if due:
+                    print(f"[\033[93mWARN\033[0m] Notifier closed with {sum(len(c.pending) for c in self._chats.values())} messages unsent")
+                return
+
+            wait = max(min(due) - now, 0.0) if due else None
+            if deadline is not None:
+                remaining = max(deadline - now, 0.0)
+                wait = remaining if wait is None else min(wait, remaining)
+            try:
+                item = self.queue.get(timeout=wait) if wait is None or wait > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                item = None
+            while item is not None:
+                chat_id, payload = item
+                if chat_id is _STOP:
+                    deadline = payload
+                else:
+                    self._chat(chat_id).pending.append(payload)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    item = None
+
+            now = time.monotonic()
+            for chat_id, chat in self._chats.items():
+                if chat.pending and now >= chat.next_send:
+                    self._send(chat_id, chat)
+                    now = time.monotonic()
+
+    def _chat(self, chat_id: str) -> _ChatState:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = _ChatState()
+        return chat
+
+    def _send(self, chat_id: str, chat: _ChatState):
+        messages, rest = _take_digest(chat.pending)
+        text = messages[0] if len(messages) == 1 else (
+            f"📦 *TradeVision Digest* ({len(messages)} alerts)\n\n" + DIGEST_SEPARATOR.join(messages))
+
+        retry_after = None
+        try:
+            payload = {"chat_id": chat_id, "text": text}
+            if self.parse_mode:
+                payload["parse_mode"] = self.parse_mode
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            if response.status_code == 200:
+                self.sent += 1
+                if len(messages) > 1:
+                    self.digests += 1
+                    self.coalesced += len(messages)
+                chat.pending = rest
+                chat.attempts = 0
+                chat.next_send = time.monotonic() + self.min_interval
+                return
+            if response.status_code == 429:
+                try:
+                    retry_after = float(response.json().get("parameters", {}).get("retry_after"))
+                except (ValueError, TypeError, AttributeError):
+                    retry_after = None
+            elif 400 <= response.status_code < 500:
+                # Not retryable (bad chat id, malformed markdown, ...)
+                print(f"[\033[91mERR\033[0m] Telegram API Error: {response.text}")
+                self.failed += len(messages)
+                chat.pending = rest
+                chat.attempts = 0
+                chat.next_send = time.monotonic() + self.min_interval
+                return
+            error = f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            error = str(e)
+
+        chat.attempts += 1
+        if chat.attempts > self.max_retries:
+            print(f"[\033[91mERR\033[0m] Failed to reach Telegram after {self.max_retries} retries: {error}")
+            self.failed += len(messages)
+            chat.pending = rest
+            chat.attempts = 0
+            chat.next_send = time.monotonic() + self.min_interval
+            return
+        self.retries += 1
+        delay = retry_after if retry_after is not None else min(self.backoff_base * 2 ** (chat.attempts - 1), self.backoff_max)
+        chat.next_send = time.monotonic() + delay
+
+
+def _take_digest(pending: List[str]):
+    """Longest prefix of pending messages that fits in one Telegram message."""
+    taken = [pending[0][:MAX_MESSAGE_CHARS]]
+    size = len(taken[0]) + 64  # digest header
+    for message in pending[1:]:
+        size += len(DIGEST_SEPARATOR) + len(message)
+        if size > MAX_MESSAGE_CHARS:
+            break
+        taken.append(message)
+    return taken, pending[len(taken):]
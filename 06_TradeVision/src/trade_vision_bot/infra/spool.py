@@ -0,0 +1,46 @@
+import json
+import os
+import sqlite3
+from typing import List, Tuple
+
+class RowSpool:
+    """
+    Durable FIFO of JSON rows (SQLite, WAL journal) for persistence outages.
+    Rows come back in insertion order and are deleted only once the sink has
+    accepted them. Single-threaded: use it from the writer thread only.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS spool (id INTEGER PRIMARY KEY AUTOINCREMENT, row TEXT NOT NULL)")
+        self.conn.commit()
+        self.depth = self.conn.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def append(self, rows: List[dict]):
+        with self.conn:
+            self.conn.executemany("INSERT INTO spool (row) VALUES (?)", [(json.dumps(r),) for r in rows])
+        self.depth += len(rows)
+
+    def peek(self, limit: int) -> Tuple[List[int], List[dict]]:
+        """Oldest `limit` rows as (ids, rows)."""
+        cursor = self.conn.execute("SELECT id, row FROM spool ORDER BY id LIMIT ?", (limit,))
+        ids, rows = [], []
+        for row_id, row in cursor:
+            ids.append(row_id)
+            rows.append(json.loads(row))
+        return ids, rows
+
+    def delete(self, ids: List[int]):
+        if not ids:
+            return
+        with self.conn:
+            # Rows are consumed oldest-first, so a range delete covers the whole batch
+            self.conn.execute("DELETE FROM spool WHERE id BETWEEN ? AND ?", (ids[0], ids[-1]))
+        self.depth -= len(ids)
+
+    def close(self):
+        self.conn.close()
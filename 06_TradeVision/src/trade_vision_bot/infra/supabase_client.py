@@ -1,63 +1,305 @@
-import os
-import datetime
-from typing import Any
-
-try:
-    from supabase import create_client, Client
-except ImportError:
-    Client = Any
-    create_client = None
-
-class SupabaseLogger:
-    def __init__(self):
-        self.url = os.getenv("SUPABASE_URL")
-        self.key = os.getenv("SUPABASE_KEY")
-        self.client: Client = None
-        self.enabled = False
-
-        self._initialize_client()
-
-    def _initialize_client(self):
-        if not create_client:
-            print(f"[\033[93mWARN\033[0m] 'supabase' library not installed. Persistence disabled.")
-            return
-
-        if self.url and self.key:
-            try:
-                self.client = create_client(self.url, self.key)
-                self.enabled = True
-                print(f"[\033[96mDB\033[0m] Supabase Client Connected.")
-            except Exception as e:
-                print(f"[\033[91mERR\033[0m] Supabase connection failed: {e}")
-                self.enabled = False
-        else:
-            print(f"[\033[93mWARN\033[0m] Missing SUPABASE_URL or SUPABASE_KEY. Persistence disabled.")
-
-    def log_decision(self, symbol: str, price: float, signal: str, confidence: float, reasoning: str):
-        """
-        Logs a trading decision to Supabase.
-        Fails safe (does not raise exception) if DB is unreachable.
-        """
-        if not self.enabled or not self.client:
-            return
-
-        try:
-            data = {
-                "timestamp": datetime.datetime.utcnow().isoformat(),
-                "symbol": symbol,
-                "price": float(price), # Ensure numeric
-                "signal": signal,
-                "confidence": float(confidence), # Ensure numeric
-                "reasoning": reasoning
-            }
-
-            # Execute insert
-            self.client.table("trade_logs").insert(data).execute()
-            
-            # log success
-            print(f"[\033[96mDB\033[0m] Saved")
-
-        except Exception as e:
-            # Resilience: Catch connection errors, timeouts, auth errors, etc.
-            # Do NOT crash the bot.
-            print(f"[\033[91mERR\033[0m] Failed to save to DB: {e}")
+import os
+import datetime
+import queue
+import threading
+import time
+from typing import Any, List, Optional
+
+import requests
+
+from infra.spool import RowSpool
+
+try:
+    from supabase import create_client, Client
+    from postgrest.exceptions import APIError
+except ImportError:
+    Client = Any
+    create_client = None
+
+    class APIError(Exception):
+        """Stand-in so SupabaseSink can name the postgrest error without the library."""
+        code = None
+
+TABLE = "trade_logs"
+DEFAULT_SPOOL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "spool", "trade_logs.db")
+
+_STOP = object()
+
+
+class SinkRejected(Exception):
+    """The backend refused the rows themselves (4xx); retrying would not help."""
+
+
+def _is_rejection(status: int) -> bool:
+    return 400 <= status < 500 and status not in (408, 429)
+
+
+# SQLSTATE classes PostgREST answers with a 4xx: data exception, integrity
+# constraint violation, syntax error / undefined column / insufficient privilege
+_REJECTED_SQLSTATES = ("22", "23", "42")
+
+
+def _api_error_rejected(code) -> bool:
+    """postgrest APIError.code is a SQLSTATE, a PGRSTxxx code, or the HTTP status when the body was not JSON."""
+    code = str(code or "")
+    if code.isdigit() and len(code) == 3:
+        return _is_rejection(int(code))
+    if code.startswith("PGRST"):
+        # PGRST1xx request errors, PGRST2xx schema cache misses (unknown column); 3xx+ are auth/internal
+        return code[5:6] in ("1", "2")
+    return code[:2] in _REJECTED_SQLSTATES
+
+
+class SupabaseSink:
+    """Bulk insert through the supabase-py client."""
+
+    def __init__(self, client: Client):
+        self.client = client
+
+    def insert(self, rows: List[dict]):
+        try:
+            self.client.table(TABLE).insert(rows).execute()
+        except APIError as e:
+            if _api_error_rejected(e.code):
+                raise SinkRejected(f"{e.code}: {e}") from e
+            raise
+
+
+class RestSink:
+    """Bulk insert straight against the PostgREST endpoint (also works with a local stand-in server)."""
+
+    def __init__(self, url: str, key: str, timeout: float = 10.0):
+        self.endpoint = f"{url.rstrip('/')}/rest/v1/{TABLE}"
+        self.session = requests.Session()
+        self.session.headers.update({
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+            "Prefer": "return=minimal",
+        })
+        self.timeout = timeout
+
+    def insert(self, rows: List[dict]):
+        response = self.session.post(self.endpoint, json=rows, timeout=self.timeout)
+        if response.status_code in (200, 201, 204):
+            return
+        if _is_rejection(response.status_code):
+            raise SinkRejected(f"HTTP {response.status_code}: {response.text[:200]}")
+        raise requests.RequestException(f"HTTP {response.status_code}")
+
+
+class SupabaseLogger:
+    """
+    Write-behind decision log. log_decision() only enqueues; a writer thread
+    bulk-inserts by size (`batch_size`) or time (`flush_interval`). While the
+    backend is unreachable, batches spill to a local SQLite spool, which is
+    replayed in order (before any newer rows) once inserts succeed again.
+    """
+
+    def __init__(self, sink=None, spool_path: Optional[str] = None, batch_size: int = 50,
+                 flush_interval: float = 2.0, queue_size: int = 10000,
+                 retry_base: float = 1.0, retry_max: float = 60.0):
+        self.url = os.getenv("SUPABASE_URL")
+        self.key = os.getenv("SUPABASE_KEY")
+        self.client: Client = None
+        self.enabled = False
+        self.sink = sink
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.spool_path = spool_path or os.getenv("SUPABASE_SPOOL_PATH", DEFAULT_SPOOL_PATH)
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        # Metrics
+        self.queued = 0
+        self.dropped = 0
+        self.inserted = 0
+        self.batches = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.failures = 0
+        self.rejected = 0
+        self.spool_depth = 0
+
+        if self.sink is None:
+            self._initialize_client()
+        else:
+            self.enabled = True
+
+        self._thread = None
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="supabase-writer", daemon=True)
+            self._thread.start()
+
+    def _initialize_client(self):
+        if not (self.url and self.key):
+            print(f"[\033[93mWARN\033[0m] Missing SUPABASE_URL or SUPABASE_KEY. Persistence disabled.")
+            return
+
+        if os.getenv("SUPABASE_SINK", "client") == "rest" or not create_client:
+            # No supabase library (or explicitly requested): talk to PostgREST directly
+            self.sink = RestSink(self.url, self.key)
+            self.enabled = True
+            print(f"[\033[96mDB\033[0m] Supabase REST sink ready.")
+            return
+
+        try:
+            self.client = create_client(self.url, self.key)
+            self.sink = SupabaseSink(self.client)
+            self.enabled = True
+            print(f"[\033[96mDB\033[0m] Supabase Client Connected.")
+        except Exception as e:
+            print(f"[\033[91mERR\033[0m] Supabase connection failed: {e}")
+            self.enabled = False
+
+    def log_decision(self, symbol: str, price: float, signal: str, confidence: float, reasoning: str):
+        """
+        Queues a trading decision for Supabase. Never blocks on the network and
+        never raises; rows survive outages through the local spool.
+        """
+        if not self.enabled:
+            return
+
+        data = {
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "symbol": symbol,
+            "price": float(price), # Ensure numeric
+            "signal": signal,
+            "confidence": float(confidence), # Ensure numeric
+            "reasoning": reasoning
+        }
+        try:
+            self.queue.put_nowait(data)
+            self.queued += 1
+        except queue.Full:
+            self.dropped += 1
+            print(f"[\033[91mERR\033[0m] DB write queue full, decision dropped.")
+
+    def close(self, timeout: float = 10.0):
+        """Flushes the queue; anything the backend does not take stays in the spool for the next run."""
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "inserted": self.inserted,
+            "batches": self.batches,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "spool_depth": self.spool_depth,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+    # --- Writer thread -------------------------------------------------------
+
+    def _run(self):
+        spool = RowSpool(self.spool_path)
+        self.spool_depth = spool.depth
+        if spool.depth:
+            print(f"[\033[96mDB\033[0m] {spool.depth} spooled decisions pending replay")
+        retry_at = 0.0
+        attempts = 0
+        stop = False
+
+        while not stop:
+            batch, stop = self._collect()
+            now = time.monotonic()
+
+            if batch:
+                if spool.depth or now < retry_at:
+                    # Keep order: older spooled rows must go first
+                    spool.append(batch)
+                    self.spooled += len(batch)
+                else:
+                    pending, attempts, retry_at = self._insert(batch, attempts)
+                    if pending:
+                        spool.append(pending)
+                        self.spooled += len(pending)
+
+            # Replay the spool, oldest first, while the backend accepts rows
+            while spool.depth and time.monotonic() >= retry_at:
+                ids, rows = spool.peek(self.batch_size)
+                pending, attempts, retry_at = self._insert(rows, attempts)
+                done = len(rows) - len(pending)
+                spool.delete(ids[:done])
+                self.replayed += done
+                if pending:
+                    break
+                if not spool.depth:
+                    print(f"[\033[96mDB\033[0m] Spool replayed, persistence back in sync")
+            self.spool_depth = spool.depth
+
+        spool.close()
+
+    def _collect(self):
+        """Up to batch_size rows, waiting at most flush_interval after the first one."""
+        batch = []
+        try:
+            item = self.queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch, False
+        if item is _STOP:
+            return batch, True
+        batch.append(item)
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _insert(self, rows: List[dict], attempts: int):
+        """
+        Returns (pending, attempts, retry_at); `pending` is the unsent tail to spool ([] when done).
+        A rejected batch is bisected so only the offending rows are dropped; rejected rows
+        count as handled so they cannot block the spool.
+        """
+        chunks = [rows]
+        sent = 0
+        inserted = 0
+        while chunks:
+            chunk = chunks.pop()
+            try:
+                self.sink.insert(chunk)
+            except SinkRejected as e:
+                if len(chunk) > 1:
+                    # Left half first, so rows still go out in order
+                    half = len(chunk) // 2
+                    chunks.append(chunk[half:])
+                    chunks.append(chunk[:half])
+                    continue
+                self.rejected += 1
+                print(f"[\033[91mERR\033[0m] DB rejected row ({chunk[0].get('symbol')} {chunk[0].get('timestamp')}): {e}")
+            except Exception as e:
+                # Resilience: connection errors, timeouts, auth errors... spool and retry later
+                self.failures += 1
+                attempts += 1
+                delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+                print(f"[\033[91mERR\033[0m] Failed to save to DB ({e}); spooling, retry in {delay:.1f}s")
+                return rows[sent:], attempts, time.monotonic() + delay
+            else:
+                inserted += len(chunk)
+                self.batches += 1
+            sent += len(chunk)
+
+        self.inserted += inserted
+        if inserted:
+            # log success
+            print(f"[\033[96mDB\033[0m] Saved {inserted}")
+        return [], 0, 0.0
@@ -1,40 +1,38 @@
-import os
-import requests
-from typing import Optional
-
-class TelegramClient:
-    def __init__(self):
-        self.token = os.getenv("TELEGRAM_TOKEN")
-        self.chat_id = os.getenv("TELEGRAM_CHAT_ID")
-        self.enabled = bool(self.token and self.chat_id)
-        
-        if self.enabled:
-            print(f"[\033[94mINFO\033[0m] Telegram Voice Engine Connected.")
-        else:
-            print(f"[\033[93mWARN\033[0m] Telegram credentials missing. Voice Engine disabled.")
-
-    def send_alert(self, formatted_message: str):
-        """
-        Sends a pre-formatted alert to Telegram.
-        """
-        if not self.enabled:
-            return
-
-        try:
-            url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-            payload = {
-                "chat_id": self.chat_id,
-                "text": formatted_message,
-                "parse_mode": "Markdown"
-            }
-            
-            response = requests.post(url, json=payload, timeout=10)
-            
-            if response.status_code == 200:
-                print(f"[\033[94mTG\033[0m] Alert sent successfully.")
-            else:
-                print(f"[\033[91mERR\033[0m] Telegram API Error: {response.text}")
-
-        except Exception as e:
-            # Resilience: Fail silently (log to console but don't stop the bot)
-            print(f"[\033[91mERR\033[0m] Failed to reach Telegram: {e}")
+import os
+from typing import Optional
+
+from infra.notifier import TELEGRAM_API_URL, NotificationDispatcher
+
+class TelegramClient:
+    def __init__(self, base_url: Optional[str] = None):
+        self.token = os.getenv("TELEGRAM_TOKEN")
+        self.chat_id = os.getenv("TELEGRAM_CHAT_ID")
+        self.enabled = bool(self.token and self.chat_id)
+        self.dispatcher = None
+        
+        if self.enabled:
+            # Sending happens on the dispatcher thread (keep-alive, per-chat rate limit, digests, retries)
+            self.dispatcher = NotificationDispatcher(
+                self.token,
+                default_chat_id=self.chat_id,
+                base_url=base_url or os.getenv("TELEGRAM_API_URL", TELEGRAM_API_URL),
+                min_interval=float(os.getenv("TELEGRAM_MIN_INTERVAL", "1.0")),
+            ).start()
+            print(f"[\033[94mINFO\033[0m] Telegram Voice Engine Connected.")
+        else:
+            print(f"[\033[93mWARN\033[0m] Telegram credentials missing. Voice Engine disabled.")
+
+    def send_alert(self, formatted_message: str):
+        """
+        Queues a pre-formatted alert for Telegram. Never blocks the caller.
+        """
+        if not self.enabled:
+            return
+
+        if not self.dispatcher.enqueue(formatted_message):
+            print(f"[\033[91mERR\033[0m] Telegram queue full, alert dropped.")
+
+    def close(self, timeout: float = 10.0):
+        """Flushes queued alerts (rate limits still apply)."""
+        if self.dispatcher is not None:
+            self.dispatcher.close(timeout)
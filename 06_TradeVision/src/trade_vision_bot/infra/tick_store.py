@@ -0,0 +1,283 @@
+"""
+Columnar tick store for captured trades.
+
+Layout: <root>/<SYMBOL>/<YYYYMMDD>/ holds one segment per symbol per UTC day:
+    ts.i8        trade time (ms, int64)
+    price.f8     price (float64)
+    qty.f8       quantity (float64)
+    trade_id.i8  exchange trade id (int64)
+    index.i8     sparse time index: (ts, row) int64 pairs every INDEX_STRIDE rows
+
+Columns are fixed-width, append-only and little endian, so a reader can mmap a
+segment and hand out zero-copy NumPy views for any time range. Writing happens
+on a background thread fed by a bounded queue; the live path only enqueues
+(and counts a drop if the writer falls behind).
+"""
+import datetime
+import os
+import queue
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# name, array typecode (writer), NumPy dtype (reader)
+COLUMNS = (("ts", "q", "<i8"), ("price", "d", "<f8"), ("qty", "d", "<f8"), ("trade_id", "q", "<i8"))
+INDEX_STRIDE = 4096
+DAY_MS = 86400000
+
+_STOP = None
+
+
+def _column_file(path: str, name: str, dtype: str) -> str:
+    return os.path.join(path, f"{name}.{dtype[1:]}")
+
+
+def day_key(ts_ms: int) -> str:
+    return datetime.datetime.fromtimestamp(ts_ms // DAY_MS * 86400, datetime.timezone.utc).strftime("%Y%m%d")
+
+
+class _SegmentWriter:
+    """Open column files of one segment. Recovers the row count (and trims a torn tail) on reopen."""
+
+    def __init__(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        files = [_column_file(path, name, dtype) for name, _, dtype in COLUMNS]
+        self.rows = min(os.path.getsize(f) // 8 if os.path.exists(f) else 0 for f in files)
+        self.files = []
+        for file in files:
+            f = open(file, "ab")
+            f.truncate(self.rows * 8)
+            self.files.append(f)
+        index_file = os.path.join(path, "index.i8")
+        if os.path.exists(index_file):
+            index = array("q")
+            with open(index_file, "rb") as f:
+                index.frombytes(f.read())
+            keep = [i for i in range(0, len(index) - 1, 2) if index[i + 1] < self.rows]
+            with open(index_file, "wb") as f:
+                f.write(array("q", [v for i in keep for v in (index[i], index[i + 1])]).tobytes())
+        self.index = open(index_file, "ab")
+
+    def write(self, rows: List[tuple]):
+        cols = [array(code) for _, code, _ in COLUMNS]
+        index = array("q")
+        row = self.rows
+        for record in rows:
+            if row % INDEX_STRIDE == 0:
+                index.append(record[0])
+                index.append(row)
+            for col, value in zip(cols, record):
+                col.append(value)
+            row += 1
+        for f, col in zip(self.files, cols):
+            f.write(col.tobytes())
+        if index:
+            self.index.write(index.tobytes())
+        self.rows = row
+
+    def flush(self):
+        for f in self.files:
+            f.flush()
+        self.index.flush()
+
+    def close(self):
+        for f in self.files:
+            f.close()
+        self.index.close()
+
+
+class TickStoreWriter:
+    """
+    Capture sink for the ZMQ subscribers (`capture=`): append_many() only
+    enqueues; a writer thread groups ticks by symbol/day and appends them to
+    the column files, flushing every `flush_interval` seconds.
+    """
+
+    def __init__(self, root: str, queue_size: int = 1000, flush_interval: float = 1.0):
+        self.root = root
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self._segments: Dict[Tuple[str, str], _SegmentWriter] = {}
+        self._thread = threading.Thread(target=self._run, name="tick-store-writer", daemon=True)
+        self._thread.start()
+        print(f"[\033[96mSTORE\033[0m] Capturing ticks to {root}")
+
+    def append(self, tick):
+        self.append_many([tick])
+
+    def append_many(self, ticks: list):
+        try:
+            self.queue.put_nowait(ticks)
+        except queue.Full:
+            self.dropped += len(ticks)
+
+    def close(self, timeout: float = 10.0):
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+        print(f"[\033[96mSTORE\033[0m] Closed ({self.written} ticks written, {self.dropped} dropped)")
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = []
+            stop = item is _STOP
+            items = [] if stop else [item]
+            # Coalesce whatever else is queued into one write per segment
+            while not stop:
+                try:
+                    more = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is _STOP:
+                    stop = True
+                else:
+                    items.append(more)
+
+            try:
+                self._write(items)
+                if stop or time.monotonic() >= next_flush:
+                    self._flush()
+                    next_flush = time.monotonic() + self.flush_interval
+            except OSError as e:
+                print(f"[\033[91mERR\033[0m] Tick store write failed: {e}")
+
+            if stop:
+                for segment in self._segments.values():
+                    segment.close()
+                self._segments.clear()
+                return
+
+    def _write(self, items: List[list]):
+        groups: Dict[Tuple[str, str], list] = {}
+        for ticks in items:
+            for t in ticks:
+                ts = t.trade_time or t.event_time
+                key = (t.symbol, day_key(ts))
+                rows = groups.get(key)
+                if rows is None:
+                    rows = groups[key] = []
+                rows.append((ts, t.price, t.qty, t.trade_id))
+        for key, rows in groups.items():
+            segment = self._segments.get(key)
+            if segment is None:
+                self._close_other_days(key)
+                segment = self._segments[key] = _SegmentWriter(os.path.join(self.root, key[0], key[1]))
+            segment.write(rows)
+            self.written += len(rows)
+
+    def _close_other_days(self, key: Tuple[str, str]):
+        for other in [k for k in self._segments if k[0] == key[0] and k[1] != key[1]]:
+            self._segments.pop(other).close()
+
+    def _flush(self):
+        for segment in self._segments.values():
+            segment.flush()
+
+
+class Segment:
+    """Read-only mmap view of one symbol/day segment."""
+
+    def __init__(self, path: str):
+        if np is None:
+            raise ImportError("numpy is required to read the tick store")
+        self.path = path
+        columns = {}
+        for name, _, dtype in COLUMNS:
+            file = _column_file(path, name, dtype)
+            size = os.path.getsize(file) // 8 if os.path.exists(file) else 0
+            columns[name] = np.memmap(file, dtype=dtype, mode="r", shape=(size,)) if size else np.empty(0, dtype)
+        # A writer may be mid-append: only rows present in every column are visible
+        self.rows = min(c.size for c in columns.values())
+        self.columns = {name: c[:self.rows] for name, c in columns.items()}
+        index_file = os.path.join(path, "index.i8")
+        pairs = np.fromfile(index_file, dtype="<i8") if os.path.exists(index_file) else np.empty(0, "<i8")
+        pairs = pairs[:pairs.size // 2 * 2].reshape(-1, 2)
+        self.index = pairs[pairs[:, 1] < self.rows]
+
+    def row_for(self, ts_ms: int) -> int:
+        """First row with ts >= ts_ms: sparse index to a block, then binary search inside it."""
+        ts = self.columns["ts"]
+        if self.index.size:
+            block = int(np.searchsorted(self.index[:, 0], ts_ms, side="left")) - 1
+            lo = int(self.index[block, 1]) if block >= 0 else 0
+            hi = int(self.index[block + 1, 1]) if block + 1 < len(self.index) else self.rows
+            return lo + int(np.searchsorted(ts[lo:hi], ts_ms, side="left"))
+        return int(np.searchsorted(ts, ts_ms, side="left"))
+
+    def slice(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, "np.ndarray"]:
+        """Zero-copy column views for start_ms <= ts < end_ms."""
+        lo = 0 if start_ms is None else self.row_for(start_ms)
+        hi = self.rows if end_ms is None else self.row_for(end_ms)
+        return {name: col[lo:hi] for name, col in self.columns.items()}
+
+
+class TickStore:
+    """Reader over a capture root: replay, backfill and warm-up source."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def days(self, symbol: str) -> List[str]:
+        path = os.path.join(self.root, symbol)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    def segment(self, symbol: str, day: str) -> Segment:
+        return Segment(os.path.join(self.root, symbol, day))
+
+    def read(self, symbol: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Iterator[Dict[str, "np.ndarray"]]:
+        """Zero-copy column views per day segment overlapping [start_ms, end_ms)."""
+        first = day_key(start_ms) if start_ms is not None else None
+        last = day_key(end_ms - 1) if end_ms is not None else None
+        for day in self.days(symbol):
+            if (first and day < first) or (last and day > last):
+                continue
+            view = self.segment(symbol, day).slice(start_ms, end_ms)
+            if view["ts"].size:
+                yield view
+
+    def prices(self, symbol: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> "np.ndarray":
+        views = [v["price"] for v in self.read(symbol, start_ms, end_ms)]
+        if len(views) == 1:
+            return views[0]
+        return np.concatenate(views) if views else np.empty(0)
+
+    def backfill(self, symbol: str, since_ts: float) -> List:
+        """Snapshot backfill hook (agent/snapshot.py): Ticks traded after `since_ts` seconds, in order."""
+        return list(self.ticks([symbol], int(since_ts * 1000) + 1))
+
+    def ticks(self, symbols: Optional[Iterable[str]] = None, start_ms: Optional[int] = None,
+              end_ms: Optional[int] = None) -> Iterator:
+        """Replays stored trades of several symbols merged in time order, as Tick objects."""
+        from core.tick import Tick
+        views = []
+        for symbol in symbols or self.symbols():
+            for v in self.read(symbol, start_ms, end_ms):
+                views.append((symbol, v))
+        if not views:
+            return
+        ts = np.concatenate([v["ts"] for _, v in views])
+        order = np.argsort(ts, kind="stable")
+        names = np.repeat(np.arange(len(views)), [v["ts"].size for _, v in views])[order]
+        price = np.concatenate([v["price"] for _, v in views])[order]
+        qty = np.concatenate([v["qty"] for _, v in views])[order]
+        trade_id = np.concatenate([v["trade_id"] for _, v in views])[order]
+        ts = ts[order]
+        symbol_of = [s for s, _ in views]
+        for i, t, p, q, tid in zip(names.tolist(), ts.tolist(), price.tolist(), qty.tolist(), trade_id.tolist()):
+            yield Tick(symbol_of[i], p, q, tid, t, t)
@@ -0,0 +1,322 @@
+"""
+Finds the highest tick rate the bot sustains without lag or drops.
+
+For each rate step the harness starts trade_vision_bot/main.py as a
+subprocess against the stand-in publisher (loadtest/publisher.py), publishes
+for --duration seconds, lets the bot drain, stops it with SIGINT and reads
+the latency.json it exports (core/latency.py). A step passes when:
+    * the connector dropped and shed nothing and lost < --max-loss of what was
+      sent (receive queue overflow, load shedding or ZMQ high-water mark),
+    * exchange->receive and receive->evaluated p99 stay under --max-p99-ms,
+    * the bot finished draining within --drain seconds: every received frame
+      is accounted for (processed, shed, dropped, malformed or a non-trade
+      event) and, with --workers, the shard workers processed every tick
+      handed to them.
+With --workers the processed count and receive->evaluated latency come from
+the worker processes (the pool reports them as the "shards" source), not from
+the connector, which only hands ticks to the worker queues.
+Rates double from --start-rate until a step fails, then bisect --refine times.
+
+Results go to loadtest/results/<timestamp>.json and are compared with the
+previous run of the same configuration (batch size, workers, wire format, burst,
+symbols).
+
+Usage:
+    python loadtest/harness.py [--start-rate 1000] [--max-rate 200000] [--duration 10]
+                               [--batch-size 1] [--workers 0] [--wire json|bin] [--burst 5x:200/1000]
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from publisher import TradePublisher, parse_burst, replay_trades, synthetic_trades
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class BotProcess:
+    """main.py in a subprocess with persistence/alerts disabled and latency export on."""
+
+    def __init__(self, workdir: str, batch_size: int, workers: int, queue_size: int, wire: str = "json",
+                 verbose: bool = False):
+        self.metrics_path = os.path.join(workdir, "latency.json")
+        if os.path.exists(self.metrics_path):
+            os.remove(self.metrics_path)  # Never read the previous step's numbers
+        env = dict(os.environ)
+        env.update({
+            "PYTHONUNBUFFERED": "1",
+            "TRADEVISION_LATENCY_INTERVAL": "1",
+            "TRADEVISION_METRICS_DIR": workdir,
+            "TRADEVISION_SNAPSHOT_PATH": os.path.join(workdir, "strategy_state.bin"),
+            "TRADEVISION_SNAPSHOT_MAX_AGE": "0",
+            "TRADEVISION_BATCH_SIZE": str(batch_size),
+            "TRADEVISION_WORKERS": str(workers),
+            "TRADEVISION_QUEUE_SIZE": str(queue_size),
+            "TRADEVISION_WIRE_FORMAT": wire,
+            # Empty values win over .env (load_dotenv does not override): no network side effects
+            "TELEGRAM_TOKEN": "",
+            "SUPABASE_URL": "",
+            "CRYPTOPANIC_TOKEN": "",
+            "TRADEVISION_CAPTURE_DIR": "",
+        })
+        self.verbose = verbose
+        self.ready = threading.Event()
+        self.proc = subprocess.Popen([sys.executable, os.path.join(BOT_DIR, "main.py")], cwd=BOT_DIR, env=env,
+                                     stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                     encoding="utf-8", errors="replace")
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+
+    def _read_output(self):
+        for line in self.proc.stdout:
+            if "Link Established" in line:
+                self.ready.set()
+            if self.verbose:
+                print(f"    | {line.rstrip()}")
+
+    def metrics(self) -> dict:
+        try:
+            with open(self.metrics_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def stop(self, timeout: float = 30.0) -> dict:
+        if self.proc.poll() is None:
+            self.proc.send_signal(signal.SIGINT)
+            try:
+                self.proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        self._reader.join(2.0)
+        return self.metrics()
+
+
+def accounted(conn: dict) -> int:
+    """Received frames the connector is done with, whatever their outcome."""
+    return sum(conn.get(key, 0) for key in ("processed", "shed", "dropped", "decode_errors", "skipped"))
+
+
+def wait_drained(bot: BotProcess, timeout: float, sharded: bool = False) -> bool:
+    """True once the bot has processed everything it received and nothing more is arriving."""
+    deadline = time.monotonic() + timeout
+    last = None
+    while time.monotonic() < deadline:
+        time.sleep(1.1)  # Metrics are exported once a second
+        snap = bot.metrics()
+        conn = snap.get("connector", {})
+        shards = snap.get("shards", {})
+        state = (conn.get("received"), accounted(conn), shards.get("backlog"))
+        done = conn and conn.get("queue_depth") == 0 and state[0] == state[1]
+        if sharded:
+            # Worker counts arrive once a second with their stats reports
+            done = done and shards.get("backlog") == 0
+        if done and state == last:
+            return True
+        last = state
+    return False
+
+
+def run_step(publisher: TradePublisher, trades, rate: float, args, workdir: str) -> dict:
+    bot = BotProcess(workdir, args.batch_size, args.workers, args.queue_size, args.wire, args.verbose)
+    try:
+        if not bot.ready.wait(args.startup_timeout):
+            raise RuntimeError("bot did not connect (see --verbose output)")
+        time.sleep(1.0)  # PUB/SUB slow joiner: let the subscription propagate
+        pub = publisher.run(trades, rate, args.duration, parse_burst(args.burst))
+        drained = wait_drained(bot, args.drain, sharded=args.workers > 0)
+    finally:
+        snap = bot.stop()
+
+    conn = snap.get("connector", {})
+    shards = snap.get("shards", {})
+    stages = snap.get("stages", {})
+    received = conn.get("received", 0)
+    # Sharded: the connector's "processed" only means handed to a worker queue
+    processed = shards.get("processed", 0) if args.workers else conn.get("processed", 0)
+    dropped = conn.get("dropped", 0)
+    shed = conn.get("shed", 0)
+    loss = max(pub["sent"] - received, 0) / pub["sent"] if pub["sent"] else 0.0
+    p99 = {stage: stages.get(stage, {}).get("p99_ms", 0.0) for stage in ("exchange_to_receive", "receive_to_evaluated")}
+
+    failures = []
+    if not snap:
+        failures.append("no metrics")
+    elif args.workers and not shards:
+        failures.append("no worker metrics")
+    if args.workers and shards.get("backlog"):
+        failures.append(f"worker backlog={shards['backlog']}")
+    if dropped:
+        failures.append(f"dropped={dropped}")
+    if shed:
+        failures.append(f"shed={shed}")
+    if loss > args.max_loss:
+        failures.append(f"loss={loss:.2%}")
+    for stage, value in p99.items():
+        if value > args.max_p99_ms:
+            failures.append(f"{stage} p99={value}ms")
+    if not drained:
+        failures.append("not drained")
+    publisher_limited = pub["rate"] < rate * 0.95
+
+    return {
+        "target_rate": rate,
+        "published": pub,
+        "publisher_limited": publisher_limited,
+        "received": received,
+        "processed": processed,
+        "decode_errors": conn.get("decode_errors", 0),
+        "dropped": dropped,
+        "shed": shed,
+        "loss": round(loss, 6),
+        "stages": stages,
+        "passed": not failures,
+        "failures": failures,
+    }
+
+
+def search(publisher: TradePublisher, trades, args, workdir: str):
+    steps = []
+
+    def step(rate):
+        print(f"[\033[96mLOAD\033[0m] {rate:,.0f} msg/s for {args.duration:g}s ...", flush=True)
+        result = run_step(publisher, trades, rate, args, workdir)
+        p99 = result["stages"].get("receive_to_evaluated", {}).get("p99_ms")
+        status = "\033[92mPASS\033[0m" if result["passed"] else "\033[91mFAIL\033[0m " + ", ".join(result["failures"])
+        print(f"    sent={result['published']['sent']:,} ({result['published']['rate']:,.0f}/s) "
+              f"received={result['received']:,} processed={result['processed']:,} dropped={result['dropped']} "
+              f"rx->eval p99={p99}ms -> {status}")
+        if result["publisher_limited"]:
+            print(f"    [\033[93mWARN\033[0m] Publisher fell short of the target rate; the result is a lower bound")
+        steps.append(result)
+        return result["passed"]
+
+    best, worst = None, None
+    rate = args.start_rate
+    while rate <= args.max_rate:
+        if step(rate):
+            best = rate
+            rate *= 2
+        else:
+            worst = rate
+            break
+
+    if best is not None and worst is not None:
+        low, high = best, worst
+        for _ in range(args.refine):
+            mid = round((low + high) / 2)
+            if mid in (low, high):
+                break
+            if step(mid):
+                low = mid
+            else:
+                high = mid
+        best = low
+    return best, steps
+
+
+def previous_result(results_dir: str, config: dict):
+    for path in sorted(glob.glob(os.path.join(results_dir, "*.json")), reverse=True):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if data.get("config") == config:
+            return path, data
+    return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bind", default="tcp://*:5555")
+    parser.add_argument("--start-rate", type=float, default=1000.0)
+    parser.add_argument("--max-rate", type=float, default=200000.0)
+    parser.add_argument("--refine", type=int, default=3, help="bisection steps after the first failure")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of publishing per step")
+    parser.add_argument("--drain", type=float, default=15.0, help="seconds allowed to drain after publishing")
+    parser.add_argument("--burst", help="burst profile, e.g. 5x:200/1000")
+    parser.add_argument("--symbols", type=int, default=5)
+    parser.add_argument("--replay", help="file with one raw trade message per line")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--wire", choices=("json", "bin"), default="json", help="wire format (core/wire.py)")
+    parser.add_argument("--max-p99-ms", type=float, default=50.0)
+    parser.add_argument("--max-loss", type=float, default=0.001)
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--tolerance", type=float, default=0.10, help="fractional drop that counts as a regression")
+    parser.add_argument("--verbose", action="store_true", help="echo the bot's output")
+    args = parser.parse_args()
+
+    config = {
+        "batch_size": args.batch_size,
+        "workers": args.workers,
+        "queue_size": args.queue_size,
+        "wire": args.wire,
+        "burst": args.burst,
+        "symbols": args.symbols,
+        "replay": os.path.basename(args.replay) if args.replay else None,
+        "duration": args.duration,
+        "max_p99_ms": args.max_p99_ms,
+    }
+    print(f"[\033[96mLOAD\033[0m] Config: {config}")
+
+    publisher = TradePublisher(args.bind, wire=args.wire)
+    trades = replay_trades(args.replay) if args.replay else synthetic_trades(args.symbols)
+    try:
+        with tempfile.TemporaryDirectory(prefix="tv_loadtest_") as workdir:
+            best, steps = search(publisher, trades, args, workdir)
+    finally:
+        publisher.close()
+
+    result = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "config": config,
+        "max_sustainable_rate": best,
+        "platform": {
+            "python": platform.python_version(),
+            "system": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "steps": steps,
+    }
+
+    print("==========================================")
+    if best is None:
+        print(f"[\033[91mLOAD\033[0m] No rate passed (lowest tried: {args.start_rate:,.0f} msg/s)")
+    else:
+        print(f"[\033[92mLOAD\033[0m] Max sustainable rate: {best:,.0f} msg/s")
+
+    prev_path, prev = previous_result(args.results_dir, config)
+    if prev and prev.get("max_sustainable_rate") and best is not None:
+        change = best / prev["max_sustainable_rate"] - 1.0
+        tag = "\033[91mREGRESSION\033[0m" if change < -args.tolerance else "ok"
+        print(f"    vs {os.path.basename(prev_path)}: {prev['max_sustainable_rate']:,.0f} msg/s ({change:+.1%}) {tag}")
+        result["previous"] = {"file": os.path.basename(prev_path), "max_sustainable_rate": prev["max_sustainable_rate"],
+                              "change": round(change, 4)}
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"    Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
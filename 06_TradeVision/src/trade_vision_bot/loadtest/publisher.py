@@ -0,0 +1,169 @@
+"""
+Stand-in for TradeVision.DataBridge: a ZMQ PUB on tcp://*:5555 publishing
+Binance-shaped trade messages without a live exchange, either as raw JSON on
+topic "trade" (default) or as binary records on "trade.bin" (--format bin,
+layout in core/wire.py).
+
+Sources:
+    synthetic random-walk trades (default), or
+    a recorded file with one raw trade message per line (--replay).
+Event/trade times (E/T) are restamped at send time by default, so the bot's
+exchange -> receive latency measures the local pipeline.
+
+Rate profile: --rate msgs/sec, optionally with bursts, e.g.
+    --burst 5x:200/1000   every 1000 ms, 200 ms run at 5x the base rate
+
+Usage:
+    python loadtest/publisher.py --rate 5000 --duration 60 [--symbols 10] [--burst 5x:200/1000]
+    python loadtest/publisher.py --replay ticks.jsonl --rate 2000
+    python loadtest/publisher.py --format bin --rate 5000
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from typing import Iterator, Optional
+
+import zmq
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.wire import WIRE_FORMATS, encode_trade
+
+DEFAULT_BIND = "tcp://*:5555"
+
+
+def parse_burst(spec: Optional[str]):
+    """'5x:200/1000' -> (multiplier 5.0, burst 0.2 s, period 1.0 s)."""
+    if not spec:
+        return None
+    mult, _, window = spec.partition(":")
+    on_ms, _, period_ms = window.partition("/")
+    return float(mult.rstrip("x")), float(on_ms) / 1000.0, float(period_ms) / 1000.0
+
+
+def synthetic_trades(symbols: int = 5, seed: int = 42) -> Iterator[dict]:
+    rnd = random.Random(seed)
+    names = [f"SYM{i}USDT" for i in range(symbols)]
+    prices = [100.0 * (i + 1) for i in range(symbols)]
+    for trade_id in itertools.count(1):
+        s = rnd.randrange(symbols)
+        prices[s] *= 1.0 + rnd.gauss(0, 0.0005)
+        yield {"e": "trade", "E": 0, "s": names[s], "t": trade_id, "p": f"{prices[s]:.4f}",
+               "q": f"{rnd.random():.5f}", "T": 0, "m": bool(trade_id & 1), "M": True}
+
+
+def replay_trades(path: str, loop: bool = True) -> Iterator[dict]:
+    while True:
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        if not loop:
+            return
+
+
+def encode_json(trade: dict) -> bytes:
+    return json.dumps(trade).encode()
+
+
+def encode_bin(trade: dict) -> bytes:
+    return encode_trade(trade["s"], float(trade["p"]), float(trade["q"]), trade["t"], trade["E"], trade["T"],
+                        trade.get("m", False))
+
+
+ENCODERS = {"json": encode_json, "bin": encode_bin}
+
+
+class TradePublisher:
+    def __init__(self, bind: str = DEFAULT_BIND, topic: Optional[str] = None, hwm: int = 100000,
+                 wire: str = "json"):
+        # The topic follows the wire format unless given explicitly
+        self.topic = (topic or WIRE_FORMATS[wire][0]).encode()
+        self.encode = ENCODERS[wire]
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.PUB)
+        self.socket.setsockopt(zmq.SNDHWM, hwm)
+        self.socket.bind(bind)
+        self.sent = 0
+
+    def run(self, trades: Iterator[dict], rate: float, duration: float, burst=None,
+            restamp: bool = True, stop=None) -> dict:
+        """
+        Publishes at `rate` msgs/sec (times the burst multiplier inside a burst
+        window) for `duration` seconds. Sends are paced in 1 ms slices.
+        Returns the achieved counts and rate.
+        """
+        socket = self.socket
+        topic = self.topic
+        encode = self.encode
+        start = time.perf_counter()
+        end = start + duration
+        owed = 0.0
+        last = start
+        sent = 0
+        while True:
+            now = time.perf_counter()
+            if now >= end or (stop is not None and stop.is_set()):
+                break
+            current = rate
+            if burst is not None:
+                mult, on, period = burst
+                if (now - start) % period < on:
+                    current = rate * mult
+            owed += (now - last) * current
+            last = now
+            n = int(owed)
+            if n:
+                owed -= n
+                stamp = int(time.time() * 1000)
+                for trade in itertools.islice(trades, n):
+                    if restamp:
+                        trade["E"] = trade["T"] = stamp
+                    socket.send_multipart([topic, encode(trade)])
+                    sent += 1
+            else:
+                time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        self.sent += sent
+        return {"sent": sent, "seconds": round(elapsed, 3), "rate": round(sent / elapsed, 1) if elapsed else 0.0}
+
+    def close(self):
+        self.socket.close(linger=0)
+        self.context.term()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bind", default=DEFAULT_BIND)
+    parser.add_argument("--format", choices=sorted(ENCODERS), default="json", help="wire format")
+    parser.add_argument("--topic", help="override the format's topic")
+    parser.add_argument("--rate", type=float, default=1000.0, help="base msgs/sec")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--burst", help="burst profile, e.g. 5x:200/1000")
+    parser.add_argument("--symbols", type=int, default=5)
+    parser.add_argument("--replay", help="file with one raw trade message per line")
+    parser.add_argument("--keep-times", action="store_true", help="do not restamp E/T at send time")
+    args = parser.parse_args()
+
+    publisher = TradePublisher(args.bind, args.topic, wire=args.format)
+    trades = replay_trades(args.replay) if args.replay else synthetic_trades(args.symbols)
+    print(f"[\033[96mNET\033[0m] Publishing '{publisher.topic.decode()}' on {args.bind} at {args.rate:,.0f} msg/s"
+          f"{' burst ' + args.burst if args.burst else ''}")
+    time.sleep(0.5)  # Let subscribers (re)connect before the first frames
+    try:
+        result = publisher.run(trades, args.rate, args.duration, parse_burst(args.burst),
+                               restamp=not args.keep_times)
+        print(f"[\033[96mNET\033[0m] Sent {result['sent']:,} trades in {result['seconds']}s ({result['rate']:,.0f} msg/s)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
+
+
+if __name__ == "__main__":
+    main()
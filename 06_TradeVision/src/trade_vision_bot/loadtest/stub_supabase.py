@@ -0,0 +1,189 @@
+"""
+Runs infra/supabase_client.py (SupabaseLogger + RestSink) against a local
+PostgREST stand-in (http.server) for `trade_logs`.
+
+The stub enforces the NOT NULL columns of docs/schema.sql like Postgres does:
+a bulk insert with one bad row fails as a whole with 400 / SQLSTATE 23502.
+
+Scenarios:
+    outage   backend down (503): decisions spool locally, nothing is lost;
+             once it is back, spooled rows are replayed before newer ones
+    restart  logger closed during an outage: the next logger on the same
+             spool replays the previous run's rows first, in order
+    reject   a batch with bad rows: only those rows are dropped (counted in
+             `rejected`), the good rows of the batch are stored in order
+
+Usage:
+    python loadtest/stub_supabase.py [--scenario all|outage|restart|reject]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra.supabase_client import TABLE, RestSink, SupabaseLogger
+
+KEY = "stub-service-key"
+NOT_NULL = ("timestamp", "symbol", "price", "signal", "confidence")
+
+
+class PostgrestStub:
+    """POST /rest/v1/trade_logs; `up = False` answers 503 like an unreachable project."""
+
+    def __init__(self):
+        self.up = True
+        self.rows = []
+        self.requests = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests += 1
+                    if self.path != f"/rest/v1/{TABLE}" or self.headers.get("apikey") != KEY:
+                        return self._reply(401, {"message": "Invalid API key"})
+                    if not stub.up:
+                        return self._reply(503, {"message": "Service Unavailable"})
+                    rows = body if isinstance(body, list) else [body]
+                    for row in rows:
+                        for column in NOT_NULL:
+                            if row.get(column) is None:
+                                # One statement per request: nothing of the batch is stored
+                                return self._reply(400, {
+                                    "code": "23502", "details": None, "hint": None,
+                                    "message": f'null value in column "{column}" of relation "{TABLE}" violates not-null constraint'})
+                    stub.rows.extend(rows)
+                self._reply(201, None)
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stored(self) -> list:
+        with self.lock:
+            return [row["reasoning"] for row in self.rows]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def logger(stub: PostgrestStub, spool_path: str) -> SupabaseLogger:
+    return SupabaseLogger(sink=RestSink(stub.url, KEY, timeout=2.0), spool_path=spool_path,
+                          batch_size=10, flush_interval=0.1, retry_base=0.2, retry_max=0.5)
+
+
+def log(db: SupabaseLogger, first: int, count: int, bad=()):
+    for i in range(first, first + count):
+        db.log_decision(None if i in bad else "BTCUSDT", 60000.0 + i, "BUY", 0.8, f"decision {i}")
+
+
+def wait_for(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.05)
+
+
+def expected(first: int, count: int, bad=()) -> list:
+    return [f"decision {i}" for i in range(first, first + count) if i not in bad]
+
+
+def scenario_outage(spool_path: str):
+    stub = PostgrestStub()
+    db = logger(stub, spool_path)
+    stub.up = False
+    log(db, 0, 30)
+    wait_for(lambda: db.spool_depth == 30)
+    assert stub.stored() == []
+
+    stub.up = True
+    log(db, 30, 10)
+    wait_for(lambda: db.metrics()["inserted"] == 40)
+    db.close()
+    stub.close()
+
+    m = db.metrics()
+    assert stub.stored() == expected(0, 40), "spooled rows lost, duplicated or reordered"
+    assert m["replayed"] >= 30 and m["spool_depth"] == 0 and m["failures"] >= 1 and m["rejected"] == 0, m
+    return f"30 rows spooled during the outage, {m['replayed']} replayed in order, {m['failures']} failed attempts"
+
+
+def scenario_restart(spool_path: str):
+    stub = PostgrestStub()
+    stub.up = False
+    db = logger(stub, spool_path)
+    log(db, 0, 25)
+    wait_for(lambda: db.spool_depth == 25)
+    db.close()
+    assert stub.stored() == []
+
+    # Next run: the backend is back before anything new is logged
+    stub.up = True
+    db = logger(stub, spool_path)
+    log(db, 25, 5)
+    wait_for(lambda: db.metrics()["inserted"] == 30)
+    db.close()
+    stub.close()
+
+    assert stub.stored() == expected(0, 30), "previous run's rows not replayed first"
+    return "25 rows left in the spool at exit, replayed before the next run's rows"
+
+
+def scenario_reject(spool_path: str):
+    stub = PostgrestStub()
+    db = logger(stub, spool_path)
+    bad = {3, 17}
+    log(db, 0, 20, bad)
+    wait_for(lambda: db.metrics()["inserted"] + db.metrics()["rejected"] == 20)
+
+    # The reject path must not wedge the spool either: spool a batch with a bad row and replay it
+    stub.up = False
+    log(db, 20, 10, {25})
+    wait_for(lambda: db.spool_depth == 10)
+    stub.up = True
+    wait_for(lambda: db.spool_depth == 0)
+    db.close()
+    stub.close()
+
+    m = db.metrics()
+    assert stub.stored() == expected(0, 30, bad | {25}), "good rows of a rejected batch were lost"
+    assert m["rejected"] == 3 and m["inserted"] == 27, m
+    return f"{m['rejected']} bad rows dropped, {m['inserted']} good rows stored in order ({stub.requests} requests)"
+
+
+SCENARIOS = {"outage": scenario_outage, "restart": scenario_restart, "reject": scenario_reject}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default="all", choices=["all"] + list(SCENARIOS))
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, run in SCENARIOS.items():
+            if args.scenario in ("all", name):
+                print(f"{name:<8}: {run(os.path.join(tmp, f'{name}.db'))}")
+
+
+if __name__ == "__main__":
+    main()
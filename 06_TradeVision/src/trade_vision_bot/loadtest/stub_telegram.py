@@ -0,0 +1,170 @@
+"""
+Runs infra/notifier.py against a local Telegram Bot API stand-in (http.server).
+
+Scenarios:
+    retry_after  the first sendMessage gets 429 with parameters.retry_after;
+                 the retry must wait that long (not the shorter backoff) and
+                 the alert must be delivered exactly once
+    digest       a burst enqueued while the chat is throttled goes out as
+                 digest messages: fewer requests than alerts, every alert
+                 exactly once and in order, each message <= 4096 chars,
+                 requests spaced by min_interval
+    chats        a chat answering 429 does not delay another chat
+
+Usage:
+    python loadtest/stub_telegram.py [--scenario all|retry_after|digest|chats]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra.notifier import DIGEST_SEPARATOR, MAX_MESSAGE_CHARS, NotificationDispatcher
+
+TOKEN = "123:stub"
+
+
+class TelegramStub:
+    """sendMessage endpoint; `throttle[chat_id]` = number of 429s to answer before accepting."""
+
+    def __init__(self, retry_after: int = 1):
+        self.retry_after = retry_after
+        self.throttle = {}
+        self.requests = []  # (monotonic time, chat_id, text, status)
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.path != f"/bot{TOKEN}/sendMessage":
+                    return self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+                chat_id = body["chat_id"]
+                with stub.lock:
+                    left = stub.throttle.get(chat_id, 0)
+                    status = 429 if left else 200
+                    if left:
+                        stub.throttle[chat_id] = left - 1
+                    stub.requests.append((time.monotonic(), chat_id, body["text"], status))
+                if status == 429:
+                    return self._reply(429, {"ok": False, "error_code": 429,
+                                             "description": f"Too Many Requests: retry after {stub.retry_after}",
+                                             "parameters": {"retry_after": stub.retry_after}})
+                self._reply(200, {"ok": True, "result": {"message_id": len(stub.requests)}})
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def delivered(self, chat_id="chat"):
+        return [(t, text) for t, c, text, status in self.requests if c == chat_id and status == 200]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def alerts_in(text: str) -> list:
+    """Alerts carried by one message (a single alert or a digest)."""
+    if text.startswith("📦 *TradeVision Digest*"):
+        return text.split("\n\n", 1)[1].split(DIGEST_SEPARATOR)
+    return [text]
+
+
+def dispatcher(stub: TelegramStub, **kwargs) -> NotificationDispatcher:
+    return NotificationDispatcher(TOKEN, default_chat_id="chat", base_url=stub.url, **kwargs).start()
+
+
+def scenario_retry_after():
+    stub = TelegramStub(retry_after=1)
+    stub.throttle["chat"] = 1
+    d = dispatcher(stub, min_interval=0.1, backoff_base=0.05)
+    d.enqueue("alert 0")
+    d.close(timeout=5.0)
+    stub.close()
+
+    assert [s for _, _, _, s in stub.requests] == [429, 200], stub.requests
+    wait = stub.requests[1][0] - stub.requests[0][0]
+    assert wait >= stub.retry_after * 0.95, f"retried after {wait:.2f}s, retry_after was {stub.retry_after}s"
+    assert [text for _, text in stub.delivered()] == ["alert 0"]
+    m = d.metrics()
+    assert m["sent"] == 1 and m["retries"] == 1 and m["failed"] == 0, m
+    return f"429 honoured: retried after {wait:.2f}s (retry_after={stub.retry_after}s), delivered once"
+
+
+def scenario_digest():
+    stub = TelegramStub()
+    min_interval = 0.5
+    d = dispatcher(stub, min_interval=min_interval)
+    d.enqueue("alert 0")
+    time.sleep(0.2)  # first alert goes out alone, the chat is now throttled
+    sent = ["alert 0"]
+    for i in range(1, 31):
+        # Long enough that the burst needs more than one digest
+        text = f"alert {i} " + "x" * 400
+        d.enqueue(text)
+        sent.append(text)
+    d.close(timeout=10.0)
+    stub.close()
+
+    delivered = stub.delivered()
+    received = [alert for _, text in delivered for alert in alerts_in(text)]
+    assert received == sent, "alerts lost, duplicated or reordered"
+    assert len(delivered) < len(sent), f"{len(delivered)} requests for {len(sent)} alerts: nothing coalesced"
+    assert all(len(text) <= MAX_MESSAGE_CHARS for _, text in delivered)
+    gaps = [b - a for (a, _), (b, _) in zip(delivered, delivered[1:])]
+    assert min(gaps) >= min_interval * 0.95, f"requests {min(gaps):.2f}s apart, min_interval={min_interval}s"
+    m = d.metrics()
+    assert m["digests"] >= 2 and m["coalesced"] == len(sent) - 1, m
+    return (f"{len(sent)} alerts in {len(delivered)} requests ({m['digests']} digests), "
+            f"min gap {min(gaps):.2f}s, max {max(len(t) for _, t in delivered)} chars")
+
+
+def scenario_chats():
+    stub = TelegramStub(retry_after=2)
+    stub.throttle["slow"] = 1
+    d = dispatcher(stub, min_interval=0.1)
+    start = time.monotonic()
+    d.enqueue("to slow", chat_id="slow")
+    d.enqueue("to fast", chat_id="fast")
+    d.close(timeout=5.0)
+    stub.close()
+
+    fast = stub.delivered("fast")
+    slow = stub.delivered("slow")
+    assert [t for _, t in fast] == ["to fast"] and [t for _, t in slow] == ["to slow"]
+    assert fast[0][0] - start < 1.0, "throttled chat delayed the other chat"
+    assert slow[0][0] - start >= stub.retry_after * 0.95
+    return f"fast chat after {fast[0][0] - start:.2f}s, throttled chat after {slow[0][0] - start:.2f}s"
+
+
+SCENARIOS = {"retry_after": scenario_retry_after, "digest": scenario_digest, "chats": scenario_chats}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", default="all", choices=["all"] + list(SCENARIOS))
+    args = parser.parse_args()
+    for name, run in SCENARIOS.items():
+        if args.scenario in ("all", name):
+            print(f"{name:<12}: {run()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,158 @@
-import sys
-import os
-import signal
-import time
-from dotenv import load_dotenv
-load_dotenv()
-
-
-# Ensure src is in path so we can import modules
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-from core.connector import ZMQSubscriber
-from agent.agent import TradeAnalystAgent
-
-def main():
-    print("==========================================")
-    print("   OPTIMAX TRADEVISION - AGENTIC CORE     ")
-    print("==========================================")
-    
-    # 1. Initialize Agent
-    bot = TradeAnalystAgent()
-    
-    # 2. Callback for Network Events
-    stats = {"count": 0}
-
-    def on_data(data):
-        # Heartbeat: Show basic flow every 20 messages
-        if 'e' in data and data['e'] == 'trade':
-            stats["count"] += 1
-            if stats["count"] >= 20:
-                symbol = data.get('s', 'BTCUSDT')
-                price = data.get('p', '0')
-                # Minimalist dim log
-                print(f"\033[90m[RAW] {symbol} @ {price} | Listening...\033[0m")
-                stats["count"] = 0
-            
-            bot.process_tick(data)
-        elif 'e' in data:
-            pass
-
-    # 3. Initialize Network Connector
-    connector = ZMQSubscriber(topic="trade", host="tcp://127.0.0.1:5555")
-    
-    # 4. Handle Shutdown
-    def signal_handler(sig, frame):
-        print("\n[\033[93mSYS\033[0m] Shutdown signal received. Closing Eyes...")
-        connector.running = False
-        sys.exit(0)
-
-    signal.signal(signal.SIGINT, signal_handler)
-
-    # 5. Start Loop
-    # This blocks until interrupted
-    connector.start(callback=on_data)
-
-if __name__ == "__main__":
-    main()
+import sys
+import os
+import signal
+import time
+from dotenv import load_dotenv
+load_dotenv()
+
+
+# Ensure src is in path so we can import modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.async_connector import AsyncZMQSubscriber
+from core.latency import LatencyMonitor
+from core.shedding import LoadShedder
+from core.tick import Tick
+from core.wire import WIRE_FORMATS
+from agent.agent import TradeAnalystAgent
+from agent.sharding import ShardedAgentPool
+from infra.tick_store import TickStore, TickStoreWriter
+
+def main():
+    print("==========================================")
+    print("   OPTIMAX TRADEVISION - AGENTIC CORE     ")
+    print("==========================================")
+
+    # TRADEVISION_WIRE_FORMAT: "json" (topic "trade", raw Binance JSON) or "bin" (topic "trade.bin", core/wire.py)
+    wire_format = os.getenv("TRADEVISION_WIRE_FORMAT", "json")
+    if wire_format not in WIRE_FORMATS:
+        print(f"[\033[91mERR\033[0m] Unknown TRADEVISION_WIRE_FORMAT '{wire_format}' (use {', '.join(WIRE_FORMATS)})")
+        return
+    topic, decoder = WIRE_FORMATS[wire_format]
+
+    # Latency histograms: periodic [LAT] line, JSON/Prometheus files if TRADEVISION_METRICS_DIR is set
+    latency = LatencyMonitor(
+        interval=float(os.getenv("TRADEVISION_LATENCY_INTERVAL", "30")),
+        export_dir=os.getenv("TRADEVISION_METRICS_DIR"),
+    ).start()
+
+    # 1. Initialize Agent
+    bot = TradeAnalystAgent(latency=latency)
+
+    # TRADEVISION_CAPTURE_DIR enables tick capture; the same store backfills stale snapshots
+    capture_dir = os.getenv("TRADEVISION_CAPTURE_DIR")
+    store = TickStore(capture_dir) if capture_dir else None
+    capture = TickStoreWriter(capture_dir) if capture_dir else None
+
+    # TRADEVISION_WORKERS > 0 shards per-symbol strategy state across worker processes;
+    # the agent keeps the sentiment/notification layers in this process.
+    workers = int(os.getenv("TRADEVISION_WORKERS", "0"))
+    pool = None
+    if workers > 0:
+        # Each worker restores and snapshots its own symbols (<path>.<shard>)
+        snapshot = {
+            "path": bot.snapshot_path,
+            "interval": bot.snapshotter.interval,
+            "max_age": float(os.getenv("TRADEVISION_SNAPSHOT_MAX_AGE", "900")),
+            "backfill": store.backfill if store else None,
+        }
+        pool = ShardedAgentPool(on_signal=bot.decide, workers=workers, strategy_factory=bot.book.strategy_factory,
+                                decision_interval=bot.book.decision_interval, snapshot=snapshot,
+                                bar_spec=bot.bars.spec if bot.bars else None, latency=latency).start()
+    else:
+        bot.restore_state(backfill=store.backfill if store else None)
+    
+    # 2. Callback for Network Events
+    stats = {"count": 0}
+
+    def on_data(tick: Tick):
+        # Non-trade events never reach here (the decoder returns None for them)
+        # Heartbeat: Show basic flow every 20 messages
+        stats["count"] += 1
+        if stats["count"] >= 20:
+            # Minimalist dim log
+            print(f"\033[90m[RAW] {tick.symbol} @ {tick.price} | Listening...\033[0m")
+            stats["count"] = 0
+        
+        if pool:
+            pool.submit(tick)
+        else:
+            bot.process_tick(tick)
+
+    def on_batch(ticks: list):
+        stats["count"] += len(ticks)
+        if stats["count"] >= 20:
+            last = ticks[-1]
+            print(f"\033[90m[RAW] {last.symbol} @ {last.price} | batch={len(ticks)} | Listening...\033[0m")
+            stats["count"] = 0
+
+        if pool:
+            pool.submit_batch(ticks)
+        else:
+            bot.process_batch(ticks)
+
+    # 3. Initialize Network Connector
+    # TRADEVISION_BATCH_SIZE > 1 enables micro-batching: one strategy pass per batch
+    batch_size = int(os.getenv("TRADEVISION_BATCH_SIZE", "1"))
+    # Load shedding once the consumer falls behind (queue wait > TRADEVISION_SHED_LAG_MS or
+    # depth > TRADEVISION_SHED_QUEUE): conflate | sample | drop-oldest | off.
+    # TRADEVISION_SHED_EXCHANGE_LAG=1 also counts exchange event age (above the skew floor).
+    shedder = LoadShedder(
+        mode=os.getenv("TRADEVISION_SHED_MODE", "conflate"),
+        max_lag_ms=float(os.getenv("TRADEVISION_SHED_LAG_MS", "1000")),
+        max_depth=int(os.getenv("TRADEVISION_SHED_QUEUE", "5000")),
+        sample_every=int(os.getenv("TRADEVISION_SHED_SAMPLE", "10")),
+        keep=int(os.getenv("TRADEVISION_SHED_KEEP", "1000")),
+        exchange_lag=os.getenv("TRADEVISION_SHED_EXCHANGE_LAG", "0") == "1"
+    )
+    # Receiving runs on asyncio; ticks are processed on a consumer thread behind a bounded queue
+    connector = AsyncZMQSubscriber(
+        topic=topic,
+        host="tcp://127.0.0.1:5555",
+        queue_size=int(os.getenv("TRADEVISION_QUEUE_SIZE", "10000")),
+        decoder=decoder,
+        batch_size=batch_size,
+        capture=capture,
+        latency=latency,
+        shedder=shedder
+    )
+    
+    latency.add_source("connector", connector.get_stats)
+    if pool:
+        # Worker-side processed count and the backlog still queued for the shards
+        latency.add_source("shards", pool.metrics)
+    if bot.news is not None:
+        # Sentiment staleness, refresh latency and fetch failures
+        latency.add_source("sentiment", bot.news.metrics)
+    if bot.ensemble_profile is not None and not pool:
+        # Per-strategy cost/value (sharded workers keep their own, unreported, profiles)
+        latency.add_source("ensemble", bot.ensemble_profile.snapshot)
+
+    # 4. Handle Shutdown
+    def signal_handler(sig, frame):
+        print("\n[\033[93mSYS\033[0m] Shutdown signal received. Closing Eyes...")
+        connector.stop()
+
+    signal.signal(signal.SIGINT, signal_handler)
+
+    # 5. Start Loop
+    # This blocks until stop() is requested
+    try:
+        if batch_size > 1:
+            connector.start(batch_callback=on_batch)
+        else:
+            connector.start(callback=on_data)
+    finally:
+        if pool:
+            # Workers snapshot their own shards; signals still in flight reach
+            # bot.decide before the notifier and decision log are flushed below
+            pool.close()
+            bot.close()
+        else:
+            bot.shutdown()
+        if capture:
+            capture.close()
+        latency.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Layer 2 off the tick path: CryptoPanic is polled on a background thread over
+a pooled keep-alive session, and the latest (score, headline) is published as
+one immutable snapshot. Readers on the tick path only read an attribute.
+"""
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from sentiment.scorer import DEFAULT_LEXICON, DecayingSentiment, KeywordMatcher, load_lexicon
+
+API_URL = "https://cryptopanic.com/api/v1/posts/"
+
+# What current() returns once the snapshot is older than the TTL
+STALE_POLICIES = ("neutral", "last", "block")
+# "block" reports strong negative news so the News-Lock holds BUY signals
+BLOCK_SCORE = -1.0
+
+
+class SentimentSnapshot:
+    """Immutable result of one refresh; replaced as a whole, never mutated."""
+    __slots__ = ("score", "headline", "updated_at")
+
+    def __init__(self, score: float, headline: str, updated_at: float):
+        self.score = score
+        self.headline = headline
+        self.updated_at = updated_at
+
+
+class SentimentService:
+    """
+    Background CryptoPanic refresher.
+    current() (also the instance itself, as a callable) returns the cached
+    (score, headline); once the snapshot is older than `ttl` seconds the
+    `stale_policy` decides: "neutral" -> 0.0, "last" -> last value,
+    "block" -> BLOCK_SCORE so BUY signals are held.
+    """
+
+    def __init__(self, token: str, refresh_interval: float = 60.0, ttl: float = 300.0,
+                 stale_policy: str = "neutral", timeout: float = 10.0, posts: int = 20,
+                 scorer: Optional[DecayingSentiment] = None):
+        if stale_policy not in STALE_POLICIES:
+            raise ValueError(f"stale_policy must be one of {STALE_POLICIES}")
+        self.token = token
+        self.refresh_interval = refresh_interval
+        self.ttl = ttl
+        self.stale_policy = stale_policy
+        self.timeout = timeout
+        self.posts = posts
+        # Posts are scored once by id; the score decays with post age
+        self.scorer = scorer or DecayingSentiment(KeywordMatcher(load_lexicon(DEFAULT_LEXICON)))
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.snapshot = SentimentSnapshot(0.0, "Sentiment warming up", 0.0)
+
+        # Metrics
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+        self.stale_reads = 0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sentiment-refresher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        self.session.close()
+
+    def current(self):
+        snap = self.snapshot
+        if time.time() - snap.updated_at <= self.ttl:
+            return snap.score, snap.headline
+        self.stale_reads += 1
+        if self.stale_policy == "last" and snap.updated_at:
+            return snap.score, f"{snap.headline} (stale)"
+        if self.stale_policy == "block":
+            return BLOCK_SCORE, "Sentiment stale: BUY signals held"
+        return 0.0, "Sentiment stale (news feed unavailable)"
+
+    __call__ = current
+
+    def refresh(self) -> bool:
+        """One fetch; publishes a new snapshot on success, keeps the previous one on failure."""
+        start = time.perf_counter()
+        try:
+            response = self.session.get(API_URL, params={"auth_token": self.token, "kind": "news"},
+                                        timeout=self.timeout)
+            if response.status_code != 200:
+                raise requests.RequestException(f"HTTP {response.status_code}")
+            posts = response.json().get('results', [])[:self.posts]
+            score, headline = self.scorer.update(posts)
+        except (requests.RequestException, ValueError) as e:
+            self._failed(str(e))
+            return False
+        finally:
+            self.last_latency = time.perf_counter() - start
+            self.total_latency += self.last_latency
+
+        self.snapshot = SentimentSnapshot(score, headline, time.time())
+        self.refreshes += 1
+        return True
+
+    def _failed(self, error: str):
+        self.failures += 1
+        # Connection errors quote the request URL; keep the API token out of logs and metrics
+        self.last_error = error.replace(self.token, "***") if self.token else error
+        print(f"[\033[91mERR\033[0m] Sentiment refresh failed: {self.last_error}")
+
+    def metrics(self) -> dict:
+        attempts = self.refreshes + self.failures
+        updated_at = self.snapshot.updated_at
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "refresh_latency_sec": round(self.last_latency, 4),
+            "avg_refresh_latency_sec": round(self.total_latency / attempts, 4) if attempts else 0.0,
+            "staleness_sec": round(time.time() - updated_at, 1) if updated_at else None,
+            "stale": time.time() - updated_at > self.ttl,
+            "stale_reads": self.stale_reads,
+            "posts_scored": self.scorer.scored,
+            "post_cache_hits": self.scorer.cache_hits,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                ok = self.refresh()
+            except Exception as e:
+                # A body that is not the expected object (e.g. a JSON list) or a scorer fault
+                # must not end the thread: the snapshot would silently go stale for good
+                self._failed(f"{type(e).__name__}: {e}")
+                ok = False
+            if ok:
+                m = self.metrics()
+                print(f"\033[90m[SENTIMENT] score={self.snapshot.score} refresh={m['refresh_latency_sec']}s "
+                      f"failures={m['failures']}\033[0m")
+            self._stop.wait(self.refresh_interval)
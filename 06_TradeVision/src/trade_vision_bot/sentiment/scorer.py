@@ -0,0 +1,140 @@
+"""
+Headline scoring for Layer 2.
+
+One compiled regex with word boundaries matches every lexicon term in a
+single pass per title ("fed" no longer hits "federal"). Terms carry weights
+loaded from a JSON lexicon. Posts are scored once and remembered by
+CryptoPanic post id; the market score is a running sum of post scores that
+decays exponentially with post age, updated incrementally as new posts arrive.
+"""
+import datetime
+import json
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_LEXICON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon.json")
+
+
+def load_lexicon(path: str = DEFAULT_LEXICON) -> Dict[str, float]:
+    """{"positive": {term: weight}, "negative": {term: weight}} -> {term: signed weight}."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    weights = {}
+    for term, weight in data.get("positive", {}).items():
+        weights[_normalize(term)] = abs(float(weight))
+    for term, weight in data.get("negative", {}).items():
+        weights[_normalize(term)] = -abs(float(weight))
+    return weights
+
+
+def _normalize(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+class KeywordMatcher:
+    """
+    All lexicon terms compiled into one regex. The alternation is factored as a
+    prefix trie (one branch per distinct next character), so the cost per title
+    barely grows with the lexicon; titles are lower-cased once instead of
+    matching case-insensitively. Multi-word terms accept any whitespace.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self.pattern = re.compile(rf"\b(?:{_trie_pattern(weights)})\b")
+
+    def score(self, title: str) -> float:
+        weights = self.weights
+        total = 0.0
+        for term in self.pattern.findall(title.lower()):
+            weight = weights.get(term)
+            if weight is None:
+                weight = weights[_normalize(term)]
+            total += weight
+        return total
+
+
+def _trie_pattern(terms) -> str:
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + build(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A term may end here: the longer continuation is optional (and tried first)
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class DecayingSentiment:
+    """
+    Incremental market score: sum over posts of clip(post score, -1, 1) * 0.5 ** (age / half_life).
+    Each post id is scored once (bounded LRU of ids); update() only touches new posts.
+    """
+
+    def __init__(self, matcher: KeywordMatcher, half_life: float = 3600.0, cache_size: int = 5000):
+        self.matcher = matcher
+        self.decay = math.log(2) / half_life if half_life > 0 else 0.0
+        self.cache_size = cache_size
+        self.seen: "OrderedDict[object, float]" = OrderedDict()
+        self.total = 0.0
+        self.as_of = None
+        self.headline = "No relevant news found"
+        self.scored = 0
+        self.cache_hits = 0
+
+    def value(self, now: Optional[float] = None) -> float:
+        if self.as_of is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return self.total * math.exp(-self.decay * max(now - self.as_of, 0.0))
+
+    def update(self, posts: List[dict], now: Optional[float] = None) -> Tuple[float, str]:
+        """Adds unseen posts (CryptoPanic order: newest first). Returns (score, headline)."""
+        now = time.time() if now is None else now
+        total = self.value(now)
+        new_headline = None
+        for post in posts:
+            key = post.get("id") or post.get("title")
+            if key in self.seen:
+                self.cache_hits += 1
+                self.seen.move_to_end(key)
+                continue
+            title = post.get("title") or ""
+            score = max(-1.0, min(1.0, self.matcher.score(title)))
+            self.scored += 1
+            self.seen[key] = score
+            if len(self.seen) > self.cache_size:
+                self.seen.popitem(last=False)
+            if score:
+                age = max(now - _published_at(post, now), 0.0)
+                total += score * math.exp(-self.decay * age)
+                if new_headline is None:
+                    new_headline = title
+        self.total = total
+        self.as_of = now
+        if new_headline is not None:
+            self.headline = new_headline
+        return round(total, 4), self.headline
+
+
+def _published_at(post: dict, default: float) -> float:
+    stamp = post.get("published_at") or post.get("created_at")
+    if not stamp:
+        return default
+    try:
+        return datetime.datetime.fromisoformat(stamp.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return default
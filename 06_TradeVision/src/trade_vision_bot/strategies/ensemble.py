@@ -0,0 +1,431 @@
+"""
+Strategy ensemble: several strategies per symbol, one shared indicator state,
+one weighted vote.
+
+IndicatorState holds a symbol's indicators keyed by (kind, period): every
+strategy asking for EMA(20) gets the same instance, and all simple moving
+averages are running sums over one shared price window. A strategy with a
+bind(state) method (TechnicalStrategy, MovingAverageStrategy) reads from the
+shared state instead of owning indicators; any other strategy keeps its own
+state and receives update() calls as usual.
+
+The shared state saves work only when members ask for the same indicators.
+The default technical,sma spec shares none (EMA 20/200 + RSI 14 vs SMA 10/50),
+so there the ensemble costs somewhat more per tick than running its members
+side by side (about 0.9x in benchmarks/bench_ensemble.py): what it buys is
+the combined vote and one snapshot record per symbol, not speed.
+
+StrategyEnsemble has the strategy interface SymbolBook expects (update /
+update_many / evaluate), so the agent runs it per tick, per micro-batch or per
+bar (TRADEVISION_BARS) like any single strategy. Votes: BUY = +1, SELL = -1,
+HOLD = 0, WAIT abstains. score = sum(weight * vote) / sum(weight of voters);
+BUY if score >= threshold, SELL if score <= -threshold, else HOLD.
+
+EnsembleProfile (shared by all symbols) samples one evaluation in
+`sample_every` and records, per member: evaluation time, how often its
+non-HOLD votes agreed with the ensemble, and how often it was pivotal (the
+outcome would change without it). Expensive members that are rarely pivotal
+are candidates to drop.
+"""
+import struct
+import time
+from functools import partial
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from strategies.indicators import EMA, RingBuffer, WilderRSI
+from strategies.moving_average import MovingAverageStrategy
+from strategies.technical_strategy import TechnicalStrategy
+
+# Name -> factory for TRADEVISION_ENSEMBLE specs
+STRATEGIES: Dict[str, Callable[[], object]] = {
+    "technical": TechnicalStrategy,
+    "sma": MovingAverageStrategy,
+}
+
+_VOTES = {"BUY": 1, "SELL": -1, "HOLD": 0}
+_WAIT = {"signal": "WAIT", "rsi": 50.0, "trend": "Initializing", "score": 0.0, "votes": {}}
+
+_U32 = struct.Struct("<I")
+_D = struct.Struct("<d")
+
+
+def parse_members(spec: str, registry: Dict[str, Callable[[], object]] = None) -> List[Tuple[str, Callable, float]]:
+    """'technical:1,sma:0.5' -> [(name, factory, weight), ...]; the weight defaults to 1."""
+    registry = registry or STRATEGIES
+    members = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, weight = item.partition(":")
+        name = name.strip().lower()
+        if name not in registry:
+            raise ValueError(f"Unknown ensemble strategy '{name}' (use {', '.join(sorted(registry))})")
+        members.append((name, registry[name], float(weight) if weight else 1.0))
+    if not members:
+        raise ValueError("Empty ensemble spec")
+    return members
+
+
+class WindowMean:
+    """SMA as a running sum over the state's shared price window (same arithmetic as indicators.SMA)."""
+    __slots__ = ("period", "window", "total", "value")
+
+    def __init__(self, period: int, window: RingBuffer):
+        self.period = period
+        self.window = window
+        self.total = 0.0
+        self.value = None
+
+    def update(self, price: float):
+        """Runs before `price` is pushed into the shared window."""
+        window = self.window
+        period = self.period
+        held = window.count
+        if held >= period:
+            # window.ago(period - 1), inlined
+            self.total += price - window.data[(window.head - period) % window.capacity]
+            self.value = self.total / period
+        else:
+            self.total += price
+            if held + 1 == period:
+                self.value = self.total / period
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+
+class IndicatorState:
+    """
+    One symbol's shared indicators. Register everything (bind strategies)
+    before the first update(): the price window is sized to the longest SMA.
+    """
+
+    def __init__(self):
+        self.emas: Dict[int, EMA] = {}
+        self.rsis: Dict[int, WilderRSI] = {}
+        self.means: Dict[int, WindowMean] = {}
+        self.window = RingBuffer(1)
+        self.last_price = None
+        # Bound update methods of every registered indicator, run in order on each price
+        self._updates = []
+        self._push = None
+
+    def ema(self, period: int) -> EMA:
+        ema = self.emas.get(period)
+        if ema is None:
+            ema = self.emas[period] = EMA(period)
+            self._updates.append(ema.update)
+        return ema
+
+    def rsi(self, period: int = 14) -> WilderRSI:
+        rsi = self.rsis.get(period)
+        if rsi is None:
+            rsi = self.rsis[period] = WilderRSI(period)
+            self._updates.append(rsi.update)
+        return rsi
+
+    def sma(self, period: int) -> WindowMean:
+        mean = self.means.get(period)
+        if mean is None:
+            if period > self.window.capacity:
+                self.window = RingBuffer(period)
+                for other in self.means.values():
+                    other.window = self.window
+            mean = self.means[period] = WindowMean(period, self.window)
+            self._updates.append(mean.update)
+            self._push = self.window.push
+        return mean
+
+    def update(self, price: float):
+        for update in self._updates:
+            update(price)
+        push = self._push
+        if push is not None:
+            push(price)
+        self.last_price = price
+
+    def pack(self) -> bytes:
+        parts = [e.pack() for e in self.emas.values()] + [r.pack() for r in self.rsis.values()]
+        parts += [_D.pack(m.total) for m in self.means.values()]
+        parts.append(self.window.pack())
+        return b"".join(parts)
+
+    def unpack_from(self, buf, offset: int) -> int:
+        """
+        Restores in place; the registrations must match the ones that were packed.
+        Indicator objects are kept (members are bound to them and their update
+        methods are registered), only their state is overwritten.
+        """
+        for ema in self.emas.values():
+            offset = ema.load_from(buf, offset)
+        for rsi in self.rsis.values():
+            offset = rsi.load_from(buf, offset)
+        for mean in self.means.values():
+            (mean.total,) = _D.unpack_from(buf, offset)
+            offset += _D.size
+        offset = self.window.load_from(buf, offset)
+        for mean in self.means.values():
+            mean.value = mean.total / mean.period if self.window.count >= mean.period else None
+        self.last_price = self.window.last() if self.window.count else None
+        return offset
+
+
+class _MemberStats:
+    __slots__ = ("weight", "samples", "ns", "votes", "agreed", "pivotal")
+
+    def __init__(self, weight: float):
+        self.weight = weight
+        self.samples = 0
+        self.ns = 0
+        self.votes = 0
+        self.agreed = 0
+        self.pivotal = 0
+
+
+class EnsembleProfile:
+    """Sampled per-member cost and value statistics, shared by every symbol's ensemble."""
+
+    def __init__(self, sample_every: int = 64):
+        self.sample_every = max(1, sample_every)
+        self.members: Dict[str, _MemberStats] = {}
+        self.evaluations = 0
+        self.samples = 0
+        self.state_samples = 0
+        self.state_ns = 0
+        self._countdown = 1
+        self._state_countdown = 1
+
+    def should_sample(self) -> bool:
+        self.evaluations += 1
+        self._countdown -= 1
+        if self._countdown:
+            return False
+        self._countdown = self.sample_every
+        self.samples += 1
+        return True
+
+    def snapshot(self) -> dict:
+        """Per member: mean evaluation cost, share of ensemble time, vote agreement and pivotal rate."""
+        total_ns = sum(m.ns for m in self.members.values())
+        out = {"evaluations": self.evaluations, "samples": self.samples,
+               "state_update_us": round(self.state_ns / self.state_samples / 1000.0, 3) if self.state_samples else 0.0,
+               "members": {}}
+        for name, m in self.members.items():
+            out["members"][name] = {
+                "weight": m.weight,
+                "mean_us": round(m.ns / m.samples / 1000.0, 3) if m.samples else 0.0,
+                "time_share": round(m.ns / total_ns, 3) if total_ns else 0.0,
+                "vote_rate": round(m.votes / m.samples, 3) if m.samples else 0.0,
+                "agreement": round(m.agreed / m.votes, 3) if m.votes else 0.0,
+                "pivotal": round(m.pivotal / m.samples, 3) if m.samples else 0.0,
+            }
+        return out
+
+    def report(self) -> str:
+        snap = self.snapshot()
+        lines = [f"[\033[92mENSEMBLE\033[0m] {snap['evaluations']:,} evaluations, {snap['samples']:,} sampled; "
+                 f"shared state update {snap['state_update_us']} us",
+                 f"    {'member':<12} {'weight':>6} {'mean_us':>8} {'time%':>6} {'votes%':>7} {'agree%':>7} {'pivotal%':>9}"]
+        for name, m in snap["members"].items():
+            lines.append(f"    {name:<12} {m['weight']:>6g} {m['mean_us']:>8.3f} {m['time_share'] * 100:>6.1f} "
+                         f"{m['vote_rate'] * 100:>7.1f} {m['agreement'] * 100:>7.1f} {m['pivotal'] * 100:>9.1f}")
+        return "\n".join(lines)
+
+
+def _decide(score: float, weight: float, threshold: float) -> str:
+    if weight <= 0:
+        return "WAIT"
+    score /= weight
+    if score >= threshold:
+        return "BUY"
+    if score <= -threshold:
+        return "SELL"
+    return "HOLD"
+
+
+class StrategyEnsemble:
+    """A symbol's ensemble: members bound to one IndicatorState, combined by weighted vote."""
+
+    # Bumped whenever the packed state layout changes (snapshots with another version are ignored)
+    STATE_VERSION = 1
+
+    def __init__(self, members: Sequence[Tuple[str, Callable[[], object], float]], threshold: float = 0.5,
+                 profile: EnsembleProfile = None):
+        self.state = IndicatorState()
+        self.names = [name for name, _, _ in members]
+        self.weights = [weight for _, _, weight in members]
+        self.strategies = []
+        self.own = []  # Members that keep their own state
+        for _, factory, _ in members:
+            strategy = factory()
+            if hasattr(strategy, "bind"):
+                strategy.bind(self.state)
+            else:
+                self.own.append(strategy)
+            self.strategies.append(strategy)
+        self.threshold = threshold
+        self.profile = profile
+        self._members = list(zip(self.names, self.weights, self.strategies))
+        self._result = {"signal": "WAIT", "rsi": 50.0, "trend": "NEUTRAL", "score": 0.0, "votes": {}}
+        # The per-tick path is picked once instead of branching on every update
+        if profile is not None:
+            for name, weight in zip(self.names, self.weights):
+                if name not in profile.members:
+                    profile.members[name] = _MemberStats(weight)
+            self.update = self._update_profiled
+        elif not self.own:
+            # Every member reads the shared state: a tick is only the state update
+            self.update = self.state.update
+
+    @property
+    def last_price(self):
+        return self.state.last_price
+
+    def update(self, price: float):
+        self.state.update(price)
+        for strategy in self.own:
+            strategy.update(price)
+
+    def _update_profiled(self, price: float):
+        profile = self.profile
+        profile._state_countdown -= 1
+        if not profile._state_countdown:
+            profile._state_countdown = profile.sample_every
+            start = time.perf_counter_ns()
+            self.state.update(price)
+            profile.state_ns += time.perf_counter_ns() - start
+            profile.state_samples += 1
+        else:
+            self.state.update(price)
+        for strategy in self.own:
+            strategy.update(price)
+
+    def update_many(self, prices):
+        update = self.update
+        for price in prices:
+            update(price)
+
+    def replay(self, ticks):
+        """Snapshot backfill: members with a replay() hook (MultiTimeframeStrategy) get the timestamped Ticks."""
+        ticks = list(ticks)
+        update = self.state.update
+        for t in ticks:
+            update(t.price)
+        prices = [t.price for t in ticks]
+        for strategy in self.own:
+            if hasattr(strategy, "replay"):
+                strategy.replay(ticks)
+            else:
+                strategy.update_many(prices)
+
+    def evaluate(self) -> dict:
+        profile = self.profile
+        if profile is not None and profile.should_sample():
+            return self._evaluate_profiled(profile)
+
+        score = 0.0
+        weight = 0.0
+        votes = {}
+        rsi = trend = None
+        for name, w, strategy in self._members:
+            r = strategy.evaluate()
+            signal = r["signal"]
+            votes[name] = signal
+            if signal == "WAIT":
+                continue
+            score += w * _VOTES.get(signal, 0)
+            weight += w
+            if rsi is None:
+                rsi = r.get("rsi")
+            if trend is None:
+                trend = r.get("trend")
+        return self._combine(score, weight, votes, rsi, trend)
+
+    def _evaluate_profiled(self, profile: EnsembleProfile) -> dict:
+        clock = time.perf_counter_ns
+        score = 0.0
+        weight = 0.0
+        votes = {}
+        cast = []
+        rsi = trend = None
+        for name, w, strategy in self._members:
+            start = clock()
+            r = strategy.evaluate()
+            elapsed = clock() - start
+            stats = profile.members[name]
+            stats.samples += 1
+            stats.ns += elapsed
+            signal = r["signal"]
+            votes[name] = signal
+            if signal == "WAIT":
+                continue
+            vote = _VOTES.get(signal, 0)
+            cast.append((stats, w, vote))
+            score += w * vote
+            weight += w
+            if rsi is None:
+                rsi = r.get("rsi")
+            if trend is None:
+                trend = r.get("trend")
+        result = self._combine(score, weight, votes, rsi, trend)
+        final = result["signal"]
+        for stats, w, vote in cast:
+            if vote:
+                stats.votes += 1
+                if _VOTES.get(final) == vote:
+                    stats.agreed += 1
+            if _decide(score - w * vote, weight - w, self.threshold) != final:
+                stats.pivotal += 1
+        return result
+
+    def _combine(self, score, weight, votes, rsi, trend) -> dict:
+        signal = _decide(score, weight, self.threshold)
+        if signal == "WAIT":
+            return _WAIT
+        result = self._result
+        result["signal"] = signal
+        result["score"] = score / weight
+        result["votes"] = votes
+        result["rsi"] = rsi if rsi is not None else self._fallback_rsi()
+        result["trend"] = trend or "NEUTRAL"
+        return result
+
+    def _fallback_rsi(self) -> float:
+        rsi = self.state.rsis.get(14)
+        return rsi.value if rsi is not None else 50.0
+
+    # --- Snapshots -----------------------------------------------------------
+
+    def pack_state(self) -> bytes:
+        """Member names, the shared indicator state and the state of members that keep their own."""
+        names = ",".join(self.names).encode("ascii")
+        parts = [_U32.pack(len(names)), names, self.state.pack()]
+        for strategy in self.own:
+            state = strategy.pack_state() if hasattr(strategy, "pack_state") else b""
+            parts.append(_U32.pack(len(state)))
+            parts.append(state)
+        return b"".join(parts)
+
+    def load_state(self, buf: bytes):
+        """Raises ValueError for a state packed by another ensemble (load_snapshot then skips the symbol)."""
+        (n,) = _U32.unpack_from(buf, 0)
+        offset = _U32.size
+        names = bytes(buf[offset:offset + n]).decode("ascii").split(",")
+        if names != self.names:
+            # Start fresh rather than mix indicator states
+            raise ValueError(f"ensemble state of {','.join(names)} loaded into {','.join(self.names)}")
+        offset = self.state.unpack_from(buf, offset + n)
+        for strategy in self.own:
+            (n,) = _U32.unpack_from(buf, offset)
+            offset += _U32.size
+            if n and hasattr(strategy, "load_state"):
+                strategy.load_state(buf[offset:offset + n])
+            offset += n
+
+
+def ensemble_factory(spec: str, threshold: float = 0.5, profile: EnsembleProfile = None,
+                     registry: Dict[str, Callable[[], object]] = None):
+    """SymbolBook strategy factory for an ensemble spec such as 'technical:1,sma:0.5'."""
+    return partial(StrategyEnsemble, parse_members(spec, registry), threshold=threshold, profile=profile)
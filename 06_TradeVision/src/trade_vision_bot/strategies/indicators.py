@@ -0,0 +1,309 @@
+"""
+Incremental technical indicators.
+
+Every indicator keeps its state in fixed-size `array('d')` ring buffers or plain
+floats, so `update()` is O(1) regardless of the window length and allocates no
+containers. `value` is None (or the documented neutral value) until the
+indicator has seen enough data.
+"""
+from array import array
+import math
+import struct
+
+# Compact binary state (snapshots). Missing values (None) are stored as NaN.
+_RING_STATE = struct.Struct("<iqq")
+_SMA_STATE = struct.Struct("<id")
+_EMA_STATE = struct.Struct("<iqdd")
+_RSI_STATE = struct.Struct("<iqdddd")
+
+
+def _opt(value) -> float:
+    return math.nan if value is None else value
+
+
+def _from_opt(value: float):
+    return None if value != value else value
+
+
+class RingBuffer:
+    """Fixed-capacity circular buffer of floats."""
+    __slots__ = ("capacity", "data", "head", "count")
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be >= 1")
+        self.capacity = capacity
+        self.data = array('d', bytes(8 * capacity))
+        self.head = 0   # Next write position
+        self.count = 0
+
+    def push(self, value: float) -> float:
+        """Appends a value and returns the evicted one (NaN while not full)."""
+        head = self.head
+        evicted = self.data[head] if self.count == self.capacity else math.nan
+        self.data[head] = value
+        head += 1
+        self.head = 0 if head == self.capacity else head
+        if self.count < self.capacity:
+            self.count += 1
+        return evicted
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.capacity
+
+    def last(self) -> float:
+        return self.data[self.head - 1] if self.count else math.nan
+
+    def ago(self, n: int) -> float:
+        """Value pushed `n` pushes before the latest (0 = latest); NaN if no longer held."""
+        if n >= self.count:
+            return math.nan
+        return self.data[(self.head - 1 - n) % self.capacity]
+
+    def values(self) -> list:
+        """Oldest-to-newest copy. O(n): meant for snapshots and debugging, not the tick path."""
+        if self.count < self.capacity:
+            return self.data[:self.count].tolist()
+        return (self.data[self.head:] + self.data[:self.head]).tolist()
+
+    def __len__(self):
+        return self.count
+
+    def pack(self) -> bytes:
+        return _RING_STATE.pack(self.capacity, self.head, self.count) + self.data.tobytes()
+
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0):
+        ring = cls(_RING_STATE.unpack_from(buf, offset)[0])
+        return ring, ring.load_from(buf, offset)
+
+    def load_from(self, buf, offset: int = 0) -> int:
+        """Restores in place (holders of this instance see the state); returns the offset after it."""
+        capacity, head, count = _RING_STATE.unpack_from(buf, offset)
+        if capacity != self.capacity:
+            raise ValueError(f"RingBuffer({capacity}) state loaded into RingBuffer({self.capacity})")
+        offset += _RING_STATE.size
+        self.data[:] = array('d', bytes(buf[offset:offset + 8 * capacity]))
+        self.head, self.count = head, count
+        return offset + 8 * capacity
+
+
+class SMA:
+    """Simple moving average over a ring buffer with a running sum."""
+    __slots__ = ("period", "buffer", "total", "value")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.buffer = RingBuffer(period)
+        self.total = 0.0
+        self.value = None
+
+    def update(self, x: float):
+        evicted = self.buffer.push(x)
+        if evicted == evicted:  # Not NaN: the window was full
+            self.total += x - evicted
+        else:
+            self.total += x
+        if self.buffer.count == self.period:
+            self.value = self.total / self.period
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def pack(self) -> bytes:
+        return _SMA_STATE.pack(self.period, self.total) + self.buffer.pack()
+
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0):
+        sma = cls(_SMA_STATE.unpack_from(buf, offset)[0])
+        return sma, sma.load_from(buf, offset)
+
+    def load_from(self, buf, offset: int = 0) -> int:
+        """Restores in place (holders of this instance see the state); returns the offset after it."""
+        period, total = _SMA_STATE.unpack_from(buf, offset)
+        if period != self.period:
+            raise ValueError(f"SMA({period}) state loaded into SMA({self.period})")
+        offset = self.buffer.load_from(buf, offset + _SMA_STATE.size)
+        self.total = total
+        self.value = total / period if self.buffer.count == period else None
+        return offset
+
+
+class RollingVariance:
+    """
+    Population variance over a sliding window, updated with the windowed
+    Welford recurrence (numerically stable, no re-summing of the window).
+    """
+    __slots__ = ("period", "buffer", "mean", "m2", "value")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.buffer = RingBuffer(period)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.value = None
+
+    def update(self, x: float):
+        evicted = self.buffer.push(x)
+        mean = self.mean
+        if evicted == evicted:
+            # Replace the oldest sample with x
+            new_mean = mean + (x - evicted) / self.period
+            self.m2 += (x - evicted) * (x - new_mean + evicted - mean)
+        else:
+            new_mean = mean + (x - mean) / self.buffer.count
+            self.m2 += (x - mean) * (x - new_mean)
+        self.mean = new_mean
+        if self.buffer.count == self.period:
+            self.value = max(self.m2 / self.period, 0.0)
+        return self.value
+
+    @property
+    def std(self):
+        return math.sqrt(self.value) if self.value is not None else None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+
+class EMA:
+    """
+    Exponential moving average seeded with the SMA of the first `period` values
+    (the same seeding TechnicalStrategy has always used). No price history is kept.
+    """
+    __slots__ = ("period", "k", "count", "seed_sum", "value")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = None
+
+    def update(self, x: float):
+        value = self.value
+        if value is None:
+            self.count += 1
+            self.seed_sum += x
+            if self.count == self.period:
+                self.value = self.seed_sum / self.period
+        else:
+            self.value = value + self.k * (x - value)
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def pack(self) -> bytes:
+        return _EMA_STATE.pack(self.period, self.count, self.seed_sum, _opt(self.value))
+
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0):
+        ema = cls(_EMA_STATE.unpack_from(buf, offset)[0])
+        return ema, ema.load_from(buf, offset)
+
+    def load_from(self, buf, offset: int = 0) -> int:
+        """Restores in place (holders of this instance see the state); returns the offset after it."""
+        period, count, seed_sum, value = _EMA_STATE.unpack_from(buf, offset)
+        if period != self.period:
+            raise ValueError(f"EMA({period}) state loaded into EMA({self.period})")
+        self.count, self.seed_sum, self.value = count, seed_sum, _from_opt(value)
+        return offset + _EMA_STATE.size
+
+
+class WilderRSI:
+    """
+    RSI with Wilder smoothing: the first averages are the mean gain/loss of the
+    first `period` deltas, then avg = (avg * (period - 1) + x) / period.
+    `value` is 50 (neutral) until warmed up.
+    """
+    __slots__ = ("period", "count", "avg_gain", "avg_loss", "last_price", "value")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.last_price = None
+        self.value = 50.0
+
+    def update(self, price: float) -> float:
+        last = self.last_price
+        self.last_price = price
+        if last is None:
+            return self.value
+
+        delta = price - last
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        n = self.period
+
+        if self.count < n:
+            self.count += 1
+            self.avg_gain += gain / n
+            self.avg_loss += loss / n
+            if self.count < n:
+                return self.value
+        else:
+            self.avg_gain = (self.avg_gain * (n - 1) + gain) / n
+            self.avg_loss = (self.avg_loss * (n - 1) + loss) / n
+
+        if self.avg_loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def pack(self) -> bytes:
+        return _RSI_STATE.pack(self.period, self.count, self.avg_gain, self.avg_loss,
+                               _opt(self.last_price), self.value)
+
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0):
+        rsi = cls(_RSI_STATE.unpack_from(buf, offset)[0])
+        return rsi, rsi.load_from(buf, offset)
+
+    def load_from(self, buf, offset: int = 0) -> int:
+        """Restores in place (holders of this instance see the state); returns the offset after it."""
+        period, count, avg_gain, avg_loss, last_price, value = _RSI_STATE.unpack_from(buf, offset)
+        if period != self.period:
+            raise ValueError(f"WilderRSI({period}) state loaded into WilderRSI({self.period})")
+        self.count, self.avg_gain, self.avg_loss = count, avg_gain, avg_loss
+        self.last_price, self.value = _from_opt(last_price), value
+        return offset + _RSI_STATE.size
+
+
+class MACD:
+    """MACD line (fast EMA - slow EMA), signal line (EMA of MACD) and histogram."""
+    __slots__ = ("fast", "slow", "signal", "macd", "histogram")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.macd = None
+        self.histogram = None
+
+    def update(self, x: float):
+        fast = self.fast.update(x)
+        slow = self.slow.update(x)
+        if slow is None:
+            return None
+        self.macd = fast - slow
+        signal = self.signal.update(self.macd)
+        if signal is not None:
+            self.histogram = self.macd - signal
+        return self.macd
+
+    @property
+    def ready(self) -> bool:
+        return self.histogram is not None
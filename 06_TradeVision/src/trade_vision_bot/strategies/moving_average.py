@@ -1,46 +1,75 @@
-from collections import deque
-import statistics
-
-class MovingAverageStrategy:
-    def __init__(self, short_window=10, long_window=50):
-        self.short_window = short_window
-        self.long_window = long_window
-        self.short_ma_buffer = deque(maxlen=short_window)
-        self.long_ma_buffer = deque(maxlen=long_window)
-        
-        self.initialized = False
-
-    def update(self, price: float):
-        self.short_ma_buffer.append(price)
-        self.long_ma_buffer.append(price)
-        
-        if len(self.long_ma_buffer) == self.long_window:
-            self.initialized = True
-
-    def evaluate(self) -> dict:
-        if not self.initialized:
-            return {"signal": "WAIT", "reason": "Gathering data..."}
-
-        short_avg = statistics.mean(self.short_ma_buffer)
-        long_avg = statistics.mean(self.long_ma_buffer)
-
-        # Simple crossover logic
-        # Ideally we'd compare with previous tick to detect the *moment* of crossover, 
-        # but for this agentic loop we'll just report the current state.
-        
-        trend = "BULLISH" if short_avg > long_avg else "BEARISH"
-        strength = abs(short_avg - long_avg)
-
-        # Generate signal
-        # A simple state-based signal, usually you want logic for entry/exit.
-        # Here: If Short > Long -> BUY Zone. If Short < Long -> SELL Zone.
-        
-        signal = "BUY" if short_avg > long_avg else "SELL"
-        
-        return {
-            "signal": signal,
-            "short_ma": short_avg,
-            "long_ma": long_avg,
-            "trend": trend,
-            "diff": strength
-        }
+from strategies.indicators import SMA
+
+class MovingAverageStrategy:
+    # Bumped whenever the packed state layout changes (snapshots with another version are ignored)
+    STATE_VERSION = 1
+
+    def __init__(self, short_window=10, long_window=50):
+        self.short_window = short_window
+        self.long_window = long_window
+        # O(1) running-sum averages instead of statistics.mean over deques
+        self.short_ma = SMA(short_window)
+        self.long_ma = SMA(long_window)
+        
+        self.initialized = False
+
+    def update(self, price: float):
+        self.short_ma.update(price)
+        self.long_ma.update(price)
+        
+        if self.long_ma.ready:
+            self.initialized = True
+
+    def update_many(self, prices):
+        """Ingests a micro-batch in one pass; call evaluate() once afterwards."""
+        short_update = self.short_ma.update
+        long_update = self.long_ma.update
+        for price in prices:
+            short_update(price)
+            long_update(price)
+        
+        if self.long_ma.ready:
+            self.initialized = True
+
+    def bind(self, state):
+        """Ensemble mode: both averages come from the shared IndicatorState (one price window per symbol)."""
+        self.short_ma = state.sma(self.short_window)
+        self.long_ma = state.sma(self.long_window)
+
+    def pack_state(self) -> bytes:
+        """Compact binary state (both price ring buffers) for snapshots."""
+        return self.short_ma.pack() + self.long_ma.pack()
+
+    def load_state(self, buf: bytes):
+        # In place: raises ValueError if the state was packed with other windows
+        offset = self.short_ma.load_from(buf, 0)
+        self.long_ma.load_from(buf, offset)
+        self.initialized = self.long_ma.ready
+
+    def evaluate(self) -> dict:
+        if not self.long_ma.ready:
+            return {"signal": "WAIT", "reason": "Gathering data..."}
+
+        short_avg = self.short_ma.value
+        long_avg = self.long_ma.value
+
+        # Simple crossover logic
+        # Ideally we'd compare with previous tick to detect the *moment* of crossover, 
+        # but for this agentic loop we'll just report the current state.
+        
+        trend = "BULLISH" if short_avg > long_avg else "BEARISH"
+        strength = abs(short_avg - long_avg)
+
+        # Generate signal
+        # A simple state-based signal, usually you want logic for entry/exit.
+        # Here: If Short > Long -> BUY Zone. If Short < Long -> SELL Zone.
+        
+        signal = "BUY" if short_avg > long_avg else "SELL"
+        
+        return {
+            "signal": signal,
+            "short_ma": short_avg,
+            "long_ma": long_avg,
+            "trend": trend,
+            "diff": strength
+        }
@@ -0,0 +1,182 @@
+"""
+Struct-of-arrays indicator state for thousands of symbols.
+
+Instead of one TechnicalStrategy object per symbol, EMA(20/200), Wilder RSI
+accumulators and warm-up counters live in contiguous NumPy arrays indexed by a
+symbol id. A micro-batch of ticks is applied with scatter operations and the
+TechnicalStrategy rules are evaluated for every symbol at once. Per symbol the
+arithmetic is the same as the streaming indicators, in the same order, so the
+results are identical to running TechnicalStrategy per symbol.
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from strategies.vectorized import BEARISH, BULLISH, BUY, HOLD, SELL, WAIT
+
+
+class VectorizedSymbolEngine:
+    """TechnicalStrategy state for many symbols, one array slot per symbol id."""
+
+    def __init__(self, capacity: int = 1024, ema_fast: int = 20, ema_slow: int = 200, rsi_period: int = 14):
+        self.fast_period = ema_fast
+        self.slow_period = ema_slow
+        self.rsi_period = rsi_period
+        self.k_fast = 2.0 / (ema_fast + 1)
+        self.k_slow = 2.0 / (ema_slow + 1)
+        self.ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self._allocate(capacity)
+
+    # --- Symbol registry -------------------------------------------------
+
+    def symbol_id(self, symbol: str) -> int:
+        sid = self.ids.get(symbol)
+        if sid is None:
+            sid = len(self.symbols)
+            if sid == self.capacity:
+                self._grow(self.capacity * 2)
+            self.ids[symbol] = sid
+            self.symbols.append(symbol)
+        return sid
+
+    def symbol_ids(self, symbols: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.symbol_id(s) for s in symbols), dtype=np.int64, count=len(symbols))
+
+    # --- Updates ---------------------------------------------------------
+
+    def update_batch(self, ids: np.ndarray, prices: np.ndarray):
+        """
+        Applies a micro-batch of ticks (symbol ids + prices, in arrival order).
+        Ticks of the same symbol depend on each other, so the batch is applied in
+        rounds: round r scatters the r-th tick of every symbol present in the batch.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if ids.size == 0:
+            return
+
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+        starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+        if starts.size == ids.size:
+            # Fast path: every symbol appears at most once
+            self._step(ids, prices)
+            return
+
+        # Position of each tick within its symbol's run (stable sort keeps arrival order)
+        rank = np.arange(ids.size) - np.repeat(starts, np.diff(np.r_[starts, ids.size]))
+        sorted_prices = prices[order]
+        for r in range(int(rank.max()) + 1):
+            sel = rank == r
+            self._step(sorted_ids[sel], sorted_prices[sel])
+
+    def _step(self, ids: np.ndarray, px: np.ndarray):
+        """One tick for each (unique) id in `ids`."""
+        count = self.count[ids] + 1
+        self.count[ids] = count
+
+        for period, k, seed, ema in ((self.fast_period, self.k_fast, self.fast_seed, self.ema_fast),
+                                     (self.slow_period, self.k_slow, self.slow_seed, self.ema_slow)):
+            warming = count <= period
+            if warming.any():
+                w_ids = ids[warming]
+                seed[w_ids] += px[warming]
+                done = count[warming] == period
+                if done.any():
+                    d_ids = w_ids[done]
+                    ema[d_ids] = seed[d_ids] / period
+            live = ~warming
+            if live.any():
+                l_ids = ids[live]
+                value = ema[l_ids]
+                ema[l_ids] = value + k * (px[live] - value)
+
+        # Wilder RSI accumulators
+        last = self.last_price[ids]
+        has_last = ~np.isnan(last)
+        self.last_price[ids] = px
+        if not has_last.any():
+            return
+        r_ids = ids[has_last]
+        delta = px[has_last] - last[has_last]
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        n = self.rsi_period
+        rsi_count = self.rsi_count[r_ids]
+
+        seeding = rsi_count < n
+        if seeding.any():
+            s_ids = r_ids[seeding]
+            self.avg_gain[s_ids] += gain[seeding] / n
+            self.avg_loss[s_ids] += loss[seeding] / n
+            self.rsi_count[s_ids] = rsi_count[seeding] + 1
+        smoothing = ~seeding
+        if smoothing.any():
+            m_ids = r_ids[smoothing]
+            self.avg_gain[m_ids] = (self.avg_gain[m_ids] * (n - 1) + gain[smoothing]) / n
+            self.avg_loss[m_ids] = (self.avg_loss[m_ids] * (n - 1) + loss[smoothing]) / n
+
+    # --- Evaluation ------------------------------------------------------
+
+    def rsi(self) -> np.ndarray:
+        n = len(self.symbols)
+        ready = self.rsi_count[:n] >= self.rsi_period
+        avg_gain = self.avg_gain[:n]
+        avg_loss = self.avg_loss[:n]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        rsi[avg_loss == 0] = 100.0
+        rsi[~ready] = 50.0
+        return rsi
+
+    def evaluate(self) -> np.ndarray:
+        """TechnicalStrategy.evaluate rules for every registered symbol; returns signal codes by symbol id."""
+        n = len(self.symbols)
+        fast = self.ema_fast[:n]
+        slow = self.ema_slow[:n]
+        rsi = self.rsi()
+
+        bullish = fast > slow
+        bearish = fast < slow
+        signal = np.full(n, HOLD, dtype=np.int8)
+        signal[bullish & (rsi > 40) & (rsi < 70)] = BUY
+        signal[bearish & (rsi > 30) & (rsi < 60)] = SELL
+        signal[rsi > 70] = SELL
+        signal[rsi < 30] = BUY
+        signal[self.count[:n] < self.slow_period] = WAIT
+        return signal
+
+    def trend(self) -> np.ndarray:
+        n = len(self.symbols)
+        trend = np.zeros(n, dtype=np.int8)
+        trend[self.ema_fast[:n] > self.ema_slow[:n]] = BULLISH
+        trend[self.ema_fast[:n] < self.ema_slow[:n]] = BEARISH
+        return trend
+
+    # --- Storage ---------------------------------------------------------
+
+    _FIELDS = (
+        ("ema_fast", np.float64, np.nan), ("ema_slow", np.float64, np.nan),
+        ("fast_seed", np.float64, 0.0), ("slow_seed", np.float64, 0.0),
+        ("avg_gain", np.float64, 0.0), ("avg_loss", np.float64, 0.0),
+        ("last_price", np.float64, np.nan),
+        ("count", np.int64, 0), ("rsi_count", np.int32, 0),
+    )
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        for name, dtype, fill in self._FIELDS:
+            setattr(self, name, np.full(capacity, fill, dtype=dtype))
+
+    def _grow(self, capacity: int):
+        for name, dtype, fill in self._FIELDS:
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=dtype)
+            new[:old.size] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def bytes_per_symbol(self) -> int:
+        """Indicator state footprint per symbol slot (excluding the symbol name registry)."""
+        return sum(np.dtype(dtype).itemsize for _, dtype, _ in self._FIELDS)
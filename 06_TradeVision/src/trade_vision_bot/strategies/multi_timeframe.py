@@ -0,0 +1,237 @@
+"""
+Multi-timeframe evaluation of the TechnicalStrategy rules from one price stream.
+
+Per symbol there is a single open base bar (the finest timeframe) and one
+shared ring buffer of base-bar closes. Every other timeframe must be a whole
+multiple of the base and is derived from the base closes:
+  * a trade only touches the open base bar: O(1) whatever the number of timeframes;
+  * when a base bar closes, a timeframe's indicators update only if its own
+    bar closed as well (1h over 1m: once every 60 base bars), so indicator work
+    per trade is sum(1 / ratio) instead of one full update per timeframe;
+  * the combined evaluation is cached and recomputed only on base-bar closes;
+  * per timeframe the state is EMA/RSI accumulators only; recent price history
+    is kept once, in a fixed-size shared ring of base closes (`closes(timeframe, n)`).
+Bars are aligned to the epoch on the strategy clock (event time in backtests);
+replay() buckets a snapshot backfill by the trades' own timestamps instead.
+Base bars without trades are carried forward as flat bars, so every
+higher-timeframe bar spans the same number of base bars. A gap longer than
+`max_flat_bars` bars of a timeframe (e.g. a restart without backfill) is not
+filled: that timeframe warms up again rather than ingest a flat, stale series.
+
+Agreement modes:
+    "trend"   the base timeframe gives the signal; every higher timeframe's EMA
+              trend must point the same way (BULLISH for BUY, BEARISH for SELL)
+    "signal"  every timeframe must give the same signal
+Anything that does not agree becomes HOLD. WAIT until all timeframes are warm.
+"""
+import math
+import struct
+import time
+from typing import Callable, List, Sequence, Union
+
+from core.bars import BarAggregator
+from strategies.indicators import RingBuffer
+from strategies.technical_strategy import TechnicalStrategy
+
+AGREEMENT_MODES = ("trend", "signal")
+
+_HEAD = struct.Struct("<qdqB")
+_U32 = struct.Struct("<I")
+
+
+def parse_timeframes(timeframes: Union[str, Sequence[str]]) -> List[tuple]:
+    """'1m,5m,1h' -> [(spec, ms), ...] sorted by length; each must be a multiple of the shortest."""
+    if isinstance(timeframes, str):
+        timeframes = [t for t in timeframes.split(",") if t.strip()]
+    frames = []
+    for spec in timeframes:
+        kind, size = BarAggregator.parse(spec)
+        if kind != "time":
+            raise ValueError(f"Timeframe '{spec}' must be a time bar spec (e.g. 1m, 5m, 1h)")
+        frames.append((spec.strip().lower(), size))
+    if not frames:
+        raise ValueError("No timeframes given")
+    frames.sort(key=lambda f: f[1])
+    base = frames[0][1]
+    for spec, size in frames:
+        if size % base:
+            raise ValueError(f"Timeframe '{spec}' is not a multiple of the base timeframe '{frames[0][0]}'")
+    return frames
+
+
+class MultiTimeframeStrategy:
+    """One symbol's TechnicalStrategy per timeframe, fed from a shared base-bar stream."""
+
+    # Bumped whenever the packed state layout changes (snapshots with another version are ignored)
+    STATE_VERSION = 1
+
+    def __init__(self, timeframes: Union[str, Sequence[str]] = ("1m", "5m", "1h"), agreement: str = "trend",
+                 clock: Callable[[], float] = time.time, history: int = 64, max_flat_bars: int = 10):
+        if agreement not in AGREEMENT_MODES:
+            raise ValueError(f"Unknown agreement mode '{agreement}' (use {', '.join(AGREEMENT_MODES)})")
+        frames = parse_timeframes(timeframes)
+        self.specs = [spec for spec, _ in frames]
+        self.base_ms = frames[0][1]
+        self.ratios = [size // self.base_ms for _, size in frames]
+        self.agreement = agreement
+        self.clock = clock
+        self.max_flat_bars = max_flat_bars
+        self.frames = [TechnicalStrategy() for _ in frames]
+        # Shared history of base closes (fixed size, whatever the number of timeframes)
+        self.history = RingBuffer(max(history, 1))
+        self.bucket = None      # Open base bar (epoch ms // base_ms)
+        self._next_close = -math.inf  # Clock time (s) at which the open base bar ends
+        self.close = None       # Last price in the open base bar
+        self.last_price = None
+        self._dirty = True
+        self._result = {"signal": "WAIT", "rsi": 50.0, "trend": "Initializing", "ema_20": None, "ema_200": None,
+                        "timeframes": {}}
+
+    def update(self, price: float):
+        now = self.clock()
+        if now >= self._next_close:
+            self._advance(now)
+        # Trades stamped before the open bar (clock skew) are folded into it, as in BarAggregator
+        self.close = price
+        self.last_price = price
+
+    def update_many(self, prices):
+        """Micro-batch: one clock read; the batch lands in the bar open at that time."""
+        if not prices:
+            return
+        self.update(prices[-1])
+
+    def replay(self, ticks):
+        """Snapshot backfill (agent/snapshot.py): Ticks in order, bucketed by their trade time."""
+        for t in ticks:
+            now = (t.trade_time or t.event_time) / 1000.0
+            if now >= self._next_close:
+                self._advance(now)
+            self.close = t.price
+        self.last_price = self.close
+
+    def _advance(self, now: float):
+        bucket = int(round(now * 1000)) // self.base_ms
+        if self.bucket is not None and bucket > self.bucket:
+            self._roll(bucket)
+        self.bucket = bucket
+        self._next_close = (bucket + 1) * self.base_ms / 1000.0
+
+    def _roll(self, bucket: int):
+        """Closes the open base bar, then any empty ones up to `bucket`, and cascades to higher timeframes."""
+        close = self.close
+        frames = self.frames
+        ratios = self.ratios
+        n = self.bucket + 1  # Base bars completed since the epoch
+        self.history.push(close)
+        for ratio, frame in zip(ratios, frames):
+            if n % ratio == 0:
+                frame.update(close)
+        if bucket == n:
+            self._dirty = True
+            return
+
+        # Base bars n+1 .. bucket had no trades
+        for i, ratio in enumerate(ratios):
+            flat = bucket // ratio - n // ratio  # This timeframe's bars that close inside the gap
+            if flat > self.max_flat_bars:
+                frames[i] = TechnicalStrategy()
+                if i == 0:
+                    self.history = RingBuffer(self.history.capacity)
+            else:
+                for _ in range(flat):
+                    frames[i].update(close)
+        if self.history.count:  # Empty if the base timeframe was just reset
+            for _ in range(min(bucket - n, self.history.capacity)):
+                self.history.push(close)
+        self._dirty = True
+
+    def closes(self, timeframe: str, n: int) -> List[float]:
+        """Last `n` closed bars of `timeframe`, oldest first, read from the shared history (may be fewer)."""
+        ratio = self.ratios[self.specs.index(timeframe)]
+        if self.bucket is None:
+            return []
+        # The latest base close sits at the end of bar (bucket - 1); step back to the timeframe boundary
+        offset = self.bucket % ratio
+        out = []
+        for i in range(n):
+            value = self.history.ago(offset + i * ratio)
+            if value != value:
+                break
+            out.append(value)
+        out.reverse()
+        return out
+
+    def evaluate(self) -> dict:
+        if not self._dirty:
+            return self._result
+        self._dirty = False
+        result = self._result
+        views = {}
+        warming = None
+        for spec, frame in zip(self.specs, self.frames):
+            r = frame.evaluate()
+            views[spec] = {"signal": r["signal"], "trend": r["trend"], "rsi": r["rsi"]}
+            if r["signal"] == "WAIT" and warming is None:
+                warming = spec
+        result["timeframes"] = views
+
+        if warming is not None:
+            result["signal"] = "WAIT"
+            result["trend"] = f"Initializing ({warming})"
+            result["rsi"] = views[self.specs[0]]["rsi"]
+            return result
+
+        base = self.frames[0]
+        primary = views[self.specs[0]]
+        signal = primary["signal"]
+        higher = [views[spec] for spec in self.specs[1:]]
+        if signal in ("BUY", "SELL"):
+            if self.agreement == "trend":
+                wanted = "BULLISH" if signal == "BUY" else "BEARISH"
+                if any(v["trend"] != wanted for v in higher):
+                    signal = "HOLD"
+            elif any(v["signal"] != signal for v in higher):
+                signal = "HOLD"
+
+        result["signal"] = signal
+        result["trend"] = primary["trend"]
+        result["rsi"] = primary["rsi"]
+        result["ema_20"] = base.ema_20
+        result["ema_200"] = base.ema_200
+        return result
+
+    # --- Snapshots -----------------------------------------------------------
+
+    def pack_state(self) -> bytes:
+        """Open bar, shared history and each timeframe's TechnicalStrategy state."""
+        specs = ",".join(self.specs).encode("ascii")
+        parts = [_HEAD.pack(-1 if self.bucket is None else self.bucket,
+                            math.nan if self.close is None else self.close, len(specs), len(self.frames)),
+                 specs, self.history.pack()]
+        for frame in self.frames:
+            state = frame.pack_state()
+            parts.append(_U32.pack(len(state)))
+            parts.append(state)
+        return b"".join(parts)
+
+    def load_state(self, buf: bytes):
+        """Raises ValueError for a state saved with other timeframes (load_snapshot then skips the symbol)."""
+        bucket, close, n_specs, n_frames = _HEAD.unpack_from(buf, 0)
+        offset = _HEAD.size
+        specs = bytes(buf[offset:offset + n_specs]).decode("ascii").split(",")
+        offset += n_specs
+        if specs != self.specs:
+            # Keep this instance fresh rather than mix series
+            raise ValueError(f"multi-timeframe state of {','.join(specs)} loaded into {','.join(self.specs)}")
+        self.history, offset = RingBuffer.unpack_from(buf, offset)
+        for frame in self.frames[:n_frames]:
+            (n,) = _U32.unpack_from(buf, offset)
+            offset += _U32.size
+            frame.load_state(buf[offset:offset + n])
+            offset += n
+        self.bucket = None if bucket < 0 else bucket
+        self._next_close = -math.inf if self.bucket is None else (self.bucket + 1) * self.base_ms / 1000.0
+        self.close = None if close != close else close
+        self.last_price = self.close
+        self._dirty = True
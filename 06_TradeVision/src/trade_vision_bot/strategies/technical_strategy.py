@@ -1,92 +1,121 @@
-from collections import deque
-import statistics
-
-class TechnicalStrategy:
-    def __init__(self):
-        self.prices = deque(maxlen=200) # Need 200 for EMA200
-        self.ema_20 = None
-        self.ema_200 = None
-        self.rsi_14 = None
-        self.gains = deque(maxlen=14)
-        self.losses = deque(maxlen=14)
-        self.last_price = None
-
-    def update(self, price: float):
-        self.prices.append(price)
-        
-        # Calculate RSI
-        if self.last_price is not None:
-            delta = price - self.last_price
-            if delta > 0:
-                self.gains.append(delta)
-                self.losses.append(0)
-            else:
-                self.gains.append(0)
-                self.losses.append(abs(delta))
-        
-        self.last_price = price
-        
-        # Calculate EMAs
-        self.ema_20 = self._calculate_ema(price, 20, self.ema_20)
-        self.ema_200 = self._calculate_ema(price, 200, self.ema_200)
-
-    def _calculate_ema(self, price, period, current_ema):
-        if len(self.prices) < period:
-            return None
-        if current_ema is None:
-            # Initialize with SMA
-            return sum(list(self.prices)[-period:]) / period
-        
-        k = 2 / (period + 1)
-        return (price * k) + (current_ema * (1 - k))
-
-    def get_rsi(self):
-        if len(self.gains) < 14:
-            return 50 # Neutral default
-        
-        avg_gain = sum(self.gains) / 14
-        avg_loss = sum(self.losses) / 14
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
-
-    def evaluate(self) -> dict:
-        if len(self.prices) < 200:
-             return {"signal": "WAIT", "rsi": 0, "trend": "Initializing"}
-
-        rsi = self.get_rsi()
-        trend = "NEUTRAL"
-        
-        # Determine Trend via EMA
-        if self.ema_20 > self.ema_200:
-            trend = "BULLISH"
-        elif self.ema_20 < self.ema_200:
-            trend = "BEARISH"
-
-        # Signal Logic with RSI Confluence
-        signal = "HOLD"
-        
-        # Buy: Bullish Trend + RSI oversold (<30) -> Reversal or strong dip buy? 
-        # Or Trend Following: Bullish + RSI healthy (40-70).
-        # Let's use Trend Following for this example as it's safer.
-        if trend == "BULLISH" and 40 < rsi < 70:
-            signal = "BUY"
-        elif trend == "BEARISH" and 30 < rsi < 60: # Selling in logic
-            signal = "SELL"
-        
-        # Overbought/Oversold Reversals (Counter-trend)
-        if rsi > 70:
-            signal = "SELL" # Too hot
-        elif rsi < 30:
-            signal = "BUY" # Oversold bounce
-
-        return {
-            "signal": signal,
-            "rsi": rsi,
-            "trend": trend,
-            "ema_20": self.ema_20,
-            "ema_200": self.ema_200
-        }
+import math
+import struct
+from strategies.indicators import EMA, WilderRSI
+
+_LAST_PRICE = struct.Struct("<d")
+
+class TechnicalStrategy:
+    """
+    RSI(14) + EMA(20/200) confluence strategy on top of the incremental indicator engine.
+    Each update is O(1); no price history is copied or re-summed.
+    """
+
+    # Bumped whenever the packed state layout changes (snapshots with another version are ignored)
+    STATE_VERSION = 1
+
+    # Shared, read-only result while warming up
+    _WAIT = {"signal": "WAIT", "rsi": 0, "trend": "Initializing"}
+
+    def __init__(self):
+        self._ema_20 = EMA(20)
+        self._ema_200 = EMA(200) # Need 200 prices for EMA200
+        self._rsi_14 = WilderRSI(14)
+        self.last_price = None
+        # Reused on every evaluate() to avoid a dict allocation per tick.
+        # Callers that keep a result beyond the current tick must copy it.
+        self._result = {"signal": "HOLD", "rsi": 50.0, "trend": "NEUTRAL", "ema_20": None, "ema_200": None}
+
+    @property
+    def ema_20(self):
+        return self._ema_20.value
+
+    @property
+    def ema_200(self):
+        return self._ema_200.value
+
+    @property
+    def rsi_14(self):
+        return self._rsi_14.value
+
+    def update(self, price: float):
+        self._rsi_14.update(price)
+        self._ema_20.update(price)
+        self._ema_200.update(price)
+        self.last_price = price
+
+    def update_many(self, prices):
+        """Ingests a micro-batch in one pass; call evaluate() once afterwards."""
+        rsi = self._rsi_14.update
+        ema_20 = self._ema_20.update
+        ema_200 = self._ema_200.update
+        for price in prices:
+            rsi(price)
+            ema_20(price)
+            ema_200(price)
+            self.last_price = price
+
+    def bind(self, state):
+        """
+        Ensemble mode: reads its indicators from a shared per-symbol IndicatorState
+        (strategies/ensemble.py), which updates them; update() is then not called.
+        """
+        self._ema_20 = state.ema(20)
+        self._ema_200 = state.ema(200)
+        self._rsi_14 = state.rsi(14)
+
+    def pack_state(self) -> bytes:
+        """Compact binary state for snapshots (see agent/snapshot.py)."""
+        last = math.nan if self.last_price is None else self.last_price
+        return self._ema_20.pack() + self._ema_200.pack() + self._rsi_14.pack() + _LAST_PRICE.pack(last)
+
+    def load_state(self, buf: bytes):
+        # In place, so references to the indicators (e.g. bound update methods) stay valid
+        offset = self._ema_20.load_from(buf, 0)
+        offset = self._ema_200.load_from(buf, offset)
+        offset = self._rsi_14.load_from(buf, offset)
+        (last,) = _LAST_PRICE.unpack_from(buf, offset)
+        self.last_price = None if last != last else last
+
+    def get_rsi(self):
+        # Wilder RSI; 50 (neutral) until 14 deltas have been seen
+        return self._rsi_14.value
+
+    def evaluate(self) -> dict:
+        ema_200 = self._ema_200.value
+        if ema_200 is None:
+             return self._WAIT
+
+        rsi = self._rsi_14.value
+        ema_20 = self._ema_20.value
+        trend = "NEUTRAL"
+        
+        # Determine Trend via EMA
+        if ema_20 > ema_200:
+            trend = "BULLISH"
+        elif ema_20 < ema_200:
+            trend = "BEARISH"
+
+        # Signal Logic with RSI Confluence
+        signal = "HOLD"
+        
+        # Buy: Bullish Trend + RSI oversold (<30) -> Reversal or strong dip buy? 
+        # Or Trend Following: Bullish + RSI healthy (40-70).
+        # Let's use Trend Following for this example as it's safer.
+        if trend == "BULLISH" and 40 < rsi < 70:
+            signal = "BUY"
+        elif trend == "BEARISH" and 30 < rsi < 60: # Selling in logic
+            signal = "SELL"
+        
+        # Overbought/Oversold Reversals (Counter-trend)
+        if rsi > 70:
+            signal = "SELL" # Too hot
+        elif rsi < 30:
+            signal = "BUY" # Oversold bounce
+
+        result = self._result
+        result["signal"] = signal
+        result["rsi"] = rsi
+        result["trend"] = trend
+        result["ema_20"] = ema_20
+        result["ema_200"] = ema_200
+        return result
@@ -0,0 +1,209 @@
+"""
+Vectorized (NumPy) counterparts of the streaming indicators and strategy rules.
+
+Meant for backfills, warm-ups and research over whole price arrays. Results
+match the streaming implementation in `strategies/indicators.py` within float
+tolerance (see benchmarks/bench_vectorized.py for the parity check):
+- EMA / Wilder averages use the exact recursive filter, via scipy.signal.lfilter
+  when SciPy is installed, otherwise a blocked closed form in pure NumPy.
+- SMA uses cumulative sums.
+Values before warm-up are NaN (RSI: 50, as in WilderRSI).
+"""
+import math
+
+import numpy as np
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+# Signal / trend codes for the array outputs
+WAIT, BUY, SELL, HOLD = 0, 1, 2, 3
+SIGNAL_NAMES = {WAIT: "WAIT", BUY: "BUY", SELL: "SELL", HOLD: "HOLD"}
+NEUTRAL, BULLISH, BEARISH = 0, 1, -1
+TREND_NAMES = {NEUTRAL: "NEUTRAL", BULLISH: "BULLISH", BEARISH: "BEARISH"}
+
+# Largest growth factor allowed inside one closed-form block (keeps the scaling well-conditioned)
+_MAX_BLOCK_GAIN = 1e8
+
+
+def smooth(x: np.ndarray, alpha: float, y0: float) -> np.ndarray:
+    """
+    First-order recursive filter: y[t] = y[t-1] + alpha * (x[t] - y[t-1]), with y[-1] = y0.
+    Returns y for every element of x.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.size == 0:
+        return x.copy()
+    a = 1.0 - alpha
+    if a == 0.0:
+        return x.copy()
+
+    if lfilter is not None:
+        y, _ = lfilter([alpha], [1.0, -a], x, zi=[a * y0])
+        return y
+
+    # Closed form inside blocks of length B, all blocks at once:
+    #   y[s+j] = a^(j+1) * y[s-1] + alpha * a^j * sum_{i<=j} x[s+i] * a^(-i)
+    # B is chosen so that a^(-B) stays below _MAX_BLOCK_GAIN. Only the per-block
+    # carries (one scalar per block) are propagated sequentially.
+    block = max(1, min(4096, int(math.log(_MAX_BLOCK_GAIN) / -math.log(a)), x.size))
+    n_blocks = -(-x.size // block)
+    padded = np.zeros(n_blocks * block)
+    padded[:x.size] = x
+    powers = a ** np.arange(block + 1, dtype=np.float64)        # a^0 .. a^B
+    local = np.cumsum(padded.reshape(n_blocks, block) / powers[:block], axis=1)
+    local *= alpha * powers[:block]                               # Block solutions with y[s-1] = 0
+
+    carries = np.empty(n_blocks)
+    a_block = powers[block]
+    prev = float(y0)
+    for i, last in enumerate(local[:, -1].tolist()):
+        carries[i] = prev
+        prev = a_block * prev + last
+    local += powers[1:block + 1] * carries[:, None]
+    return local.reshape(-1)[:x.size]
+
+
+def sma(prices: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average via cumulative sums."""
+    prices = np.asarray(prices, dtype=np.float64)
+    out = np.full(prices.shape, np.nan)
+    if prices.size < period:
+        return out
+    csum = np.cumsum(prices)
+    out[period - 1] = csum[period - 1]
+    out[period:] = csum[period:] - csum[:-period]
+    out[period - 1:] /= period
+    return out
+
+
+def ema(prices: np.ndarray, period: int) -> np.ndarray:
+    """EMA seeded with the SMA of the first `period` prices (same as indicators.EMA)."""
+    prices = np.asarray(prices, dtype=np.float64)
+    out = np.full(prices.shape, np.nan)
+    if prices.size < period:
+        return out
+    seed = prices[:period].sum() / period
+    out[period - 1] = seed
+    out[period:] = smooth(prices[period:], 2.0 / (period + 1), seed)
+    return out
+
+
+def wilder_rsi(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI (same seeding as indicators.WilderRSI); 50 until `period` deltas are available."""
+    prices = np.asarray(prices, dtype=np.float64)
+    out = np.full(prices.shape, 50.0)
+    if prices.size <= period:
+        return out
+    delta = np.diff(prices)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+
+    alpha = 1.0 / period
+    avg_gain = np.empty(delta.size - period + 1)
+    avg_loss = np.empty_like(avg_gain)
+    avg_gain[0] = gains[:period].sum() / period
+    avg_loss[0] = losses[:period].sum() / period
+    avg_gain[1:] = smooth(gains[period:], alpha, avg_gain[0])
+    avg_loss[1:] = smooth(losses[period:], alpha, avg_loss[0])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi[avg_loss == 0] = 100.0
+    out[period:] = rsi
+    return out
+
+
+def sma_crossover(prices: np.ndarray, short_window: int = 10, long_window: int = 50) -> np.ndarray:
+    """MovingAverageStrategy rules: BUY while short SMA > long SMA, SELL otherwise, WAIT during warm-up."""
+    return sma_rules(sma(prices, short_window), sma(prices, long_window))
+
+
+def sma_rules(short_ma: np.ndarray, long_ma: np.ndarray) -> np.ndarray:
+    """Signal codes from precomputed averages (any subset of positions)."""
+    signal = np.where(short_ma > long_ma, BUY, SELL).astype(np.int8)
+    signal[np.isnan(long_ma)] = WAIT
+    return signal
+
+
+def technical_signals(prices: np.ndarray, ema_fast: int = 20, ema_slow: int = 200, rsi_period: int = 14,
+                      buy_band=(40.0, 70.0), sell_band=(30.0, 60.0), overbought: float = 70.0,
+                      oversold: float = 30.0) -> dict:
+    """
+    TechnicalStrategy.evaluate rules over a whole price array.
+    Returns arrays: signal (codes), trend (codes), rsi, ema_fast, ema_slow.
+    The defaults are the thresholds hard-coded in TechnicalStrategy.
+    """
+    fast = ema(prices, ema_fast)
+    slow = ema(prices, ema_slow)
+    rsi = wilder_rsi(prices, rsi_period)
+    signal, trend = technical_rules(fast, slow, rsi, buy_band, sell_band, overbought, oversold)
+    return {"signal": signal, "trend": trend, "rsi": rsi, "ema_fast": fast, "ema_slow": slow}
+
+
+def technical_rules(fast: np.ndarray, slow: np.ndarray, rsi: np.ndarray, buy_band=(40.0, 70.0),
+                    sell_band=(30.0, 60.0), overbought: float = 70.0, oversold: float = 30.0):
+    """
+    (signal, trend) codes from precomputed indicator values. The inputs can be
+    any aligned subset of positions, e.g. only the ticks that pass the cooldown.
+    """
+    trend = np.zeros(fast.shape, dtype=np.int8)
+    trend[fast > slow] = BULLISH
+    trend[fast < slow] = BEARISH
+
+    signal = np.full(fast.shape, HOLD, dtype=np.int8)
+    signal[(trend == BULLISH) & (rsi > buy_band[0]) & (rsi < buy_band[1])] = BUY
+    signal[(trend == BEARISH) & (rsi > sell_band[0]) & (rsi < sell_band[1])] = SELL
+    signal[rsi > overbought] = SELL
+    signal[rsi < oversold] = BUY
+    signal[np.isnan(slow)] = WAIT
+    return signal, trend
+
+
+def seed_technical_strategy(strategy, prices: np.ndarray):
+    """
+    Warms a streaming TechnicalStrategy from a price history in one vectorized pass,
+    leaving it in the same state as if every price had gone through update().
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.size == 0:
+        return strategy
+    for indicator in (strategy._ema_20, strategy._ema_200):
+        n = indicator.period
+        if prices.size < n:
+            indicator.count = int(prices.size)
+            indicator.seed_sum = float(prices.sum())
+            indicator.value = None
+        else:
+            indicator.count = n
+            indicator.seed_sum = float(prices[:n].sum())
+            indicator.value = float(ema(prices, n)[-1])
+
+    rsi = strategy._rsi_14
+    n = rsi.period
+    deltas = prices.size - 1
+    rsi.last_price = float(prices[-1])
+    if deltas >= n:
+        delta = np.diff(prices)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+        avg_gain = gains[:n].sum() / n
+        avg_loss = losses[:n].sum() / n
+        if deltas > n:
+            avg_gain = smooth(gains[n:], 1.0 / n, avg_gain)[-1]
+            avg_loss = smooth(losses[n:], 1.0 / n, avg_loss)[-1]
+        rsi.count = n
+        rsi.avg_gain = float(avg_gain)
+        rsi.avg_loss = float(avg_loss)
+        rsi.value = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    else:
+        delta = np.diff(prices)
+        rsi.count = int(deltas)
+        rsi.avg_gain = float(np.where(delta > 0, delta, 0.0).sum() / n)
+        rsi.avg_loss = float(np.where(delta < 0, -delta, 0.0).sum() / n)
+        rsi.value = 50.0
+
+    strategy.last_price = float(prices[-1])
+    return strategy
@@ -4,6 +4,8 @@ import datetime
 import time
 from llm_provider import LLMProvider
 from telemetry import TelemetryManager
+from shadow import ShadowEvaluator
+from json_repair import normalize_decision
 
 class DecisionCore:
     """
@@ -16,6 +18,7 @@ class DecisionCore:
         self.telemetry = telemetry or TelemetryManager()
         self.prompt_path = os.path.join(os.path.dirname(__file__), "prompts", "system_prompt_v1.txt")
         self.audit_log_dir = os.path.join(os.path.dirname(__file__), "..", "src", "data", "audit")
+        self.shadow = ShadowEvaluator(telemetry=self.telemetry, pipeline=self._prepare_decision)
         
         # Load System Prompt
         try:
@@ -31,6 +34,7 @@ class DecisionCore:
         user_prompt = f"System Context JSON:\n{json.dumps(context_json, indent=2)}"
         timestamp = datetime.datetime.now().isoformat()
         start_time = time.time()
+        shadow_handle = None
         
         try:
             if "ERROR" in self.system_prompt:
@@ -38,16 +42,18 @@ class DecisionCore:
 
             # 1. AI Reasoning Request
             self.telemetry.log_event(decision_id, "ai_decision", "INFO", "Requesting LLM decision")
+            shadow_handle = self.shadow.start(decision_id, self.system_prompt, user_prompt)
             decision = self.provider.call(self.system_prompt, user_prompt)
             
             latency = time.time() - start_time
             decision["ai_latency_sec"] = round(latency, 3)
+            decision["ai_usage"] = dict(self.provider.last_usage)
 
-            # 2. Schema Validation
-            self._validate_schema(decision)
-            
-            # 3. Decision Safety Gate (Pre-execution validation)
-            decision = self._apply_safety_gate(decision, decision_id)
+            # 2. Repair Report, Schema Validation & Decision Safety Gate
+            decision = self._prepare_decision(decision, self.provider.last_repairs, decision_id)
+
+            # Shadow comparison against the repaired, gated decision that is actually returned
+            self.shadow.compare(shadow_handle, decision, decision["ai_latency_sec"], decision["ai_usage"])
             
             # 4. Success Log
             self._log_audit(decision, context_json, "success", timestamp, decision_id)
@@ -58,8 +64,23 @@ class DecisionCore:
             # 5. Fallback Transparency & Logging
             self.telemetry.log_failure(decision_id, "ai_decision", e)
             fallback_decision = self._handle_fallback(e, context_json, timestamp, decision_id)
+            self.shadow.compare(shadow_handle, fallback_decision, round(time.time() - start_time, 3), primary_failed=True)
             return fallback_decision
 
+    def _prepare_decision(self, decision: dict, parse_repairs: list, decision_id: str) -> dict:
+        """
+        Repair report, schema validation and Safety Gate on a parsed model output.
+        The shadow candidate goes through the same steps, so both sides are compared as executed.
+        """
+        repairs = parse_repairs + normalize_decision(decision)
+        if repairs:
+            decision["parse_repairs"] = repairs
+            self.telemetry.log_event(decision_id, "validation", "WARNING", "LLM output repaired before validation", {"repairs": repairs})
+        self._validate_schema(decision)
+
+        # Pre-execution validation
+        return self._apply_safety_gate(decision, decision_id)
+
     def _validate_schema(self, decision: dict):
         required = ["strategy", "confidence_score", "risk_level", "reasoning", "actions", "prompt_version"]
         for field in required:
@@ -0,0 +1,145 @@
+import json
+import re
+
+class JSONRepairError(ValueError):
+    """Raised when the LLM output cannot be turned into a JSON object, even after repairs."""
+
+
+_FENCE_RE = re.compile(r"^\s*```[a-zA-Z0-9_-]*\s*\n?(.*?)\n?\s*```\s*$", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+_PERCENT_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*%\s*$")
+RISK_LEVELS = ("low", "medium", "high")
+
+
+def parse_llm_json(text: str):
+    """
+    Tolerant JSON parsing for model output.
+    Returns (obj, repairs) where `repairs` lists the repairs that were applied.
+    Well-formed input takes the plain `json.loads` fast path with no extra cost.
+    Truncated output is never completed: a cut-off value ("hig" for "high", 0.8
+    for 0.85) or a partial action would be executed as if the model had said it,
+    so it raises and the caller falls back instead.
+    """
+    try:
+        obj = json.loads(text)
+        if isinstance(obj, dict):
+            return obj, []
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    if not isinstance(text, str):
+        raise JSONRepairError(f"Invalid JSON payload type: {type(text).__name__}")
+
+    repairs = []
+    candidate = text.strip()
+
+    match = _FENCE_RE.match(candidate)
+    if match:
+        candidate = match.group(1).strip()
+        repairs.append("strip_code_fence")
+    elif candidate.startswith("```"):
+        # Fence opened but never closed (truncated output)
+        candidate = candidate.split("\n", 1)[1] if "\n" in candidate else ""
+        repairs.append("strip_code_fence")
+
+    start = candidate.find("{")
+    if start == -1:
+        raise JSONRepairError("Invalid JSON: no object found in LLM output")
+    trimmed = candidate[start:]
+    end = trimmed.rfind("}")
+    if end != -1 and trimmed[end + 1:].strip():
+        # Only drop the tail if it follows a complete object (not a truncated one)
+        stack, in_str = _scan(trimmed[:end + 1])
+        if not stack and not in_str:
+            trimmed = trimmed[:end + 1]
+    if trimmed != candidate:
+        candidate = trimmed
+        repairs.append("strip_surrounding_text")
+
+    obj = _try_load(candidate)
+    if obj is not None:
+        return obj, repairs
+
+    without_commas = _TRAILING_COMMA_RE.sub(r"\1", candidate)
+    if without_commas != candidate:
+        candidate = without_commas
+        repairs.append("remove_trailing_commas")
+        obj = _try_load(candidate)
+        if obj is not None:
+            return obj, repairs
+
+    stack, in_str = _scan(candidate)
+    if stack or in_str:
+        raise JSONRepairError("Invalid JSON: LLM output is truncated")
+
+    raise JSONRepairError("Invalid JSON: LLM output could not be repaired")
+
+
+def normalize_decision(decision: dict) -> list:
+    """
+    Schema-aware coercions applied in place before `_validate_schema`.
+    Returns the list of repairs applied. Raises ValueError if `risk_level` is
+    not one of RISK_LEVELS, since the Safety Gate keys on its exact value.
+    """
+    repairs = []
+
+    confidence = decision.get("confidence_score")
+    if isinstance(confidence, str):
+        percent = _PERCENT_RE.match(confidence)
+        try:
+            decision["confidence_score"] = float(percent.group(1)) / 100.0 if percent else float(confidence.strip())
+            repairs.append("coerce_confidence_score")
+        except ValueError:
+            pass
+    elif isinstance(confidence, int) and not isinstance(confidence, bool):
+        decision["confidence_score"] = float(confidence)
+
+    risk = decision.get("risk_level")
+    if isinstance(risk, str) and risk != risk.strip().lower():
+        decision["risk_level"] = risk.strip().lower()
+        repairs.append("normalize_risk_level")
+    if "risk_level" in decision and decision["risk_level"] not in RISK_LEVELS:
+        raise ValueError(f"LLM response risk_level outside schema: {decision['risk_level']!r}")
+
+    actions = decision.get("actions")
+    if isinstance(actions, list):
+        normalized = False
+        for action in actions:
+            if isinstance(action, dict) and isinstance(action.get("risk"), str) and action["risk"] != action["risk"].strip().lower():
+                action["risk"] = action["risk"].strip().lower()
+                normalized = True
+        if normalized:
+            repairs.append("normalize_action_risk")
+
+    return repairs
+
+
+def _try_load(text: str):
+    try:
+        obj = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+def _scan(text: str):
+    """Returns (open containers stack, inside-string flag)."""
+    stack = []
+    in_str = False
+    escaped = False
+    for ch in text:
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+    return stack, in_str
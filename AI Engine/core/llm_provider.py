@@ -1,6 +1,7 @@
 import os
-import json
+import time
 import requests
+from json_repair import parse_llm_json
 
 class LLMProvider:
     """
@@ -8,15 +9,23 @@ class LLMProvider:
     Supports OpenAI, Gemini (via HTTP) or any OpenAI-compatible API (like Groq/OpenRouter).
     """
 
-    def __init__(self):
-        self.api_key = os.getenv("OPTIMAX_API_KEY")
-        self.provider = os.getenv("OPTIMAX_PROVIDER", "openai").lower() # openai, gemini, groq
-        self.model = os.getenv("OPTIMAX_MODEL", "gpt-3.5-turbo")
+    def __init__(self, provider: str = None, model: str = None, api_key: str = None):
+        # Explicit arguments let a second instance (e.g. a shadow candidate) target
+        # a different provider/model without touching the primary configuration.
+        self.api_key = api_key or os.getenv("OPTIMAX_API_KEY")
+        self.provider = (provider or os.getenv("OPTIMAX_PROVIDER", "openai")).lower() # openai, gemini, groq
+        self._explicit_model = model
+        self.model = model or os.getenv("OPTIMAX_MODEL", "gpt-3.5-turbo")
+        self.last_usage = {}
+        self.last_repairs = []
 
     def call(self, system_prompt: str, user_prompt: str) -> dict:
         if not self.api_key:
             raise ValueError("OPTIMAX_API_KEY environment variable is not set.")
 
+        self.last_usage = {}
+        self.last_repairs = []
+
         if self.provider == "openai" or self.provider == "groq":
             return self._call_openai_compatible(system_prompt, user_prompt)
         elif self.provider == "gemini":
@@ -28,7 +37,7 @@ class LLMProvider:
         url = "https://api.openai.com/v1/chat/completions"
         if self.provider == "groq":
             url = "https://api.groq.com/openai/v1/chat/completions"
-            self.model = os.getenv("OPTIMAX_MODEL", "llama3-8b-8192")
+            self.model = self._explicit_model or os.getenv("OPTIMAX_MODEL", "llama3-8b-8192")
 
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -44,11 +53,14 @@ class LLMProvider:
             "response_format": {"type": "json_object"}
         }
 
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
+        response, http = self._timed_post(url, headers, payload)
         
-        content = response.json()["choices"][0]["message"]["content"]
-        return json.loads(content)
+        body = response.json()
+        usage = body.get("usage") or {}
+        self._record_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"), http)
+
+        content = body["choices"][0]["message"]["content"]
+        return self._parse(content)
 
     def _call_gemini(self, system_prompt: str, user_prompt: str) -> dict:
         # Simplified Gemini API call
@@ -66,8 +78,56 @@ class LLMProvider:
             }
         }
 
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
+        response, http = self._timed_post(url, headers, payload)
         
-        content = response.json()["candidates"][0]["content"]["parts"][0]["text"]
-        return json.loads(content)
+        body = response.json()
+        usage = body.get("usageMetadata") or {}
+        self._record_usage(usage.get("promptTokenCount"), usage.get("candidatesTokenCount"), http)
+
+        content = body["candidates"][0]["content"]["parts"][0]["text"]
+        return self._parse(content)
+
+    def _timed_post(self, url: str, headers: dict, payload: dict):
+        """
+        POST with HTTP timing. The body is streamed so that time-to-first-byte
+        (headers received) can be separated from the full transfer time.
+        """
+        start = time.perf_counter()
+        response = requests.post(url, headers=headers, json=payload, stream=True)
+        ttfb = time.perf_counter() - start
+        raw = response.content  # Consumes the stream
+        total = time.perf_counter() - start
+        response.raise_for_status()
+
+        http = {
+            "ttfb_sec": round(ttfb, 3),
+            "http_sec": round(total, 3),
+            "request_bytes": len(response.request.body or b""),
+            "response_bytes": len(raw)
+        }
+        return response, http
+
+    def _record_usage(self, prompt_tokens, completion_tokens, http: dict):
+        """Normalizes provider token usage and throughput into `last_usage`."""
+        total_tokens = None
+        if prompt_tokens is not None or completion_tokens is not None:
+            total_tokens = (prompt_tokens or 0) + (completion_tokens or 0)
+
+        tokens_per_sec = None
+        if completion_tokens and http.get("http_sec"):
+            tokens_per_sec = round(completion_tokens / http["http_sec"], 1)
+
+        self.last_usage = {
+            "provider": self.provider,
+            "model": self.model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": total_tokens,
+            "tokens_per_sec": tokens_per_sec,
+            **http
+        }
+
+    def _parse(self, content: str) -> dict:
+        """Tolerant parse of the model output; the applied repairs are kept in `last_repairs`."""
+        decision, self.last_repairs = parse_llm_json(content)
+        return decision
@@ -50,9 +50,17 @@ class EngineOrchestrator:
 
         # 5. Record Final Engine Metrics
         total_duration = time.time() - start_time
+        usage = decision.get("ai_usage", {})
         metrics = {
             "total_duration_sec": round(total_duration, 3),
             "ai_latency_sec": decision.get("ai_latency_sec", 0),
+            "provider": self.brain.provider.provider,
+            "model": self.brain.provider.model,
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "tokens_per_sec": usage.get("tokens_per_sec"),
+            "ttfb_sec": usage.get("ttfb_sec"),
+            "http_sec": usage.get("http_sec"),
             "actions_proposed": len(decision.get("actions", [])),
             "actions_executable": len(executable_scripts)
         }
@@ -0,0 +1,242 @@
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from llm_provider import LLMProvider
+from telemetry import TelemetryManager
+
+class ShadowEvaluator:
+    """
+    Shadow Evaluation Mode.
+    Sends a sampled fraction of live contexts to a candidate prompt and/or model
+    concurrently with the primary call. The shadow result is only logged and
+    compared: it never modifies the returned decision and the primary path never waits for it.
+    The candidate output goes through the same `pipeline` as the primary (repairs,
+    schema validation, Safety Gate), so divergence compares what each would execute.
+
+    Configuration (environment):
+    - OPTIMAX_SHADOW_MODEL: candidate model (defaults to the primary model).
+    - OPTIMAX_SHADOW_PROVIDER: candidate provider (defaults to the primary provider).
+    - OPTIMAX_SHADOW_PROMPT: candidate prompt file, relative to `prompts/` or absolute.
+    - OPTIMAX_SHADOW_SAMPLE_RATE: fraction of decisions to shadow (0.0 - 1.0, default 0.1).
+    Shadow mode is enabled when a candidate model or prompt is configured.
+    """
+
+    def __init__(self, telemetry: TelemetryManager = None, pipeline=None):
+        self.telemetry = telemetry or TelemetryManager()
+        # pipeline(decision, parse_repairs, decision_id) -> decision; raises if it would fall back
+        self.pipeline = pipeline
+        self.model = os.getenv("OPTIMAX_SHADOW_MODEL")
+        self.prompt_file = os.getenv("OPTIMAX_SHADOW_PROMPT")
+        self.enabled = bool(self.model or self.prompt_file)
+        self._pending = []
+        self._lock = threading.Lock()
+
+        try:
+            self.sample_rate = min(max(float(os.getenv("OPTIMAX_SHADOW_SAMPLE_RATE", "0.1")), 0.0), 1.0)
+        except ValueError:
+            self.sample_rate = 0.1
+
+        if not self.enabled:
+            return
+
+        self.provider_name = os.getenv("OPTIMAX_SHADOW_PROVIDER")
+        # Describes the candidate in the log; calls use their own instance (see `start`)
+        self.provider = LLMProvider(provider=self.provider_name, model=self.model)
+        self.system_prompt = None
+        if self.prompt_file:
+            prompt_path = self.prompt_file
+            if not os.path.isabs(prompt_path):
+                prompt_path = os.path.join(os.path.dirname(__file__), "prompts", prompt_path)
+            try:
+                with open(prompt_path, 'r', encoding='utf-8') as f:
+                    self.system_prompt = f.read()
+            except Exception as e:
+                # A broken candidate must never affect the primary pipeline.
+                self.enabled = False
+                self.telemetry.log_event("shadow", "shadow", "ERROR", f"Shadow mode disabled, could not load prompt {prompt_path}: {str(e)}")
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def start(self, decision_id: str, system_prompt: str, user_prompt: str):
+        """
+        Launches the candidate call in a background thread.
+        Returns a handle to pass to `compare()`, or None if this decision is not sampled.
+        """
+        if not self.should_sample():
+            return None
+
+        handle = {
+            "decision_id": decision_id,
+            "done": threading.Event(),
+            "result": None,
+            "error": None,
+            "latency_sec": None,
+            "usage": {},
+            "model": None
+        }
+        prompt = self.system_prompt or system_prompt
+        # One provider per call: `last_usage` is per instance and shadow calls overlap
+        provider = LLMProvider(provider=self.provider_name, model=self.model)
+
+        def _run():
+            start_time = time.time()
+            try:
+                handle["result"] = provider.call(prompt, user_prompt)
+                handle["latency_sec"] = round(time.time() - start_time, 3)
+                if self.pipeline:
+                    handle["result"] = self.pipeline(handle["result"], provider.last_repairs, f"{decision_id}:shadow")
+            except Exception as e:
+                handle["error"] = e
+            if handle["latency_sec"] is None:
+                handle["latency_sec"] = round(time.time() - start_time, 3)
+            handle["usage"] = dict(provider.last_usage)
+            handle["model"] = provider.model
+            handle["done"].set()
+
+        # Daemon thread: a slow candidate can never keep the engine process alive.
+        thread = threading.Thread(target=_run, name=f"shadow-{decision_id}", daemon=True)
+        with self._lock:
+            self._pending.append(thread)
+        thread.start()
+        return handle
+
+    def compare(self, handle, primary_decision: dict, primary_latency: float, primary_usage: dict = None,
+                primary_failed: bool = False):
+        """
+        Registers the primary outcome. The comparison is recorded by a background
+        waiter once the candidate finishes, so this call returns immediately.
+        With `primary_failed` (the primary ended in the fallback) the row is logged
+        without divergence: the fallback baseline is not the primary's answer.
+        """
+        if handle is None:
+            return
+
+        primary = json.loads(json.dumps(primary_decision, default=str))
+
+        def _wait_and_record():
+            handle["done"].wait()
+            try:
+                self._record(handle, primary, primary_latency, primary_usage or {}, primary_failed)
+            except Exception as e:
+                self.telemetry.log_event(handle["decision_id"], "shadow", "ERROR", f"Shadow comparison failed: {str(e)}")
+
+        thread = threading.Thread(target=_wait_and_record, name=f"shadow-cmp-{handle['decision_id']}", daemon=True)
+        with self._lock:
+            self._pending.append(thread)
+        thread.start()
+
+    def drain(self, timeout: float = 30.0):
+        """Gives in-flight shadow calls a bounded chance to finish (e.g. before process exit)."""
+        deadline = time.time() + timeout
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for thread in pending:
+            thread.join(max(0.0, deadline - time.time()))
+
+    def _record(self, handle: dict, primary: dict, primary_latency: float, primary_usage: dict, primary_failed: bool):
+        candidate = handle["result"]
+        schema_valid = handle["error"] is None
+        schema_error = None if schema_valid else str(handle["error"])
+
+        entry = {
+            "candidate": {
+                "provider": self.provider.provider,
+                "model": handle["model"] or self.provider.model,
+                "prompt": self.prompt_file or "primary",
+                "prompt_version": (candidate or {}).get("prompt_version", "unknown") if isinstance(candidate, dict) else "unknown"
+            },
+            "primary": {
+                "failed": primary_failed,
+                "latency_sec": primary_latency,
+                "usage": primary_usage
+            },
+            "shadow": {
+                "latency_sec": handle["latency_sec"],
+                "usage": handle["usage"],
+                "schema_valid": schema_valid,
+                "error": schema_error
+            },
+            "divergence": self._divergence(primary, candidate) if schema_valid and not primary_failed else None
+        }
+        self.telemetry.record_shadow(handle["decision_id"], entry)
+
+    @staticmethod
+    def _divergence(primary: dict, candidate: dict) -> dict:
+        p_actions = {a.get("type") for a in primary.get("actions", []) if isinstance(a, dict)}
+        c_actions = {a.get("type") for a in candidate.get("actions", []) if isinstance(a, dict)}
+        union = p_actions | c_actions
+        try:
+            confidence_delta = round(float(candidate.get("confidence_score", 0.0)) - float(primary.get("confidence_score", 0.0)), 3)
+        except (TypeError, ValueError):
+            confidence_delta = None
+
+        return {
+            "risk_level_match": str(primary.get("risk_level", "")).lower() == str(candidate.get("risk_level", "")).lower(),
+            "actions_match": p_actions == c_actions,
+            "actions_jaccard": round(len(p_actions & c_actions) / len(union), 3) if union else 1.0,
+            "confidence_delta": confidence_delta
+        }
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[idx]
+
+
+def summarize_shadow_log(telemetry: TelemetryManager = None) -> dict:
+    """Builds the shadow summary report from `shadow.jsonl` and stores it in the metrics folder."""
+    telemetry = telemetry or TelemetryManager()
+    log_file = os.path.join(telemetry.logs_dir, "shadow.jsonl")
+    groups = {}
+
+    if os.path.exists(log_file):
+        with open(log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                result = entry.get("shadow", {})
+                cand = result.get("candidate", {})
+                key = f"{cand.get('provider')}/{cand.get('model')}|{cand.get('prompt')}"
+                groups.setdefault(key, []).append(result)
+
+    candidates = {}
+    for key, results in groups.items():
+        answered = [r for r in results if not r["primary"].get("failed")]
+        p_lat = [r["primary"]["latency_sec"] for r in answered if r["primary"].get("latency_sec") is not None]
+        s_lat = [r["shadow"]["latency_sec"] for r in results if r["shadow"].get("latency_sec") is not None]
+        s_tok = [r["shadow"]["usage"].get("completion_tokens") for r in results if r["shadow"].get("usage", {}).get("completion_tokens") is not None]
+        p_tok = [r["primary"]["usage"].get("completion_tokens") for r in answered if (r["primary"].get("usage") or {}).get("completion_tokens") is not None]
+        valid = [r for r in results if r["shadow"].get("schema_valid")]
+        div = [r["divergence"] for r in valid if r.get("divergence")]
+
+        candidates[key] = {
+            "samples": len(results),
+            "primary_failed": len(results) - len(answered),
+            "schema_valid_rate": round(len(valid) / len(results), 3),
+            "primary_latency_p50_sec": _percentile(p_lat, 50),
+            "primary_latency_p95_sec": _percentile(p_lat, 95),
+            "shadow_latency_p50_sec": _percentile(s_lat, 50),
+            "shadow_latency_p95_sec": _percentile(s_lat, 95),
+            "primary_completion_tokens_avg": round(sum(p_tok) / len(p_tok), 1) if p_tok else None,
+            "shadow_completion_tokens_avg": round(sum(s_tok) / len(s_tok), 1) if s_tok else None,
+            "risk_level_agreement": round(sum(1 for d in div if d["risk_level_match"]) / len(div), 3) if div else None,
+            "actions_agreement": round(sum(1 for d in div if d["actions_match"]) / len(div), 3) if div else None
+        }
+
+    report = {"generated_at": datetime.now().isoformat(), "candidates": candidates}
+    with open(os.path.join(telemetry.metrics_dir, "shadow_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    print(json.dumps(summarize_shadow_log(), indent=2))
@@ -52,6 +52,58 @@ class TelemetryManager:
         with open(metrics_file, "a", encoding="utf-8") as f:
             f.write(json.dumps(entry) + "\n")
 
+    def aggregate_provider_metrics(self) -> dict:
+        """
+        Aggregates the daily metrics files by provider/model (latency, tokens, throughput)
+        and stores the result in `provider_summary.json`.
+        """
+        fields = ["ai_latency_sec", "ttfb_sec", "http_sec", "prompt_tokens", "completion_tokens", "tokens_per_sec"]
+        groups = {}
+
+        for name in sorted(os.listdir(self.metrics_dir)):
+            if not (name.startswith("metrics_") and name.endswith(".jsonl")):
+                continue
+            with open(os.path.join(self.metrics_dir, name), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        metrics = json.loads(line).get("metrics", {})
+                    except json.JSONDecodeError:
+                        continue
+                    if "provider" not in metrics:
+                        continue  # Entries recorded before token accounting existed
+                    key = f"{metrics['provider']}/{metrics.get('model')}"
+                    group = groups.setdefault(key, {"decisions": 0, "sums": {}, "counts": {}})
+                    group["decisions"] += 1
+                    for field in fields:
+                        value = metrics.get(field)
+                        if isinstance(value, (int, float)):
+                            group["sums"][field] = group["sums"].get(field, 0) + value
+                            group["counts"][field] = group["counts"].get(field, 0) + 1
+
+        summary = {}
+        for key, group in groups.items():
+            summary[key] = {"decisions": group["decisions"]}
+            for field in fields:
+                count = group["counts"].get(field)
+                summary[key][f"avg_{field}"] = round(group["sums"][field] / count, 3) if count else None
+
+        report = {"generated_at": datetime.now().isoformat(), "providers": summary}
+        with open(os.path.join(self.metrics_dir, "provider_summary.json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def record_shadow(self, decision_id: str, result: dict):
+        """Records a shadow evaluation outcome, kept apart from the primary metrics."""
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "decision_id": decision_id,
+            "shadow": result
+        }
+
+        shadow_file = os.path.join(self.logs_dir, "shadow.jsonl")
+        with open(shadow_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
     def log_failure(self, decision_id: str, stage: str, error: Exception):
         """Explicit failure visibility."""
         failure_entry = {
@@ -69,3 +121,6 @@ class TelemetryManager:
         fail_file = os.path.join(self.logs_dir, "failures.jsonl")
         with open(fail_file, "a", encoding="utf-8") as f:
             f.write(json.dumps(failure_entry) + "\n")
+
+if __name__ == "__main__":
+    print(json.dumps(TelemetryManager().aggregate_provider_metrics(), indent=2))
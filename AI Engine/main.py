@@ -88,6 +88,9 @@ def main():
     except Exception as e:
         print(f"[-] Critical Engine Error: {str(e)}")
         sys.exit(1)
+    finally:
+        # Output is already delivered; only now give shadow candidates time to report.
+        orchestrator.brain.shadow.drain()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: tolerant JSON repair layer vs. plain json.loads.
+
+Replays the malformed LLM output corpus (fixtures/malformed_llm_outputs.jsonl)
+through both parsing paths and reports how many samples would end in
+`_handle_fallback`, plus the per-parse overhead on well-formed output.
+Truncated output and unknown `risk_level` values must end in the fallback
+(`recoverable: false`): completing them could execute a cut-off decision.
+
+Usage:
+    python tests/bench_json_repair.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "core"))
+
+from json_repair import parse_llm_json, normalize_decision
+
+CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "malformed_llm_outputs.jsonl")
+REQUIRED = ["strategy", "confidence_score", "risk_level", "reasoning", "actions", "prompt_version"]
+
+
+def schema_ok(decision) -> bool:
+    # Mirrors DecisionCore._validate_schema plus the numeric comparison done by the Safety Gate
+    if not isinstance(decision, dict) or any(field not in decision for field in REQUIRED):
+        return False
+    try:
+        decision["risk_level"].lower()
+        decision["confidence_score"] < 0.7
+        return True
+    except (AttributeError, TypeError):
+        return False
+
+
+def baseline(raw: str) -> bool:
+    try:
+        return schema_ok(json.loads(raw))
+    except json.JSONDecodeError:
+        return False
+
+
+def repaired(raw: str):
+    try:
+        decision, repairs = parse_llm_json(raw)
+        repairs = repairs + normalize_decision(decision)
+    except ValueError as e:
+        return False, [f"rejected: {e}"]
+    return schema_ok(decision), repairs
+
+
+def rejected(raw: str):
+    try:
+        parse_llm_json(raw)
+    except ValueError:
+        pass
+
+
+def main():
+    with open(CORPUS, "r", encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    base_fallbacks = 0
+    repair_fallbacks = 0
+    mismatches = []
+
+    print(f"{'sample':<40} {'baseline':<10} {'repaired':<10} repairs")
+    for sample in samples:
+        ok_base = baseline(sample["raw"])
+        ok_rep, repairs = repaired(sample["raw"])
+        base_fallbacks += not ok_base
+        repair_fallbacks += not ok_rep
+        if ok_rep != sample["recoverable"]:
+            mismatches.append(sample["name"])
+        print(f"{sample['name']:<40} {'ok' if ok_base else 'FALLBACK':<10} {'ok' if ok_rep else 'FALLBACK':<10} {','.join(repairs)}")
+
+    print("-" * 80)
+    print(f"Samples: {len(samples)} | Fallbacks baseline: {base_fallbacks} | Fallbacks with repair: {repair_fallbacks}")
+
+    valid = next(s["raw"] for s in samples if s["name"] == "valid_pretty")
+    fenced = next(s["raw"] for s in samples if s["name"] == "fenced_json")
+    truncated = next(s["raw"] for s in samples if s["name"] == "truncated_mid_action")
+    n = 20000
+    t_base = timeit.timeit(lambda: json.loads(valid), number=n) / n
+    t_fast = timeit.timeit(lambda: parse_llm_json(valid), number=n) / n
+    t_fence = timeit.timeit(lambda: parse_llm_json(fenced), number=n) / n
+    t_trunc = timeit.timeit(lambda: rejected(truncated), number=n) / n
+    print(f"json.loads (valid):          {t_base * 1e6:8.2f} us")
+    print(f"parse_llm_json (valid):      {t_fast * 1e6:8.2f} us  (+{(t_fast - t_base) * 1e6:.2f} us)")
+    print(f"parse_llm_json (fenced):     {t_fence * 1e6:8.2f} us")
+    print(f"parse_llm_json (truncated):  {t_trunc * 1e6:8.2f} us  (rejected)")
+
+    if mismatches:
+        print(f"[-] Unexpected outcome for: {', '.join(mismatches)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()